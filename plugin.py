@@ -5,38 +5,24 @@
 """
 
 import asyncio
+import contextlib
+import contextvars
+import heapq
+import importlib
 import json
+import os
+import re
+import struct
 import time
+import zlib
 import random
+from collections import OrderedDict, deque
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
-
-# 尝试导入可选依赖
-try:
-    import aiohttp
-except ImportError:
-    aiohttp = None
-
-try:
-    import aiofiles
-except ImportError:
-    aiofiles = None
-
-try:
-    import feedparser
-except ImportError:
-    feedparser = None
-
-try:
-    import tomllib as toml_lib  # Python 3.11+
-except Exception:
-    toml_lib = None
-
-try:
-    import toml as toml_pkg  # 可选第三方，若存在则作为后备
-except Exception:
-    toml_pkg = None
+from types import MappingProxyType
+from typing import List, Dict, Any, Optional, Set, Tuple
 
 from src.plugin_system import (
     BasePlugin, BaseAction, BaseCommand, BaseEventHandler,
@@ -54,105 +40,1925 @@ from src.chat.message_receive.chat_stream import get_chat_manager
 logger = get_logger("topic_finder_plugin")
 
 
+# 可选依赖（aiohttp / aiofiles / feedparser / msgpack / TOML 解析库等）在首次使用时才导入，
+# 对应功能未启用时不产生导入开销；结果缓存，未安装时为 None
+_OPTIONAL_MODULES: Dict[str, Any] = {}
+
+
+def _optional_import(name: str) -> Any:
+    """按需导入可选依赖，未安装时返回 None"""
+    if name not in _OPTIONAL_MODULES:
+        try:
+            _OPTIONAL_MODULES[name] = importlib.import_module(name)
+        except ImportError:
+            _OPTIONAL_MODULES[name] = None
+    return _OPTIONAL_MODULES[name]
+
+
+def _load_toml_file(path: Path) -> Dict[str, Any]:
+    """读取 TOML 文件：优先使用标准库 tomllib（3.11+），否则回退到第三方 toml 包"""
+    toml_lib = _optional_import("tomllib")
+    if toml_lib is not None:
+        with open(path, 'rb') as f:
+            return toml_lib.load(f)
+    toml_pkg = _optional_import("toml")
+    if toml_pkg is not None:
+        with open(path, 'r', encoding='utf-8') as f:
+            return toml_pkg.load(f)
+    raise RuntimeError("未安装 TOML 解析库（tomllib / toml）")
+
+
+# 分词：中文连续片段按相邻双字（bigram）切分，拉丁字母/数字按单词切分
+_TOKEN_RE = re.compile(r"[\u4e00-\u9fff]+|[a-z0-9]+")
+_STOP_TOKENS = {
+    "the", "and", "for", "with", "that", "this", "are", "was", "you", "http", "https", "www", "com",
+    "一个", "我们", "你们", "他们", "什么", "怎么", "这个", "那个", "就是", "还是", "没有", "可以", "现在",
+}
+
+
+def _tokenize_text(text: str) -> List[str]:
+    """将文本切分为用于匹配的词元（中文 bigram + 拉丁单词），保留重复以便计数"""
+    tokens: List[str] = []
+    for m in _TOKEN_RE.finditer((text or "").lower()):
+        seg = m.group(0)
+        if "\u4e00" <= seg[0] <= "\u9fff":
+            if len(seg) == 1:
+                continue
+            grams = [seg[i:i + 2] for i in range(len(seg) - 1)]
+        else:
+            if len(seg) < 2 or seg.isdigit():
+                continue
+            grams = [seg]
+        tokens.extend(g for g in grams if g not in _STOP_TOKENS)
+    return tokens
+
+
+# 启发式 token 估算（不依赖具体模型的分词器）：常见 BPE 分词器中汉字/全角符号约 1 token/字，
+# 拉丁字母与数字约 4 字符/token，半角标点约 0.5 token，其余字符（如 emoji）按 2 token 计
+_CJK_CHAR_RE = re.compile(r"[\u3000-\u303f\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uff00-\uffef]")
+_ALNUM_CHAR_RE = re.compile(r"[A-Za-z0-9]")
+_PUNCT_CHAR_RE = re.compile(r"[!-/:-@\[-`{-~]")
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def _char_token_cost(ch: str) -> float:
+    if ch.isspace():
+        return 0.0
+    if _ALNUM_CHAR_RE.match(ch):
+        return 0.25
+    if _CJK_CHAR_RE.match(ch):
+        return 1.0
+    if _PUNCT_CHAR_RE.match(ch):
+        return 0.5
+    return 2.0
+
+
+def _estimate_tokens(text: str) -> int:
+    """估算文本的 token 数（偏保守，向上取整）"""
+    if not text:
+        return 0
+    cjk = len(_CJK_CHAR_RE.findall(text))
+    alnum = len(_ALNUM_CHAR_RE.findall(text))
+    punct = len(_PUNCT_CHAR_RE.findall(text))
+    spaces = sum(1 for ch in text if ch.isspace())
+    other = len(text) - cjk - alnum - punct - spaces
+    return int(cjk + alnum / 4 + punct / 2 + other * 2 + 0.999)
+
+
+def _truncate_to_tokens(text: str, max_tokens: float) -> str:
+    """按估算 token 数截断文本，截断时以省略号结尾"""
+    if max_tokens <= 0 or not text:
+        return ""
+    if _estimate_tokens(text) <= max_tokens:
+        return text
+    budget = max_tokens - 1  # 为省略号预留
+    used = 0.0
+    for i, ch in enumerate(text):
+        used += _char_token_cost(ch)
+        if used > budget:
+            return text[:i].rstrip() + "…"
+    return text
+
+
+class MetricsRegistry:
+    """进程内指标注册表：计数器、仪表与延迟直方图，可导出为 Prometheus 文本格式
+
+    指标按 (名称, 标签) 区分；直方图同时维护固定分桶（用于导出）与最近样本（用于计算 p50/p95/p99）。
+    关闭后所有记录调用直接返回，不产生开销。
+    """
+
+    PREFIX = "topic_finder_"
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+    SAMPLE_SIZE = 512
+
+    # 指标说明（导出时作为 HELP 行）
+    DESCRIPTIONS = {
+        "rss_refresh_seconds": "RSS 刷新一轮的耗时",
+        "rss_fetch_seconds": "单个 RSS 源的请求耗时（含下载与解析）",
+        "rss_fetch_total": "RSS 源请求次数（按结果）",
+        "rss_parse_seconds": "单个 RSS 源的解析耗时",
+        "rss_items_total": "RSS 源拉取到的条目数",
+        "rss_sources_quarantined": "当前处于隔离状态的 RSS 源数量",
+        "web_llm_request_seconds": "联网大模型单次请求耗时",
+        "web_llm_requests_total": "联网大模型请求次数（按端点与结果）",
+        "web_llm_parse_seconds": "联网大模型回复的解析耗时",
+        "generation_seconds": "话题生成耗时（含模型切换与对冲）",
+        "generation_model_seconds": "单个模型请求耗时",
+        "generation_requests_total": "话题生成模型请求次数（按模型与结果）",
+        "generation_hedges_total": "对冲请求次数（fired 为发起，won 为对冲请求先返回）",
+        "dedup_hits_total": "去重命中次数（按类型）",
+        "topic_retries_total": "话题重新生成次数（按原因）",
+        "fallback_topics_total": "使用备用话题的次数",
+        "send_seconds": "单个群聊话题发送流程耗时（解析聊天流、获取话题与发送）",
+        "sends_total": "话题发送次数（按触发原因与结果）",
+        "dispatch_retries_total": "出站发送重试次数",
+        "dispatch_queue_depth": "出站队列中等待发送的消息数",
+        "silence_triggers_total": "静默检测触发次数",
+    }
+
+    def __init__(self):
+        self.enabled = True
+        self._metrics: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def _label_key(labels: Dict[str, Any]) -> Tuple[Tuple[str, str], ...]:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def _series(self, name: str, kind: str) -> Dict[Tuple[Tuple[str, str], ...], Any]:
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = {"type": kind, "series": {}}
+        return metric["series"]
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        """计数器加 value"""
+        if not self.enabled:
+            return
+        series = self._series(name, "counter")
+        key = self._label_key(labels)
+        series[key] = series.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels):
+        """设置仪表值"""
+        if not self.enabled:
+            return
+        self._series(name, "gauge")[self._label_key(labels)] = float(value)
+
+    def observe(self, name: str, value: float, **labels):
+        """记录一次直方图观测（秒）"""
+        if not self.enabled:
+            return
+        series = self._series(name, "histogram")
+        key = self._label_key(labels)
+        hist = series.get(key)
+        if hist is None:
+            hist = series[key] = {
+                "buckets": [0] * len(self.DEFAULT_BUCKETS), "sum": 0.0, "count": 0,
+                "samples": deque(maxlen=self.SAMPLE_SIZE),
+            }
+        for i, bound in enumerate(self.DEFAULT_BUCKETS):
+            if value <= bound:
+                hist["buckets"][i] += 1
+                break
+        hist["sum"] += value
+        hist["count"] += 1
+        hist["samples"].append(value)
+
+    def timer(self, name: str, **labels) -> "_MetricTimer":
+        """计时上下文：with metrics.timer("xxx_seconds", a=1): ..."""
+        return _MetricTimer(self, name, labels)
+
+    def reset(self):
+        self._metrics.clear()
+
+    @staticmethod
+    def _percentile(ordered: List[float], q: float) -> float:
+        index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+        return ordered[index]
+
+    def summary(self, keyword: str = "") -> Dict[str, Any]:
+        """汇总指标（供 /topic_stats 展示）
+
+        直方图返回合并所有标签后的次数与 p50/p95/p99，计数器与仪表返回合计值；keyword 非空时只汇总名称包含
+        keyword 的指标，并附带各标签组合的明细。
+        """
+        result: Dict[str, Any] = {"histograms": {}, "counters": {}, "gauges": {}}
+        for name, metric in sorted(self._metrics.items()):
+            if keyword and keyword not in name:
+                continue
+            series = metric["series"]
+            if metric["type"] == "histogram":
+                def stats(hists: List[Dict[str, Any]]) -> Dict[str, Any]:
+                    ordered = sorted(v for h in hists for v in h["samples"])
+                    entry = {"count": sum(h["count"] for h in hists)}
+                    if ordered:
+                        entry.update({q: self._percentile(ordered, p) for q, p in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))})
+                    return entry
+                entry = stats(list(series.values()))
+                if keyword:
+                    entry["labels"] = {self._format_labels(k): stats([h]) for k, h in series.items()}
+                result["histograms"][name] = entry
+            else:
+                entry = {"total": sum(series.values())}
+                if keyword:
+                    entry["labels"] = {self._format_labels(k): v for k, v in series.items()}
+                result["counters" if metric["type"] == "counter" else "gauges"][name] = entry
+        return result
+
+    @staticmethod
+    def _escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+    @classmethod
+    def _format_labels(cls, key: Tuple[Tuple[str, str], ...], extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(key) + ([extra] if extra else [])
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{cls._escape(v)}"' for k, v in pairs) + "}"
+
+    def render_prometheus(self) -> str:
+        """按 Prometheus 文本格式（0.0.4）导出全部指标"""
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            full = self.PREFIX + name
+            description = self.DESCRIPTIONS.get(name)
+            if description:
+                lines.append(f"# HELP {full} {description}")
+            lines.append(f"# TYPE {full} {metric['type']}")
+            for key, value in sorted(metric["series"].items()):
+                if metric["type"] != "histogram":
+                    lines.append(f"{full}{self._format_labels(key)} {value:g}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(self.DEFAULT_BUCKETS, value["buckets"]):
+                    cumulative += count
+                    lines.append(f"{full}_bucket{self._format_labels(key, ('le', f'{bound:g}'))} {cumulative}")
+                lines.append(f"{full}_bucket{self._format_labels(key, ('le', '+Inf'))} {value['count']}")
+                lines.append(f"{full}_sum{self._format_labels(key)} {value['sum']:g}")
+                lines.append(f"{full}_count{self._format_labels(key)} {value['count']}")
+        return "\n".join(lines) + "\n"
+
+
+class _MetricTimer:
+    """MetricsRegistry.timer 返回的计时上下文，退出时记录耗时；可通过 labels 在退出前补充标签"""
+
+    def __init__(self, registry: MetricsRegistry, name: str, labels: Dict[str, Any]):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+        self.started = 0.0
+
+    def __enter__(self) -> "_MetricTimer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.registry.observe(self.name, time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+# 全局指标注册表：各组件直接记录，由插件按配置开关与导出
+metrics = MetricsRegistry()
+
+
+class _TraceSpan:
+    """SendTrace.span 返回的阶段计时上下文；异常退出时标记阶段状态"""
+
+    def __init__(self, trace: "SendTrace", name: str, attrs: Dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.attrs = attrs
+        self.started = 0.0
+
+    def __enter__(self) -> "_TraceSpan":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            status = "ok"
+        elif issubclass(exc_type, (asyncio.CancelledError, asyncio.TimeoutError)):
+            status = "cancelled" if issubclass(exc_type, asyncio.CancelledError) else "timeout"
+        else:
+            status = "error"
+        self.trace.record(self.name, self.started, time.perf_counter(), status=status, **self.attrs)
+        return False
+
+
+class SendTrace:
+    """单次话题发送的追踪记录：关联 ID、触发原因与各阶段（span）的起始偏移和耗时
+
+    阶段名用点号表示层级（如 acquire.generate.rss）；并发执行的阶段按起始偏移排列即可看出重叠。
+    """
+
+    def __init__(self, chat_id: Any, reason: str):
+        self.trace_id = os.urandom(6).hex()
+        self.chat_id = str(chat_id)
+        self.reason = reason
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self.spans: List[Dict[str, Any]] = []
+        self.status = "in_progress"
+        self.duration_ms: Optional[float] = None
+        self.finished = False
+
+    def span(self, name: str, **attrs) -> _TraceSpan:
+        return _TraceSpan(self, name, attrs)
+
+    def record(self, name: str, started: float, ended: float, status: str = "ok", **attrs):
+        """按 perf_counter 时间点记录一个阶段；发送流程结束后到达的阶段（后台任务）忽略"""
+        if self.finished:
+            return
+        span = {
+            "name": name,
+            "start_ms": round((started - self._t0) * 1000, 2),
+            "duration_ms": round((ended - started) * 1000, 2),
+            "status": status,
+        }
+        if attrs:
+            span.update(attrs)
+        self.spans.append(span)
+
+    def finish(self, status: str):
+        self.status = status
+        self.duration_ms = round((time.perf_counter() - self._t0) * 1000, 2)
+        self.finished = True
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "chat_id": self.chat_id,
+            "reason": self.reason,
+            "started_at": self.started_at,
+            "status": self.status,
+            "duration_ms": self.duration_ms,
+            "spans": sorted(self.spans, key=lambda s: s["start_ms"]),
+        }
+
+
+# 当前协程所属的发送追踪；asyncio 创建子任务时复制上下文，gather 出的并发阶段也能记录到同一追踪
+_CURRENT_TRACE: "contextvars.ContextVar[Optional[SendTrace]]" = contextvars.ContextVar("topic_send_trace", default=None)
+
+
+def current_trace() -> Optional[SendTrace]:
+    return _CURRENT_TRACE.get()
+
+
+def trace_span(name: str, **attrs):
+    """在当前发送追踪中记录一个阶段；不在追踪中（如命令触发的生成）时为空操作"""
+    trace = _CURRENT_TRACE.get()
+    return trace.span(name, **attrs) if trace is not None else contextlib.nullcontext()
+
+
+class TraceRecorder:
+    """发送追踪的环形缓冲区，可选同时追加写入 JSONL 文件（超过大小上限时轮转为 .1）"""
+
+    def __init__(self, capacity: int = 200, sink_path: Optional[Path] = None, sink_max_bytes: int = 10 * 1024 * 1024):
+        self.buffer: "deque[Dict[str, Any]]" = deque(maxlen=max(1, int(capacity)))
+        self.sink_path = sink_path
+        self.sink_max_bytes = max(1024, int(sink_max_bytes))
+        self._sink_lock = asyncio.Lock()
+
+    def reconfigure(self, capacity: int, sink_path: Optional[Path], sink_max_bytes: int):
+        capacity = max(1, int(capacity))
+        if capacity != self.buffer.maxlen:
+            self.buffer = deque(self.buffer, maxlen=capacity)
+        self.sink_path = sink_path
+        self.sink_max_bytes = max(1024, int(sink_max_bytes))
+
+    def start(self, chat_id: Any, reason: str) -> SendTrace:
+        return SendTrace(chat_id, reason)
+
+    async def finish(self, trace: SendTrace, status: str):
+        trace.finish(status)
+        record = trace.to_dict()
+        self.buffer.append(record)
+        if self.sink_path is not None:
+            line = json.dumps(record, ensure_ascii=False) + "\n"
+            try:
+                async with self._sink_lock:
+                    await asyncio.to_thread(self._append_sync, self.sink_path, line, self.sink_max_bytes)
+            except Exception as e:
+                logger.warning(f"写入发送追踪文件失败: {e}")
+
+    @staticmethod
+    def _append_sync(path: Path, line: str, max_bytes: int):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists() and path.stat().st_size >= max_bytes:
+            os.replace(path, path.with_name(path.name + ".1"))
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+    def recent(self, n: int) -> List[Dict[str, Any]]:
+        """最近 n 条追踪（新的在前）"""
+        return list(self.buffer)[-max(0, int(n)):][::-1] if n > 0 else []
+
+
+class TopicItemIndex:
+    """资讯倒排索引：标题/描述分词后建立 词元 -> 资讯 的映射，随来源抓取增量维护，支持关键词/标签检索与按时效过期"""
+
+    def __init__(self, max_items: int = 5000):
+        self.max_items = max(100, int(max_items))
+        self._items: Dict[str, Dict[str, Any]] = {}
+        self._kinds: Dict[str, str] = {}
+        self._expires: Dict[str, float] = {}
+        self._doc_tokens: Dict[str, frozenset] = {}
+        self._postings: Dict[str, set] = {}
+        # (过期时间, doc_id) 小顶堆；条目更新后旧记录惰性丢弃
+        self._expiry_heap: List[Tuple[float, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @staticmethod
+    def _doc_id(item: Dict[str, Any]) -> str:
+        link = (item.get("link") or "").strip()
+        if link:
+            return link
+        title = re.sub(r"\s+", "", (item.get("title") or "").lower())
+        return f"{item.get('source', '')}|{title}"
+
+    @staticmethod
+    def _item_tags(item: Dict[str, Any]) -> List[str]:
+        tags = item.get("tags") or []
+        if isinstance(tags, str):
+            tags = [tags]
+        if item.get("category"):
+            tags = list(tags) + [item["category"]]
+        return [f"#{str(t).strip().lower()}" for t in tags if str(t).strip()]
+
+    def add_items(self, items: List[Dict[str, Any]], kind: str, ttl_seconds: float, now: Optional[float] = None):
+        """增量写入一批资讯；已存在的条目会被刷新"""
+        now = time.time() if now is None else now
+        for item in items or []:
+            if not isinstance(item, dict) or not (item.get("title") or item.get("description")):
+                continue
+            doc_id = self._doc_id(item)
+            self._remove(doc_id)
+            tokens = frozenset(_tokenize_text(f"{item.get('title', '')} {item.get('description', '')}"))
+            tokens = tokens | frozenset(self._item_tags(item))
+            expires_at = float(item.get("timestamp") or now) + ttl_seconds
+            if expires_at <= now:
+                continue
+            self._items[doc_id] = item
+            self._kinds[doc_id] = kind
+            self._expires[doc_id] = expires_at
+            self._doc_tokens[doc_id] = tokens
+            for tok in tokens:
+                self._postings.setdefault(tok, set()).add(doc_id)
+            heapq.heappush(self._expiry_heap, (expires_at, doc_id))
+
+        # 超出容量时淘汰最先过期的条目
+        while len(self._items) > self.max_items and self._expiry_heap:
+            expires_at, doc_id = heapq.heappop(self._expiry_heap)
+            # 条目已刷新（或已移除）时这是旧记录，不能据此删除新版本
+            if self._expires.get(doc_id) != expires_at:
+                continue
+            self._remove(doc_id)
+
+    def _remove(self, doc_id: str):
+        if doc_id not in self._items:
+            return
+        for tok in self._doc_tokens.pop(doc_id, ()):
+            postings = self._postings.get(tok)
+            if postings is not None:
+                postings.discard(doc_id)
+                if not postings:
+                    del self._postings[tok]
+        self._items.pop(doc_id, None)
+        self._kinds.pop(doc_id, None)
+        self._expires.pop(doc_id, None)
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """移除已过期条目，返回移除数量；堆顶未过期时为 O(1)"""
+        now = time.time() if now is None else now
+        removed = 0
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            expires_at, doc_id = heapq.heappop(self._expiry_heap)
+            if self._expires.get(doc_id) == expires_at:
+                self._remove(doc_id)
+                removed += 1
+        return removed
+
+    def _timestamp(self, doc_id: str) -> float:
+        return float(self._items[doc_id].get("timestamp") or 0)
+
+    def search(self, query: str, k: int = 5, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """关键词检索（`#标签` 匹配标签），按命中词数、时效排序取前 k 条"""
+        self.expire()
+        tokens: List[str] = []
+        for part in (query or "").split():
+            if part.startswith("#") and len(part) > 1:
+                tokens.append(part.lower())
+            else:
+                tokens.extend(_tokenize_text(part) or ([part.lower()] if len(part) > 1 else []))
+        if not tokens:
+            return []
+
+        hits: Dict[str, int] = {}
+        for tok in set(tokens):
+            for doc_id in self._postings.get(tok, ()):
+                if kind is None or self._kinds.get(doc_id) == kind:
+                    hits[doc_id] = hits.get(doc_id, 0) + 1
+
+        ranked = heapq.nlargest(k, hits, key=lambda d: (hits[d], self._timestamp(d)))
+        return [self._items[d] for d in ranked]
+
+    def match_weights(self, weights: Dict[str, float], k: int = 4, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """按加权词元（如群聊兴趣画像）累加得分，返回得分最高的前 k 条"""
+        self.expire()
+        scores: Dict[str, float] = {}
+        for tok, w in weights.items():
+            for doc_id in self._postings.get(tok, ()):
+                if kind is None or self._kinds.get(doc_id) == kind:
+                    scores[doc_id] = scores.get(doc_id, 0.0) + w
+        ranked = heapq.nlargest(k, scores, key=lambda d: (scores[d], self._timestamp(d)))
+        return [self._items[d] for d in ranked]
+
+    def recent(self, k: int = 5, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """按时效取最新的前 k 条"""
+        self.expire()
+        docs = [d for d in self._items if kind is None or self._kinds.get(d) == kind]
+        return [self._items[d] for d in heapq.nlargest(k, docs, key=self._timestamp)]
+
+    def count(self, kind: Optional[str] = None) -> int:
+        if kind is None:
+            return len(self._items)
+        return sum(1 for v in self._kinds.values() if v == kind)
+
+
+class AtomicFileWriter:
+    """data/ 文件的持久化层：临时文件 + fsync + 原子重命名，按文件加锁，并支持防抖的延迟写入"""
+
+    def __init__(self, debounce_seconds: float = 0.0):
+        self.debounce_seconds = max(0.0, float(debounce_seconds))
+        self._locks: Dict[Path, asyncio.Lock] = {}
+        # 尚未落盘的最新内容；读取时优先返回，保证读到自己的写入
+        self._pending: Dict[Path, bytes] = {}
+        self._flush_tasks: Dict[Path, asyncio.Task] = {}
+
+    def _lock(self, path: Path) -> asyncio.Lock:
+        lock = self._locks.get(path)
+        if lock is None:
+            lock = self._locks[path] = asyncio.Lock()
+        return lock
+
+    @staticmethod
+    def _write_atomic_sync(path: Path, data: bytes):
+        # 数据目录在首次写入时创建，插件加载阶段不触碰文件系统
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        # 目录项也落盘，避免掉电后重命名丢失（部分平台不支持，忽略即可）
+        try:
+            dir_fd = os.open(str(path.parent), os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        except OSError:
+            pass
+
+    async def _read_unlocked(self, path: Path) -> Optional[bytes]:
+        if path in self._pending:
+            return self._pending[path]
+        if not path.exists():
+            return None
+        aiofiles = _optional_import("aiofiles")
+        if aiofiles:
+            async with aiofiles.open(path, 'rb') as f:
+                return await f.read()
+        return await asyncio.to_thread(path.read_bytes)
+
+    async def _write_unlocked(self, path: Path, data: bytes, debounce: bool):
+        if debounce and self.debounce_seconds > 0:
+            self._pending[path] = data
+            if path not in self._flush_tasks:
+                self._flush_tasks[path] = asyncio.create_task(self._delayed_flush(path))
+            return
+        self._pending.pop(path, None)
+        await asyncio.to_thread(self._write_atomic_sync, path, data)
+
+    async def _delayed_flush(self, path: Path):
+        try:
+            await asyncio.sleep(self.debounce_seconds)
+            await self.flush(path)
+        finally:
+            self._flush_tasks.pop(path, None)
+
+    async def read_bytes(self, path: Path) -> Optional[bytes]:
+        async with self._lock(path):
+            return await self._read_unlocked(path)
+
+    async def write_bytes(self, path: Path, data: bytes, debounce: bool = False):
+        async with self._lock(path):
+            await self._write_unlocked(path, data, debounce)
+
+    async def read_text(self, path: Path) -> Optional[str]:
+        data = await self.read_bytes(path)
+        return data.decode('utf-8') if data is not None else None
+
+    async def write_text(self, path: Path, text: str, debounce: bool = False):
+        await self.write_bytes(path, text.encode('utf-8'), debounce=debounce)
+
+    async def update_text(self, path: Path, fn, debounce: bool = False):
+        """在文件锁内完成 读取-修改-写入，fn 接收当前文本（可能为 None）并返回新文本"""
+        async with self._lock(path):
+            data = await self._read_unlocked(path)
+            text = fn(data.decode('utf-8') if data is not None else None)
+            await self._write_unlocked(path, text.encode('utf-8'), debounce)
+
+    async def flush(self, path: Optional[Path] = None):
+        """立即落盘待写内容（不传 path 时落盘全部）"""
+        for p in ([path] if path is not None else list(self._pending)):
+            async with self._lock(p):
+                data = self._pending.pop(p, None)
+                if data is not None:
+                    await asyncio.to_thread(self._write_atomic_sync, p, data)
+
+
+class JsonCacheSerializer:
+    """缓存序列化：JSON 文本（旧版格式，便于人工查看）"""
+
+    name = "json"
+    suffix = ".json"
+
+    def dumps(self, items: List[Dict[str, Any]]) -> bytes:
+        return json.dumps(items, ensure_ascii=False, indent=2).encode('utf-8')
+
+    def loads(self, data: bytes) -> List[Dict[str, Any]]:
+        return json.loads(data.decode('utf-8')) if data else []
+
+
+class BinaryCacheSerializer:
+    """缓存序列化：带版本头的紧凑格式
+
+    文件头为 MAGIC + 版本号 + 编码方式；已安装 msgpack 时整体以 msgpack 编码，
+    否则为不压缩的紧凑 JSON（无缩进、不转义中文），文件更小、加载不慢于 json 格式。
+    旧版的 zlib 压缩编码（CODEC_ZLIB_JSON、CODEC_RECORDS）仍可读取。
+    """
+
+    name = "binary"
+    suffix = ".bin"
+    MAGIC = b"TFCACHE"
+    VERSION = 1
+    CODEC_MSGPACK = 1
+    CODEC_RECORDS = 2
+    CODEC_ZLIB_JSON = 3
+    CODEC_JSON = 4
+    _HEADER = struct.Struct(">7sBB")
+    _LENGTH = struct.Struct(">I")
+
+    def dumps(self, items: List[Dict[str, Any]]) -> bytes:
+        msgpack = _optional_import("msgpack")
+        if msgpack is not None:
+            return self._HEADER.pack(self.MAGIC, self.VERSION, self.CODEC_MSGPACK) + msgpack.packb(
+                items, use_bin_type=True
+            )
+        payload = json.dumps(items, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+        return self._HEADER.pack(self.MAGIC, self.VERSION, self.CODEC_JSON) + payload
+
+    def loads(self, data: bytes) -> List[Dict[str, Any]]:
+        if not data:
+            return []
+        magic, version, codec = self._HEADER.unpack_from(data, 0)
+        if magic != self.MAGIC:
+            raise ValueError("不是话题插件的二进制缓存文件")
+        if version > self.VERSION:
+            raise ValueError(f"不支持的缓存文件版本: {version}")
+        body = memoryview(data)[self._HEADER.size:]
+        if codec == self.CODEC_MSGPACK:
+            msgpack = _optional_import("msgpack")
+            if msgpack is None:
+                raise ValueError("缓存文件使用 msgpack 编码，但 msgpack 未安装")
+            return msgpack.unpackb(body, raw=False)
+        if codec == self.CODEC_JSON:
+            # 直接从缓冲区按 UTF-8 解码，不复制正文
+            return json.loads(str(body, 'utf-8'))
+        if codec == self.CODEC_ZLIB_JSON:
+            return json.loads(zlib.decompress(body))
+        if codec != self.CODEC_RECORDS:
+            raise ValueError(f"未知的缓存编码方式: {codec}")
+        payload = memoryview(zlib.decompress(body))
+        records = []
+        offset = 0
+        while offset < len(payload):
+            (length,) = self._LENGTH.unpack_from(payload, offset)
+            offset += self._LENGTH.size
+            records.append(payload[offset:offset + length])
+            offset += length
+        return json.loads(b"[" + b",".join(records) + b"]")
+
+
+CACHE_SERIALIZERS = {
+    JsonCacheSerializer.name: JsonCacheSerializer,
+    BinaryCacheSerializer.name: BinaryCacheSerializer,
+}
+
+
+class JsonTopicStore:
+    """基于 data/ 下 JSON 文件的存储（旧版格式）；不持久化HTTP校验信息与发送时间"""
+
+    ITEM_FILES = {"rss": "rss_cache.json", "web": "web_info_cache.json"}
+    ITEM_BASENAMES = {"rss": "rss_cache", "web": "web_info_cache"}
+    UPDATE_FILES = {"rss": "last_update.json", "web": "web_last_update.json"}
+    RECENT_TOPICS_FILE = "recent_topics.json"
+    STATE_FILE = "scheduler_state.json"
+
+    def __init__(self, data_dir: Path, write_debounce_seconds: float = 2.0, cache_format: str = "json"):
+        self.data_dir = data_dir
+        self.writer = AtomicFileWriter(debounce_seconds=write_debounce_seconds)
+        self.serializer = CACHE_SERIALIZERS.get(str(cache_format).lower(), JsonCacheSerializer)()
+        self._validators: Dict[str, Dict[str, str]] = {}
+
+    async def _read_json(self, path: Path, default: Any) -> Any:
+        # 解析失败时抛出异常而不是返回默认值，避免后续写入覆盖掉原有数据
+        content = await self.writer.read_text(path)
+        return json.loads(content) if content else default
+
+    async def _write_json(self, path: Path, data: Any, indent: Optional[int] = None, debounce: bool = False):
+        await self.writer.write_text(path, json.dumps(data, ensure_ascii=False, indent=indent), debounce=debounce)
+
+    def _item_path(self, kind: str, serializer=None) -> Path:
+        serializer = serializer or self.serializer
+        return self.data_dir / f"{self.ITEM_BASENAMES[kind]}{serializer.suffix}"
+
+    async def load_items(self, kind: str, since: float = 0, source: Optional[str] = None) -> List[Dict[str, Any]]:
+        data = await self.writer.read_bytes(self._item_path(kind))
+        serializer = self.serializer
+        if data is None:
+            # 切换格式后首次读取：回退读取其他格式的缓存文件
+            for other_cls in CACHE_SERIALIZERS.values():
+                if other_cls is not type(self.serializer):
+                    other = other_cls()
+                    data = await self.writer.read_bytes(self._item_path(kind, other))
+                    if data is not None:
+                        serializer = other
+                        break
+        items = serializer.loads(data) if data else []
+        return [
+            item for item in items
+            if item.get("timestamp", 0) >= since and (source is None or item.get("source") == source)
+        ]
+
+    async def save_items(self, kind: str, items: List[Dict[str, Any]]):
+        await self.writer.write_bytes(self._item_path(kind), self.serializer.dumps(items))
+
+    async def get_last_update(self, kind: str) -> float:
+        data = await self._read_json(self.data_dir / self.UPDATE_FILES[kind], {})
+        return float(data.get("last_update", 0))
+
+    async def set_last_update(self, kind: str, ts: float):
+        await self._write_json(self.data_dir / self.UPDATE_FILES[kind], {"last_update": ts})
+
+    async def _load_recent_topics(self) -> Dict[str, List[Dict[str, Any]]]:
+        return await self._read_json(self.data_dir / self.RECENT_TOPICS_FILE, {})
+
+    async def load_recent_topics(self, chat_id: str, since: float = 0) -> List[Dict[str, Any]]:
+        data = await self._load_recent_topics()
+        return [it for it in data.get(str(chat_id), []) if it.get("ts", 0) >= since]
+
+    async def add_recent_topic(self, chat_id: str, content: str, ts: float, max_keep: int):
+        def append(text: Optional[str]) -> str:
+            data = json.loads(text) if text else {}
+            items = data.get(str(chat_id), [])
+            items.append({"content": content, "ts": ts})
+            data[str(chat_id)] = items[-max_keep:]
+            return json.dumps(data, ensure_ascii=False)
+
+        # 读-改-写在同一把文件锁内完成，并发记录不会互相覆盖
+        await self.writer.update_text(self.data_dir / self.RECENT_TOPICS_FILE, append, debounce=True)
+
+    async def get_validators(self, url: str) -> Dict[str, str]:
+        return dict(self._validators.get(url, {}))
+
+    async def set_validators(self, url: str, etag: Optional[str], last_modified: Optional[str]):
+        self._validators[url] = {"etag": etag or "", "last_modified": last_modified or ""}
+
+    async def load_send_times(self) -> Dict[str, float]:
+        return {}
+
+    async def set_send_time(self, chat_id: str, ts: float):
+        return None
+
+    async def get_meta(self, key: str, default: Any = None) -> Any:
+        data = await self._read_json(self.data_dir / self.STATE_FILE, {})
+        return data.get(key, default)
+
+    async def set_meta(self, key: str, value: Any):
+        def assign(text: Optional[str]) -> str:
+            data = json.loads(text) if text else {}
+            data[key] = value
+            return json.dumps(data, ensure_ascii=False)
+
+        await self.writer.update_text(self.data_dir / self.STATE_FILE, assign)
+
+    async def close(self):
+        await self.writer.flush()
+
+
+class SQLiteTopicStore:
+    """嵌入式 SQLite 存储（WAL 模式）；所有数据库操作在专用线程串行执行，不阻塞事件循环"""
+
+    DB_FILE = "topic_finder.db"
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS items (
+            kind TEXT NOT NULL,
+            item_key TEXT NOT NULL,
+            source TEXT NOT NULL DEFAULT '',
+            timestamp REAL NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (kind, item_key)
+        );
+        CREATE INDEX IF NOT EXISTS idx_items_kind_ts ON items(kind, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_items_kind_source ON items(kind, source);
+        CREATE TABLE IF NOT EXISTS last_update (kind TEXT PRIMARY KEY, ts REAL NOT NULL);
+        CREATE TABLE IF NOT EXISTS validators (
+            url TEXT PRIMARY KEY,
+            etag TEXT NOT NULL DEFAULT '',
+            last_modified TEXT NOT NULL DEFAULT '',
+            updated_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS recent_topics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            chat_id TEXT NOT NULL,
+            content TEXT NOT NULL,
+            ts REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_recent_chat_ts ON recent_topics(chat_id, ts);
+        CREATE TABLE IF NOT EXISTS send_times (chat_id TEXT PRIMARY KEY, ts REAL NOT NULL);
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+    """
+
+    def __init__(self, data_dir: Path):
+        self.data_dir = data_dir
+        self.db_path = data_dir / self.DB_FILE
+        self._conn = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="topic_finder_sqlite")
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    def _db(self):
+        """获取连接（仅在专用线程中调用），首次打开时创建数据目录、建表并迁移旧版 JSON 数据"""
+        if self._conn is None:
+            import sqlite3
+            self.data_dir.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self._SCHEMA)
+            self._conn = conn
+            self._migrate_json()
+        return self._conn
+
+    def _migrate_json(self):
+        """一次性导入旧版 data/*.json 文件（保留原文件作为备份）"""
+        conn = self._conn
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+            return
+
+        def read(name: str, default: Any) -> Any:
+            path = self.data_dir / name
+            if not path.exists():
+                return default
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                logger.warning(f"迁移旧版数据文件失败: {name}, 错误: {e}")
+                return default
+
+        with conn:
+            for kind, name in JsonTopicStore.ITEM_FILES.items():
+                items = read(name, [])
+                if isinstance(items, list) and items:
+                    self._replace_items(kind, items)
+            for kind, name in JsonTopicStore.UPDATE_FILES.items():
+                data = read(name, {})
+                if isinstance(data, dict) and data.get("last_update"):
+                    conn.execute(
+                        "INSERT OR REPLACE INTO last_update (kind, ts) VALUES (?, ?)",
+                        (kind, float(data["last_update"])),
+                    )
+            recent = read(JsonTopicStore.RECENT_TOPICS_FILE, {})
+            if isinstance(recent, dict):
+                conn.executemany(
+                    "INSERT INTO recent_topics (chat_id, content, ts) VALUES (?, ?, ?)",
+                    [
+                        (str(chat_id), it.get("content", ""), float(it.get("ts", 0)))
+                        for chat_id, items in recent.items() if isinstance(items, list)
+                        for it in items if isinstance(it, dict) and it.get("content")
+                    ],
+                )
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated', ?)", (str(time.time()),))
+        logger.info("已完成旧版 JSON 数据到 SQLite 的迁移")
+
+    def _replace_items(self, kind: str, items: List[Dict[str, Any]]):
+        conn = self._conn
+        conn.execute("DELETE FROM items WHERE kind = ?", (kind,))
+        conn.executemany(
+            "INSERT OR REPLACE INTO items (kind, item_key, source, timestamp, data) VALUES (?, ?, ?, ?, ?)",
+            [
+                (kind, TopicItemIndex._doc_id(item), str(item.get("source", "")),
+                 float(item.get("timestamp", 0)), json.dumps(item, ensure_ascii=False))
+                for item in items if isinstance(item, dict)
+            ],
+        )
+
+    async def load_items(self, kind: str, since: float = 0, source: Optional[str] = None) -> List[Dict[str, Any]]:
+        def query():
+            sql = "SELECT data FROM items WHERE kind = ? AND timestamp >= ?"
+            params: List[Any] = [kind, since]
+            if source is not None:
+                sql += " AND source = ?"
+                params.append(source)
+            rows = self._db().execute(sql + " ORDER BY rowid", params).fetchall()
+            return [json.loads(row[0]) for row in rows]
+        return await self._run(query)
+
+    async def save_items(self, kind: str, items: List[Dict[str, Any]]):
+        def write():
+            with self._db():
+                self._replace_items(kind, items)
+        await self._run(write)
+
+    async def get_last_update(self, kind: str) -> float:
+        def query():
+            row = self._db().execute("SELECT ts FROM last_update WHERE kind = ?", (kind,)).fetchone()
+            return float(row[0]) if row else 0.0
+        return await self._run(query)
+
+    async def set_last_update(self, kind: str, ts: float):
+        def write():
+            with self._db() as conn:
+                conn.execute("INSERT OR REPLACE INTO last_update (kind, ts) VALUES (?, ?)", (kind, ts))
+        await self._run(write)
+
+    async def load_recent_topics(self, chat_id: str, since: float = 0) -> List[Dict[str, Any]]:
+        def query():
+            rows = self._db().execute(
+                "SELECT content, ts FROM recent_topics WHERE chat_id = ? AND ts >= ? ORDER BY ts",
+                (str(chat_id), since),
+            ).fetchall()
+            return [{"content": content, "ts": ts} for content, ts in rows]
+        return await self._run(query)
+
+    async def add_recent_topic(self, chat_id: str, content: str, ts: float, max_keep: int):
+        def write():
+            with self._db() as conn:
+                conn.execute(
+                    "INSERT INTO recent_topics (chat_id, content, ts) VALUES (?, ?, ?)",
+                    (str(chat_id), content, ts),
+                )
+                conn.execute(
+                    "DELETE FROM recent_topics WHERE chat_id = ? AND id NOT IN "
+                    "(SELECT id FROM recent_topics WHERE chat_id = ? ORDER BY ts DESC LIMIT ?)",
+                    (str(chat_id), str(chat_id), max_keep),
+                )
+        await self._run(write)
+
+    async def get_validators(self, url: str) -> Dict[str, str]:
+        def query():
+            row = self._db().execute(
+                "SELECT etag, last_modified FROM validators WHERE url = ?", (url,)
+            ).fetchone()
+            return {"etag": row[0], "last_modified": row[1]} if row else {}
+        return await self._run(query)
+
+    async def set_validators(self, url: str, etag: Optional[str], last_modified: Optional[str]):
+        def write():
+            with self._db() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO validators (url, etag, last_modified, updated_at) VALUES (?, ?, ?, ?)",
+                    (url, etag or "", last_modified or "", time.time()),
+                )
+        await self._run(write)
+
+    async def load_send_times(self) -> Dict[str, float]:
+        def query():
+            return {chat_id: ts for chat_id, ts in self._db().execute("SELECT chat_id, ts FROM send_times")}
+        return await self._run(query)
+
+    async def set_send_time(self, chat_id: str, ts: float):
+        def write():
+            with self._db() as conn:
+                conn.execute("INSERT OR REPLACE INTO send_times (chat_id, ts) VALUES (?, ?)", (str(chat_id), ts))
+        await self._run(write)
+
+    async def get_meta(self, key: str, default: Any = None) -> Any:
+        def query():
+            row = self._db().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+            return json.loads(row[0]) if row else default
+        return await self._run(query)
+
+    async def set_meta(self, key: str, value: Any):
+        def write():
+            with self._db() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False)),
+                )
+        await self._run(write)
+
+    async def close(self):
+        def shutdown():
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        await self._run(shutdown)
+        self._executor.shutdown(wait=False)
+
+
+def create_topic_store(data_dir: Path, backend: str = "sqlite", write_debounce_seconds: float = 2.0,
+                       cache_format: str = "json"):
+    """按配置创建存储后端：sqlite（默认）或 json（旧版文件格式，缓存文件格式可选 json/binary）"""
+    if str(backend).lower() == "json":
+        return JsonTopicStore(data_dir, write_debounce_seconds=write_debounce_seconds, cache_format=cache_format)
+    if str(cache_format).lower() != "json":
+        logger.warning(f"storage.cache_format = {cache_format!r} 仅对 json 后端生效，sqlite 后端将忽略该配置")
+    return SQLiteTopicStore(data_dir)
+
+
+def _freeze_config_value(value: Any) -> Any:
+    """递归冻结配置值：字典转只读映射，列表转元组"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze_config_value(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze_config_value(v) for v in value)
+    return value
+
+
+def _config_type_matches(expected: Any, value: Any) -> bool:
+    """按 ConfigField 声明的类型校验配置值：整数可用于浮点字段，布尔值不视为数字"""
+    if expected is None or not isinstance(expected, type):
+        return True
+    if expected is float:
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    if expected is int:
+        return isinstance(value, int) and not isinstance(value, bool)
+    return isinstance(value, expected)
+
+
+def validate_config(raw: Dict[str, Any], schema: Dict[str, Dict[str, Any]]) -> Tuple[Dict[str, Any], List[str]]:
+    """按 config_schema 校验原始配置并补全缺省值，返回 (合并后的配置, 错误列表)；schema 外的节原样保留"""
+    errors: List[str] = []
+    merged: Dict[str, Any] = {}
+    raw = raw if isinstance(raw, dict) else {}
+    for section, fields in schema.items():
+        if not isinstance(fields, dict):
+            # 整节作为单个字段声明（如 group_overrides）
+            value = raw.get(section, getattr(fields, "default", None))
+            if section in raw and not _config_type_matches(getattr(fields, "type", None), value):
+                errors.append(f"[{section}] 类型应为 {getattr(fields.type, '__name__', fields.type)}")
+            merged[section] = value
+            continue
+        values = raw.get(section, {})
+        if not isinstance(values, dict):
+            errors.append(f"[{section}] 应为表")
+            values = {}
+        section_out = dict(values)
+        for name, field in fields.items():
+            if name not in values:
+                section_out[name] = getattr(field, "default", None)
+                continue
+            value = values[name]
+            expected = getattr(field, "type", None)
+            if not _config_type_matches(expected, value):
+                errors.append(f"{section}.{name} 类型应为 {getattr(expected, '__name__', expected)}，实际为 {type(value).__name__}")
+                continue
+            choices = getattr(field, "choices", None)
+            if choices and value not in choices:
+                errors.append(f"{section}.{name} 取值应为 {list(choices)} 之一")
+        merged[section] = section_out
+    for section, values in raw.items():
+        merged.setdefault(section, values)
+    return merged, errors
+
+
+class ConfigSnapshot:
+    """不可变的配置快照
+
+    构建时冻结全部取值并展开 "节.键" 索引，组件按引用持有快照、O(1) 读取；
+    热重载时整体替换引用，进行中的刷新在开始时取得的旧快照上完成。
+    """
+
+    __slots__ = ("_values", "_sections", "version", "loaded_at")
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, version: int = 0):
+        sections = {}
+        values = {}
+        for section, content in (config or {}).items():
+            frozen = _freeze_config_value(content)
+            sections[section] = frozen
+            if isinstance(frozen, MappingProxyType):
+                for key, value in frozen.items():
+                    values[f"{section}.{key}"] = value
+        object.__setattr__(self, "_sections", sections)
+        object.__setattr__(self, "_values", values)
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "loaded_at", time.time())
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ConfigSnapshot 不可修改")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """读取 "节.键" 或整个节；更深的路径逐级查找"""
+        if key in self._values:
+            return self._values[key]
+        if key in self._sections:
+            return self._sections[key]
+        section, _, rest = key.partition(".")
+        current: Any = self._sections.get(section)
+        if current is None or not rest:
+            return default
+        for part in rest.split("."):
+            if not isinstance(current, MappingProxyType) or part not in current:
+                return default
+            current = current[part]
+        return current
+
+    def to_dict(self) -> Dict[str, Any]:
+        """还原为普通字典（供宿主 get_config 等按字典读取的代码使用）"""
+        def thaw(value: Any) -> Any:
+            if isinstance(value, MappingProxyType):
+                return {k: thaw(v) for k, v in value.items()}
+            if isinstance(value, tuple):
+                return [thaw(v) for v in value]
+            return value
+        return {section: thaw(content) for section, content in self._sections.items()}
+
+
+class ConfigReloader:
+    """轮询 config.toml 的修改时间，校验通过后生成新快照；校验失败时保留旧快照"""
+
+    def __init__(self, config_path: Path, schema: Dict[str, Dict[str, Any]]):
+        self.config_path = config_path
+        self.schema = schema
+        self._mtime: Optional[float] = None
+        self.last_error = ""
+
+    def _stat_mtime(self) -> Optional[float]:
+        try:
+            return self.config_path.stat().st_mtime
+        except OSError:
+            return None
+
+    def prime(self):
+        """记录当前文件的修改时间，作为之后比较的基准"""
+        self._mtime = self._stat_mtime()
+
+    async def poll(self, version: int) -> Optional[ConfigSnapshot]:
+        """文件有变化且校验通过时返回新快照，否则返回 None"""
+        mtime = self._stat_mtime()
+        if mtime is None or mtime == self._mtime:
+            return None
+        self._mtime = mtime
+        try:
+            raw = await asyncio.get_running_loop().run_in_executor(None, _load_toml_file, self.config_path)
+        except Exception as e:
+            self.last_error = f"解析失败: {e}"
+            logger.error(f"配置文件重载失败，继续使用旧配置: {e}")
+            return None
+        merged, errors = validate_config(raw, self.schema)
+        if errors:
+            self.last_error = "; ".join(errors)
+            logger.error(f"配置文件校验失败，继续使用旧配置: {self.last_error}")
+            return None
+        self.last_error = ""
+        return ConfigSnapshot(merged, version=version)
+
+
+class PersonaLoader:
+    """主程序人设（bot_config.toml 的 personality）加载器
+
+    文件读取与解析在线程池中执行，不阻塞事件循环；按修改时间失效，
+    每隔 check_interval_seconds 在后台检查一次，调用方始终直接拿到当前缓存的文本。
+    """
+
+    def __init__(self, config_path: Path, check_interval_seconds: float = 60):
+        self.config_path = config_path
+        self.check_interval_seconds = max(0.0, float(check_interval_seconds))
+        self.text = ""
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._loaded = False
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def _read_sync(self, known_mtime: Optional[float]) -> Tuple[Optional[float], Optional[str]]:
+        """返回 (修改时间, 人设文本)；文件未变化时文本为 None"""
+        try:
+            mtime = self.config_path.stat().st_mtime
+        except OSError:
+            return None, ""
+        if mtime == known_mtime:
+            return mtime, None
+        data = _load_toml_file(self.config_path)
+        personality = data.get("personality", {})
+        persona_text = str(personality.get("personality", "") or "").strip()
+        reply_style = str(personality.get("reply_style", "") or "").strip()
+        if reply_style:
+            persona_text = f"{persona_text}。说话风格：{reply_style}"
+        return mtime, persona_text
+
+    async def refresh(self):
+        """在线程池中检查并重新加载人设；失败时保留旧文本"""
+        self._checked_at = time.monotonic()
+        try:
+            loop = asyncio.get_running_loop()
+            mtime, text = await loop.run_in_executor(None, self._read_sync, self._mtime)
+            if text is not None:
+                if self._loaded and text != self.text:
+                    logger.info("主程序人设已更新")
+                self.text = text
+            self._mtime = mtime
+        except Exception as e:
+            logger.warning(f"读取主程序personality失败: {e}")
+        finally:
+            self._loaded = True
+
+    def preload(self) -> "asyncio.Task":
+        """启动后台加载（插件启动时调用）"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self.refresh())
+        return self._refresh_task
+
+    async def get(self) -> str:
+        """获取人设文本：首次加载时等待线程池读取完成，之后立即返回缓存并按间隔在后台检查更新"""
+        if not self._loaded:
+            await self.preload()
+        elif time.monotonic() - self._checked_at >= self.check_interval_seconds:
+            self.preload()
+        return self.text
+
+
+class FeedPollScheduler:
+    """RSS 源的自适应轮询调度：按每个源观测到的新条目速率与源/响应头给出的提示，为每个源独立计算轮询间隔
+
+    各源的下次轮询时间放在小顶堆中，刷新时只取出到期的源；状态可序列化后存入存储的元数据。
+    """
+
+    SY_PERIOD_SECONDS = {"hourly": 3600, "daily": 86400, "weekly": 604800, "monthly": 2592000, "yearly": 31536000}
+    EWMA_ALPHA = 0.5
+    IDLE_BACKOFF = 1.5
+    TARGET_NEW_ITEMS = 1.0
+
+    def __init__(self, default_interval: float = 1800, min_interval: float = 300, max_interval: float = 21600):
+        self.default_interval = default_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.states: Dict[str, Dict[str, Any]] = {}
+        self._heap: List[Tuple[float, str]] = []
+
+    def configure(self, default_interval: float, min_interval: float, max_interval: float):
+        self.min_interval = max(1.0, float(min_interval))
+        self.max_interval = max(self.min_interval, float(max_interval))
+        self.default_interval = self._clamp(default_interval)
+
+    def _clamp(self, interval: float) -> float:
+        return min(self.max_interval, max(self.min_interval, float(interval)))
+
+    def load(self, data: Optional[Dict[str, Any]]):
+        self.states = {url: dict(state) for url, state in (data or {}).items() if isinstance(state, dict)}
+        self._rebuild_heap()
+
+    def dump(self) -> Dict[str, Dict[str, Any]]:
+        return {url: dict(state) for url, state in self.states.items()}
+
+    def _rebuild_heap(self):
+        self._heap = [(float(state.get("next_poll", 0)), url) for url, state in self.states.items()]
+        heapq.heapify(self._heap)
+
+    def sync_sources(self, sources: List[str], now: float):
+        """与配置中的源列表对齐：新增的源立即到期，已移除的源丢弃状态"""
+        wanted = set(sources)
+        changed = False
+        for url in list(self.states):
+            if url not in wanted:
+                del self.states[url]
+                changed = True
+        for url in sources:
+            if url not in self.states:
+                self.states[url] = {"interval": self.default_interval, "next_poll": now, "last_poll": 0.0}
+                changed = True
+        if changed:
+            self._rebuild_heap()
+
+    def _valid(self, entry: Tuple[float, str]) -> bool:
+        """堆采用惰性删除：条目的时间与状态中的不一致时视为过期条目"""
+        next_poll, url = entry
+        state = self.states.get(url)
+        return state is not None and float(state.get("next_poll", 0)) == next_poll
+
+    def next_due(self) -> Optional[float]:
+        while self._heap and not self._valid(self._heap[0]):
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def is_due(self, now: float) -> bool:
+        next_poll = self.next_due()
+        return next_poll is not None and next_poll <= now
+
+    def pop_due(self, now: float) -> List[str]:
+        """取出所有已到期的源（按到期先后）"""
+        due = []
+        while self._heap:
+            entry = self._heap[0]
+            if not self._valid(entry):
+                heapq.heappop(self._heap)
+                continue
+            if entry[0] > now:
+                break
+            heapq.heappop(self._heap)
+            due.append(entry[1])
+        return due
+
+    def defer(self, url: str, until: float):
+        """将源的下次轮询推迟到 until 之后（失败退避/隔离时使用）"""
+        state = self.states.get(url)
+        if state is None or float(state.get("next_poll", 0)) >= until:
+            return
+        state["next_poll"] = until
+        heapq.heappush(self._heap, (until, url))
+
+    def record(self, url: str, now: float, new_items: Optional[int], hint_seconds: float = 0.0):
+        """记录一次轮询结果并安排下次轮询
+
+        new_items 为本次发现的新条目数（None 表示请求失败，保持原间隔）；hint_seconds 为源或响应头
+        声明的最短刷新间隔（ttl / sy:updatePeriod / Cache-Control），作为间隔下限。
+        """
+        state = self.states.setdefault(url, {"interval": self.default_interval, "last_poll": 0.0})
+        interval = float(state.get("interval", self.default_interval))
+        last_poll = float(state.get("last_poll", 0) or 0)
+        if new_items is not None:
+            if new_items > 0 and last_poll > 0:
+                # 期望每次轮询约拿到 TARGET_NEW_ITEMS 条新内容
+                observed = (now - last_poll) * self.TARGET_NEW_ITEMS / new_items
+                interval = self.EWMA_ALPHA * observed + (1 - self.EWMA_ALPHA) * interval
+            elif new_items == 0:
+                interval *= self.IDLE_BACKOFF
+            state["last_poll"] = now
+            state["last_new_items"] = new_items
+        interval = self._clamp(interval)
+        state["interval"] = interval
+        state["hint"] = float(hint_seconds or 0)
+        effective = self._clamp(max(interval, state["hint"]))
+        state["next_poll"] = now + effective
+        heapq.heappush(self._heap, (state["next_poll"], url))
+
+    @classmethod
+    def feed_hint_seconds(cls, feed_meta: Dict[str, Any]) -> float:
+        """从 RSS 频道信息中读取 ttl（分钟）与 sy:updatePeriod/sy:updateFrequency 提示"""
+        hints = []
+        try:
+            ttl = float(feed_meta.get("ttl") or 0)
+            if ttl > 0:
+                hints.append(ttl * 60)
+        except (TypeError, ValueError):
+            pass
+        period = str(feed_meta.get("sy_updateperiod") or "").strip().lower()
+        if period in cls.SY_PERIOD_SECONDS:
+            try:
+                frequency = max(1, int(feed_meta.get("sy_updatefrequency") or 1))
+            except (TypeError, ValueError):
+                frequency = 1
+            hints.append(cls.SY_PERIOD_SECONDS[period] / frequency)
+        return max(hints) if hints else 0.0
+
+    @staticmethod
+    def header_hint_seconds(headers: Any) -> float:
+        """从 Cache-Control max-age 或 Expires 响应头读取缓存有效期"""
+        cache_control = str(headers.get("Cache-Control", "") or "")
+        match = re.search(r"max-age\s*=\s*(\d+)", cache_control)
+        if match:
+            return float(match.group(1))
+        expires = headers.get("Expires")
+        if expires:
+            from email.utils import parsedate_to_datetime
+            try:
+                expires_at = parsedate_to_datetime(expires)
+                date_header = headers.get("Date")
+                base = parsedate_to_datetime(date_header).timestamp() if date_header else time.time()
+                return max(0.0, expires_at.timestamp() - base)
+            except (TypeError, ValueError, IndexError, OverflowError):
+                return 0.0
+        return 0.0
+
+
+class StreamingFeedParser:
+    """增量解析 RSS 2.0 / RSS 1.0 / Atom：按字节块喂入，解析满 max_items 个条目后即可停止下载
+
+    字符集在字节流上确定（BOM > Content-Type 的 charset > XML 声明 > UTF-8），用增量解码器解码后交给
+    XMLPullParser；每个条目解析完即释放其元素树。频道级的 ttl / sy:updatePeriod / sy:updateFrequency
+    以 feedparser 相同的键名记录在 meta 中。
+    """
+
+    ENTRY_TAGS = {"item", "entry"}
+    DESCRIPTION_TAGS = ("description", "summary", "encoded", "content")
+    PUBLISHED_TAGS = ("pubDate", "published", "date", "updated")
+    FEED_HINT_TAGS = {"ttl": "ttl", "updatePeriod": "sy_updateperiod", "updateFrequency": "sy_updatefrequency"}
+    SNIFF_BYTES = 1024
+    BOMS = ((b"\xef\xbb\xbf", "utf-8-sig"), (b"\xff\xfe", "utf-16"), (b"\xfe\xff", "utf-16"))
+
+    def __init__(self, max_items: int, content_type: str = ""):
+        from xml.etree import ElementTree
+        self.max_items = max_items
+        self.items: List[Dict[str, Any]] = []
+        self.meta: Dict[str, str] = {}
+        self.done = False
+        self.error: Optional[Exception] = None
+        self.encoding = ""
+        self._parser = ElementTree.XMLPullParser(events=("start", "end"))
+        self._header_charset = self._charset_from_content_type(content_type)
+        self._decoder = None
+        self._head = b""
+        self._entry: Optional[Dict[str, Any]] = None
+
+    @staticmethod
+    def _charset_from_content_type(content_type: str) -> str:
+        match = re.search(r"charset\s*=\s*[\"']?([\w.:-]+)", content_type or "", re.IGNORECASE)
+        return match.group(1) if match else ""
+
+    def _detect_encoding(self, head: bytes) -> str:
+        for bom, name in self.BOMS:
+            if head.startswith(bom):
+                return name
+        if self._header_charset:
+            return self._header_charset
+        match = re.match(rb"\s*<\?xml[^>]*?encoding\s*=\s*[\"']([\w.:-]+)[\"']", head)
+        return match.group(1).decode("ascii") if match else "utf-8"
+
+    def _make_decoder(self, encoding: str):
+        import codecs
+        try:
+            decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        except LookupError:
+            logger.debug(f"未知的RSS字符集 {encoding}，按 UTF-8 解码")
+            encoding = "utf-8"
+            decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self.encoding = encoding
+        return decoder
+
+    def feed(self, chunk: bytes):
+        """喂入一块原始字节；解析满 max_items 或出错后忽略后续输入"""
+        if self.done or self.error:
+            return
+        if self._decoder is None:
+            # 攒够开头的字节再判定字符集（XML 声明位于文档开头）
+            self._head += chunk
+            if len(self._head) < self.SNIFF_BYTES and b"?>" not in self._head:
+                return
+            chunk, self._head = self._head, b""
+            self._decoder = self._make_decoder(self._detect_encoding(chunk))
+        self._parse(self._decoder.decode(chunk))
+
+    def close(self):
+        """输入结束：处理剩余字节"""
+        if self.done or self.error:
+            return
+        if self._decoder is None:
+            if not self._head:
+                return
+            self._decoder = self._make_decoder(self._detect_encoding(self._head))
+            self._parse(self._decoder.decode(self._head, final=True))
+        else:
+            self._parse(self._decoder.decode(b"", final=True))
+
+    def _parse(self, text: str):
+        if not text:
+            return
+        try:
+            self._parser.feed(text)
+            for event, elem in self._parser.read_events():
+                self._handle(event, elem)
+                if self.done:
+                    return
+        except Exception as e:
+            self.error = e
+
+    @staticmethod
+    def _local_name(tag: Any) -> str:
+        return tag.rsplit("}", 1)[-1] if isinstance(tag, str) else ""
+
+    @staticmethod
+    def _text(elem) -> str:
+        return "".join(elem.itertext()).strip()
+
+    def _handle(self, event: str, elem):
+        name = self._local_name(elem.tag)
+        if event == "start":
+            if name in self.ENTRY_TAGS and self._entry is None:
+                self._entry = {"tags": []}
+            return
+        entry = self._entry
+        if entry is None:
+            key = self.FEED_HINT_TAGS.get(name)
+            if key:
+                self.meta[key] = self._text(elem)
+            return
+        if name in self.ENTRY_TAGS:
+            self.items.append({
+                "title": entry.get("title", ""),
+                "description": next((entry[k] for k in self.DESCRIPTION_TAGS if entry.get(k)), ""),
+                "link": entry.get("link", ""),
+                "published": next((entry[k] for k in self.PUBLISHED_TAGS if entry.get(k)), ""),
+                "tags": entry["tags"],
+            })
+            self._entry = None
+            elem.clear()
+            if len(self.items) >= self.max_items:
+                self.done = True
+        elif name == "link":
+            # Atom 的 link 在 href 属性中，优先取 rel=alternate（或未标注 rel）的链接
+            href = elem.get("href")
+            if href is None:
+                entry.setdefault("link", self._text(elem))
+            elif elem.get("rel", "alternate") == "alternate":
+                entry.setdefault("link", href)
+        elif name == "category":
+            term = elem.get("term") or self._text(elem)
+            if term:
+                entry["tags"].append(term)
+        elif name in ("title",) + self.DESCRIPTION_TAGS + self.PUBLISHED_TAGS and not entry.get(name):
+            entry[name] = self._text(elem)
+
+
+class FeedHealth:
+    """单个 RSS 源的健康记录：连续失败次数、最近错误、延迟 EWMA 与退避/隔离状态"""
+
+    FIELDS = ("consecutive_failures", "total_polls", "total_failures", "last_error", "last_error_at",
+              "last_success_at", "latency_ewma", "retry_at", "quarantined_since")
+
+    def __init__(self, url: str, data: Optional[Dict[str, Any]] = None):
+        self.url = url
+        self.consecutive_failures = 0
+        self.total_polls = 0
+        self.total_failures = 0
+        self.last_error = ""
+        self.last_error_at = 0.0
+        self.last_success_at = 0.0
+        self.latency_ewma: Optional[float] = None
+        self.retry_at = 0.0
+        self.quarantined_since = 0.0
+        for key in self.FIELDS:
+            if data and key in data:
+                setattr(self, key, data[key])
+
+    @property
+    def quarantined(self) -> bool:
+        return bool(self.quarantined_since)
+
+    def available(self, now: float) -> bool:
+        """退避或隔离期间不参与刷新；隔离的源到达探测时间后放行一次"""
+        return now >= self.retry_at
+
+    def record_success(self, now: float, latency: float):
+        if self.quarantined:
+            logger.info(f"RSS源已恢复，解除隔离: {self.url}")
+        self.total_polls += 1
+        self.consecutive_failures = 0
+        self.last_success_at = now
+        self.retry_at = 0.0
+        self.quarantined_since = 0.0
+        self.latency_ewma = latency if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latency
+
+    def record_failure(self, now: float, error: str, backoff_base: float, backoff_max: float,
+                       quarantine_after: int, probe_interval: float):
+        """记录失败：按连续失败次数指数退避；达到阈值后进入隔离，仅按探测间隔重试"""
+        self.total_polls += 1
+        self.total_failures += 1
+        self.consecutive_failures += 1
+        self.last_error = error
+        self.last_error_at = now
+        if quarantine_after > 0 and self.consecutive_failures >= quarantine_after:
+            if not self.quarantined:
+                self.quarantined_since = now
+                logger.warning(f"RSS源连续失败 {self.consecutive_failures} 次，已隔离: {self.url}, 最近错误: {error}")
+            self.retry_at = now + probe_interval
+        else:
+            self.retry_at = now + min(backoff_max, backoff_base * (2 ** (self.consecutive_failures - 1)))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: getattr(self, key) for key in self.FIELDS}
+
+
+class FeedHealthTracker:
+    """按源管理 FeedHealth，可序列化后存入存储的元数据"""
+
+    def __init__(self):
+        self.records: Dict[str, FeedHealth] = {}
+
+    def load(self, data: Optional[Dict[str, Any]]):
+        self.records = {url: FeedHealth(url, state) for url, state in (data or {}).items() if isinstance(state, dict)}
+
+    def dump(self) -> Dict[str, Dict[str, Any]]:
+        return {url: record.to_dict() for url, record in self.records.items()}
+
+    def sync_sources(self, sources: List[str]):
+        wanted = set(sources)
+        for url in list(self.records):
+            if url not in wanted:
+                del self.records[url]
+
+    def get(self, url: str) -> FeedHealth:
+        record = self.records.get(url)
+        if record is None:
+            record = self.records[url] = FeedHealth(url)
+        return record
+
+
 class RSSManager:
     """RSS订阅管理器"""
     
-    def __init__(self, plugin_dir: Path, config: Dict[str, Any]):
+    POLL_STATE_KEY = "rss_poll_state"
+    HEALTH_STATE_KEY = "rss_health"
+    READ_CHUNK_BYTES = 16384
+
+    def __init__(self, plugin_dir: Path, config: Any, item_index: Optional[TopicItemIndex] = None,
+                 store=None):
         self.plugin_dir = plugin_dir
-        self.config = config
-        self.cache_file = plugin_dir / "data" / "rss_cache.json"
-        self.last_update_file = plugin_dir / "data" / "last_update.json"
-        
-        # 确保数据目录存在
-        (plugin_dir / "data").mkdir(exist_ok=True)
-    
-    async def update_rss_feeds(self) -> List[Dict[str, Any]]:
-        """更新RSS订阅源"""
+        # 配置快照：热重载时由插件整体替换引用
+        self.config = config if isinstance(config, ConfigSnapshot) else ConfigSnapshot(config)
+        self.item_index = item_index
+        self._index_warmed = False
+        self.store = store or JsonTopicStore(plugin_dir / "data")
+        self.scheduler = FeedPollScheduler()
+        self.health = FeedHealthTracker()
+        self._schedule_loaded = False
+
+    async def _load_schedule(self, config: ConfigSnapshot) -> FeedPollScheduler:
+        """按当前配置更新调度参数；首次调用时从存储恢复各源的轮询状态与健康记录"""
+        default_interval = config.get("rss.update_interval_minutes", 30) * 60
+        max_interval = min(config.get("rss.max_poll_minutes", 360) * 60, config.get("rss.cache_hours", 6) * 3600)
+        self.scheduler.configure(default_interval, config.get("rss.min_poll_minutes", 5) * 60, max_interval)
+        if not self._schedule_loaded:
+            try:
+                self.scheduler.load(await self.store.get_meta(self.POLL_STATE_KEY, {}))
+                self.health.load(await self.store.get_meta(self.HEALTH_STATE_KEY, {}))
+            except Exception as e:
+                logger.warning(f"读取RSS轮询状态失败: {e}")
+            self._schedule_loaded = True
+        sources = list(config.get("rss.sources", []))
+        self.scheduler.sync_sources(sources, time.time())
+        self.health.sync_sources(sources)
+        return self.scheduler
+
+    async def _save_schedule(self):
+        try:
+            await self.store.set_meta(self.POLL_STATE_KEY, self.scheduler.dump())
+            await self.store.set_meta(self.HEALTH_STATE_KEY, self.health.dump())
+        except Exception as e:
+            logger.error(f"保存RSS轮询状态失败: {e}")
+
+    @staticmethod
+    def _item_key(item: Dict[str, Any]) -> str:
+        return item.get("link") or item.get("title", "")
+
+    async def _read_feed(self, response, source_url: str, max_items: int, max_bytes: int
+                         ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """流式读取响应体并增量解析，解析满 max_items 个条目或达到字节上限即停止下载
+
+        XML 不规范（如含 HTML 实体）导致解析失败时，在字节上限内读完响应体后交给 feedparser 容错解析。
+        """
+        parser = StreamingFeedParser(max_items, response.headers.get("Content-Type", ""))
+        raw = bytearray()
+        truncated = False
+        feedparser = None
+        parse_seconds = 0.0
+        async for chunk in response.content.iter_chunked(self.READ_CHUNK_BYTES):
+            remaining = max_bytes - len(raw)
+            if len(chunk) > remaining:
+                chunk = chunk[:remaining]
+                truncated = True
+            raw += chunk
+            started = time.perf_counter()
+            parser.feed(chunk)
+            parse_seconds += time.perf_counter() - started
+            if parser.error and feedparser is None:
+                # feedparser 仅在容错解析时才导入
+                feedparser = _optional_import("feedparser") or False
+            if parser.done or truncated or (parser.error and not feedparser):
+                break
+        else:
+            started = time.perf_counter()
+            parser.close()
+            parse_seconds += time.perf_counter() - started
+            if parser.error and feedparser is None:
+                feedparser = _optional_import("feedparser") or False
+        if truncated and not parser.done:
+            logger.warning(f"RSS源超过下载上限 {max_bytes // 1024} KB，已截断: {source_url}")
+
+        if parser.error is None or parser.done:
+            metrics.observe("rss_parse_seconds", parse_seconds, source=source_url)
+            return parser.items, parser.meta
+        if not feedparser:
+            metrics.observe("rss_parse_seconds", parse_seconds, source=source_url)
+            logger.warning(f"RSS源XML解析失败且未安装feedparser，仅保留已解析的 {len(parser.items)} 条: {source_url}, 错误: {parser.error}")
+            return parser.items, parser.meta
+        logger.debug(f"RSS源XML解析失败，改用feedparser: {source_url}, 错误: {parser.error}")
+        started = time.perf_counter()
+        feed = feedparser.parse(bytes(raw), response_headers={"content-type": response.headers.get("Content-Type", "")})
+        metrics.observe("rss_parse_seconds", parse_seconds + time.perf_counter() - started, source=source_url)
+        entries = [
+            {
+                "title": entry.get("title", ""),
+                "description": entry.get("description", ""),
+                "link": entry.get("link", ""),
+                "published": entry.get("published", ""),
+                "tags": [t.get("term", "") for t in entry.get("tags", []) if t.get("term")],
+            }
+            for entry in feed.entries[:max_items]
+        ]
+        return entries, feed.get("feed", {})
+
+    @staticmethod
+    def _record_fetch(record: FeedHealth, source_url: str, status: str, now: float, latency: float):
+        record.record_success(now, latency)
+        metrics.observe("rss_fetch_seconds", latency, source=source_url)
+        metrics.inc("rss_fetch_total", source=source_url, status=status)
+
+    async def _poll_source(self, config: ConfigSnapshot, source_url: str, max_items: int, max_bytes: int, aiohttp
+                           ) -> Tuple[List[Dict[str, Any]], Optional[int], float]:
+        """拉取单个源并更新其健康记录，返回 (条目, 新条目数, 刷新间隔提示秒数)；失败时新条目数为 None 并沿用已缓存条目"""
+        previous = await self.store.load_items("rss", source=source_url)
+        record = self.health.get(source_url)
+        started = time.monotonic()
+        hint = 0.0
+        try:
+            logger.debug(f"获取RSS源: {source_url}")
+            # 条件请求：携带上次的 ETag / Last-Modified，未变化时复用已缓存条目
+            validators = await self.store.get_validators(source_url)
+            headers = {}
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+            async with aiohttp.ClientSession() as session:
+                timeout = aiohttp.ClientTimeout(total=config.get("rss.request_timeout_seconds", 30))
+                async with session.get(source_url, timeout=timeout, headers=headers) as response:
+                    hint = FeedPollScheduler.header_hint_seconds(response.headers)
+                    if response.status == 304:
+                        logger.debug(f"RSS源未变化: {source_url}")
+                        if not previous:
+                            # 本地已无该源条目，清除校验信息以便下次完整拉取
+                            await self.store.set_validators(source_url, None, None)
+                        now = time.time()
+                        for item in previous:
+                            item["timestamp"] = now
+                        self._record_fetch(record, source_url, "not_modified", now, time.monotonic() - started)
+                        return previous, 0, hint
+                    if response.status == 200:
+                        entries, feed_meta = await self._read_feed(response, source_url, max_items, max_bytes)
+                        hint = max(hint, FeedPollScheduler.feed_hint_seconds(feed_meta))
+
+                        now = time.time()
+                        items = [dict(entry, source=source_url, timestamp=now) for entry in entries]
+
+                        etag = response.headers.get("ETag")
+                        last_modified = response.headers.get("Last-Modified")
+                        if etag or last_modified:
+                            await self.store.set_validators(source_url, etag, last_modified)
+                        known = {self._item_key(item) for item in previous}
+                        new_items = sum(1 for item in items if self._item_key(item) not in known)
+                        self._record_fetch(record, source_url, "ok", now, time.monotonic() - started)
+                        metrics.inc("rss_items_total", len(items), source=source_url)
+                        return items, new_items, hint
+                    error = f"HTTP {response.status}"
+        except Exception as e:
+            # 超时等异常的 str() 可能为空，记录异常类型
+            error = str(e) or type(e).__name__
+        logger.warning(f"获取RSS源失败: {source_url}, 错误: {error}")
+        metrics.observe("rss_fetch_seconds", time.monotonic() - started, source=source_url)
+        metrics.inc("rss_fetch_total", source=source_url, status="error")
+        record.record_failure(
+            time.time(), error,
+            backoff_base=config.get("rss.failure_backoff_minutes", 5) * 60,
+            backoff_max=config.get("rss.max_backoff_minutes", 120) * 60,
+            quarantine_after=config.get("rss.quarantine_after_failures", 5),
+            probe_interval=config.get("rss.quarantine_probe_minutes", 360) * 60,
+        )
+        return previous, None, hint
+
+    async def update_rss_feeds(self, force: bool = False) -> List[Dict[str, Any]]:
+        """更新RSS订阅源：自适应轮询时只拉取已到期的源，其余源沿用缓存条目；force 为 True 时拉取全部源"""
+        # 整个刷新过程使用同一份配置快照，期间发生的重载不影响本次刷新
+        config = self.config
         # 开关：未启用则直接返回
-        if not self.config.get("rss", {}).get("enable_rss", True):
+        if not config.get("rss.enable_rss", True):
             logger.debug("RSS 功能未启用，跳过更新")
             return []
-        if not feedparser:
-            logger.warning("feedparser未安装，无法解析RSS，将使用备用话题")
-            return []
-
+        aiohttp = _optional_import("aiohttp")
         if not aiohttp:
             logger.warning("aiohttp未安装，无法获取RSS内容，将使用备用话题")
             return []
 
+        sources = list(config.get("rss.sources", []))
+        max_items = config.get("rss.max_items_per_source", 10)
+        max_bytes = max(1, int(config.get("rss.max_download_kb", 2048))) * 1024
+        scheduler = await self._load_schedule(config)
+        now = time.time()
+        if config.get("rss.adaptive_polling", True) and not force:
+            due = scheduler.pop_due(now)
+        else:
+            due = sources
+        # 退避或隔离中的源跳过本次刷新（隔离的源到达探测时间时放行一次），保留其已缓存条目
+        skipped = [url for url in due if not self.health.get(url).available(now)]
+        for url in skipped:
+            scheduler.defer(url, self.health.get(url).retry_at)
+        due = [url for url in due if url not in skipped]
+        due_set = set(due)
+
+        # 未到期的源保留已缓存条目
         all_items = []
-        sources = self.config.get("rss", {}).get("sources", [])
-        max_items = self.config.get("rss", {}).get("max_items_per_source", 10)
+        try:
+            all_items = [
+                item for item in await self.store.load_items("rss")
+                if item.get("source") in sources and item.get("source") not in due_set
+            ]
+        except Exception as e:
+            logger.error(f"读取RSS缓存失败: {e}")
 
-        for source_url in sources:
-            try:
-                logger.debug(f"获取RSS源: {source_url}")
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(source_url, timeout=30) as response:
-                        if response.status == 200:
-                            content = await response.text()
-                            feed = feedparser.parse(content)
-
-                            for entry in feed.entries[:max_items]:
-                                item = {
-                                    "title": entry.get("title", ""),
-                                    "description": entry.get("description", ""),
-                                    "link": entry.get("link", ""),
-                                    "published": entry.get("published", ""),
-                                    "source": source_url,
-                                    "timestamp": time.time()
-                                }
-                                all_items.append(item)
-                        else:
-                            logger.warning(f"RSS源获取失败: {source_url}, 状态码: {response.status}")
-            except Exception as e:
-                logger.error(f"获取RSS源失败: {source_url}, 错误: {e}")
+        fetched = []
+        refresh_started = time.perf_counter()
+        for source_url in due:
+            items, new_items, hint = await self._poll_source(config, source_url, max_items, max_bytes, aiohttp)
+            scheduler.record(source_url, time.time(), new_items, hint)
+            if new_items is not None:
+                fetched.extend(items)
+            else:
+                scheduler.defer(source_url, self.health.get(source_url).retry_at)
+            all_items.extend(items)
+        if due:
+            metrics.observe("rss_refresh_seconds", time.perf_counter() - refresh_started)
+        metrics.set("rss_sources_quarantined", sum(1 for url in sources if self.health.get(url).quarantined))
 
         # 保存到缓存
         await self._save_cache(all_items)
         await self._update_last_update_time()
+        await self._save_schedule()
+        self._index_items(fetched)
 
-        logger.info(f"RSS更新完成，获取到 {len(all_items)} 条内容")
+        logger.info(f"RSS更新完成，轮询 {len(due)}/{len(sources)} 个源（跳过退避/隔离 {len(skipped)} 个），"
+                    f"缓存 {len(all_items)} 条内容")
         return all_items
     
+    async def health_report(self) -> List[Dict[str, Any]]:
+        """各源的健康记录与轮询计划（按配置中的源顺序）"""
+        config = self.config
+        scheduler = await self._load_schedule(config)
+        report = []
+        for url in config.get("rss.sources", []):
+            state = scheduler.states.get(url, {})
+            report.append(dict(self.health.get(url).to_dict(), url=url,
+                               interval=state.get("interval"), next_poll=state.get("next_poll")))
+        return report
+
     async def get_cached_items(self, max_age_hours: int = 6) -> List[Dict[str, Any]]:
         """获取缓存的RSS内容"""
         try:
-            if not self.cache_file.exists():
-                return []
-            
-            async with aiofiles.open(self.cache_file, 'r', encoding='utf-8') as f:
-                content = await f.read()
-                items = json.loads(content)
-            
             # 过滤过期内容
             current_time = time.time()
             max_age_seconds = max_age_hours * 3600
             
-            valid_items = [
-                item for item in items
-                if current_time - item.get("timestamp", 0) < max_age_seconds
-            ]
+            valid_items = await self.store.load_items("rss", since=current_time - max_age_seconds)
+
+            # 首次读取缓存时预热索引（之后由更新增量维护）
+            if not self._index_warmed:
+                self._index_items(valid_items)
             
             return valid_items
         except Exception as e:
             logger.error(f"读取RSS缓存失败: {e}")
             return []
+
+    def _index_items(self, items: List[Dict[str, Any]]):
+        """将资讯写入倒排索引"""
+        if self.item_index is None:
+            return
+        cache_hours = self.config.get("rss.cache_hours", 6)
+        self.item_index.add_items(items, kind="rss", ttl_seconds=cache_hours * 3600)
+        self._index_warmed = True
     
     async def _save_cache(self, items: List[Dict[str, Any]]):
         """保存RSS缓存"""
         try:
-            async with aiofiles.open(self.cache_file, 'w', encoding='utf-8') as f:
-                await f.write(json.dumps(items, ensure_ascii=False, indent=2))
+            await self.store.save_items("rss", items)
         except Exception as e:
             logger.error(f"保存RSS缓存失败: {e}")
     
     async def _update_last_update_time(self):
         """更新最后更新时间"""
         try:
-            data = {"last_update": time.time()}
-            async with aiofiles.open(self.last_update_file, 'w', encoding='utf-8') as f:
-                await f.write(json.dumps(data))
+            await self.store.set_last_update("rss", time.time())
         except Exception as e:
             logger.error(f"更新最后更新时间失败: {e}")
     
@@ -160,17 +1966,17 @@ class RSSManager:
         """检查是否需要更新RSS"""
         try:
             # 开关：未启用则不更新
-            if not self.config.get("rss", {}).get("enable_rss", True):
+            if not self.config.get("rss.enable_rss", True):
                 return False
-            if not self.last_update_file.exists():
-                return True
-            
-            async with aiofiles.open(self.last_update_file, 'r', encoding='utf-8') as f:
-                content = await f.read()
-                data = json.loads(content)
-            
-            last_update = data.get("last_update", 0)
-            update_interval = self.config.get("rss", {}).get("update_interval_minutes", 30) * 60
+
+            config = self.config
+            if config.get("rss.adaptive_polling", True):
+                # 自适应轮询：任一源到期即需要更新
+                scheduler = await self._load_schedule(config)
+                return scheduler.is_due(time.time())
+
+            last_update = await self.store.get_last_update("rss")
+            update_interval = config.get("rss.update_interval_minutes", 30) * 60
             
             return time.time() - last_update > update_interval
         except Exception as e:
@@ -178,21 +1984,177 @@ class RSSManager:
             return True
 
 
+class WebLLMProvider:
+    """单个联网大模型端点：连接参数、每小时配额、权重与健康状态"""
+
+    # 连续失败后的冷却时间：基准 60 秒，按失败次数指数增长，最长 30 分钟
+    COOLDOWN_BASE_SECONDS = 60
+    COOLDOWN_MAX_SECONDS = 1800
+
+    def __init__(self, name: str, base_url: str, api_key: str, model_name: str, weight: float = 1.0,
+                 quota_per_hour: int = 0, temperature: Optional[float] = None, max_tokens: Optional[int] = None):
+        self.name = name
+        self.base_url = (base_url or "").rstrip('/')
+        self.api_key = api_key or ""
+        self.model_name = model_name
+        self.weight = max(0.01, float(weight))
+        self.quota_per_hour = max(0, int(quota_per_hour))
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self.last_error = ""
+        self.latency_ewma: Optional[float] = None
+        self._recent_requests: "deque[float]" = deque()
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.base_url and self.api_key and self.api_key != "your-api-key-here")
+
+    def quota_left(self, now: float) -> Optional[int]:
+        """最近一小时内剩余可用请求数；不限配额时返回 None"""
+        if not self.quota_per_hour:
+            return None
+        while self._recent_requests and self._recent_requests[0] <= now - 3600:
+            self._recent_requests.popleft()
+        return self.quota_per_hour - len(self._recent_requests)
+
+    def available(self, now: float) -> bool:
+        if not self.configured or now < self.cooldown_until:
+            return False
+        left = self.quota_left(now)
+        return left is None or left > 0
+
+    def begin(self, now: float):
+        self.outstanding += 1
+        if self.quota_per_hour:
+            self._recent_requests.append(now)
+
+    def finish(self, ok: bool, latency: Optional[float] = None, error: str = "", retry_after: Optional[float] = None):
+        self.outstanding = max(0, self.outstanding - 1)
+        if ok:
+            self.consecutive_failures = 0
+            self.cooldown_until = 0.0
+            if latency is not None:
+                self.latency_ewma = latency if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latency
+            return
+        self.consecutive_failures += 1
+        self.last_error = error
+        cooldown = min(self.COOLDOWN_MAX_SECONDS,
+                       self.COOLDOWN_BASE_SECONDS * (2 ** (self.consecutive_failures - 1)))
+        if retry_after is not None:
+            cooldown = max(cooldown, retry_after)
+        self.cooldown_until = time.time() + cooldown
+
+
+class WebLLMProviderPool:
+    """联网大模型端点池：在健康且有配额的端点间负载均衡（最少在途请求 / 按权重随机）"""
+
+    def __init__(self):
+        self.providers: List[WebLLMProvider] = []
+        self._signature: Any = None
+
+    def configure(self, web_config: Any):
+        """按配置构建端点列表；未配置 providers 时使用 base_url/api_key/model_name（可被环境变量覆盖）作为唯一端点
+
+        配置未变化时不重建；同名端点保留其健康状态与在途计数。
+        """
+        providers_config = list(web_config.get("providers", ()) or ())
+        env_base_url = os.getenv("WEB_LLM_BASE_URL")
+        env_api_key = os.getenv("WEB_LLM_API_KEY")
+        signature = (repr(providers_config), web_config.get("base_url", ""), web_config.get("api_key", ""),
+                     web_config.get("model_name", ""), env_base_url, env_api_key)
+        if signature == self._signature:
+            return
+        self._signature = signature
+
+        previous = {p.name: p for p in self.providers}
+        providers: List[WebLLMProvider] = []
+        if not providers_config:
+            providers_config = [{
+                "name": "default",
+                "base_url": env_base_url or web_config.get("base_url", ""),
+                "api_key": env_api_key or web_config.get("api_key", ""),
+                "model_name": web_config.get("model_name", "gpt-3.5-turbo"),
+            }]
+        for i, entry in enumerate(providers_config):
+            if not hasattr(entry, "get"):
+                logger.warning(f"忽略无效的联网大模型端点配置: {entry}")
+                continue
+            name = str(entry.get("name") or f"provider{i + 1}")
+            api_key = entry.get("api_key", "")
+            if entry.get("api_key_env"):
+                api_key = os.getenv(str(entry.get("api_key_env")), "") or api_key
+            provider = WebLLMProvider(
+                name=name,
+                base_url=entry.get("base_url", ""),
+                api_key=api_key,
+                model_name=entry.get("model_name") or web_config.get("model_name", "gpt-3.5-turbo"),
+                weight=entry.get("weight", 1.0),
+                quota_per_hour=entry.get("quota_per_hour", 0),
+                temperature=entry.get("temperature"),
+                max_tokens=entry.get("max_tokens"),
+            )
+            old = previous.get(name)
+            if old is not None:
+                provider.outstanding = old.outstanding
+                provider.consecutive_failures = old.consecutive_failures
+                provider.cooldown_until = old.cooldown_until
+                provider.last_error = old.last_error
+                provider.latency_ewma = old.latency_ewma
+                provider._recent_requests = old._recent_requests
+            providers.append(provider)
+        self.providers = providers
+
+    def available(self) -> List[WebLLMProvider]:
+        now = time.time()
+        return [p for p in self.providers if p.available(now)]
+
+    def pick(self, count: int = 1, strategy: str = "least_outstanding",
+             exclude: Optional[set] = None) -> List[WebLLMProvider]:
+        """挑选至多 count 个可用端点（互不相同）"""
+        candidates = [p for p in self.available() if not exclude or p.name not in exclude]
+        if count <= 0 or not candidates:
+            return []
+        if strategy == "weighted":
+            # 按权重无放回抽样：key = random^(1/weight) 越大越优先
+            ranked = sorted(candidates, key=lambda p: random.random() ** (1.0 / p.weight), reverse=True)
+        else:
+            # 在途请求数按权重折算，相同时随机打散
+            ranked = sorted(candidates, key=lambda p: (p.outstanding / p.weight, random.random()))
+        return ranked[:count]
+
+    def stats(self) -> List[Dict[str, Any]]:
+        now = time.time()
+        return [{
+            "name": p.name,
+            "model": p.model_name,
+            "healthy": now >= p.cooldown_until,
+            "outstanding": p.outstanding,
+            "failures": p.consecutive_failures,
+            "quota_left": p.quota_left(now),
+            "latency": p.latency_ewma,
+            "last_error": p.last_error,
+        } for p in self.providers]
+
+
 class WebLLMManager:
     """联网大模型管理器"""
 
-    def __init__(self, plugin_dir: Path, config: Dict[str, Any]):
+    def __init__(self, plugin_dir: Path, config: Any, item_index: Optional[TopicItemIndex] = None,
+                 store=None):
         self.plugin_dir = plugin_dir
-        self.config = config
-        self.cache_file = plugin_dir / "data" / "web_info_cache.json"
-        self.last_update_file = plugin_dir / "data" / "web_last_update.json"
-
-        # 确保数据目录存在
-        (plugin_dir / "data").mkdir(exist_ok=True)
+        # 配置快照：热重载时由插件整体替换引用
+        self.config = config if isinstance(config, ConfigSnapshot) else ConfigSnapshot(config)
+        self.item_index = item_index
+        self._index_warmed = False
+        self.store = store or JsonTopicStore(plugin_dir / "data")
+        self.pool = WebLLMProviderPool()
 
     async def get_web_info(self, force_refresh: bool = False) -> List[Dict[str, Any]]:
         """获取联网信息"""
-        if not self.config.get("web_llm", {}).get("enable_web_llm", False):
+        if not self.config.get("web_llm.enable_web_llm", False):
             logger.debug("联网大模型功能未启用")
             return []
 
@@ -202,17 +2164,22 @@ class WebLLMManager:
             return await self.get_cached_info()
 
         try:
-            # 首先检查API可用性
-            if not await self._check_api_availability():
-                logger.warning("联网大模型API不可用，返回缓存信息")
+            # 没有健康、有配额的端点时直接使用缓存（端点健康由实际请求结果维护，无需额外探测）
+            self.pool.configure(self.config.get("web_llm", {}))
+            if not self.pool.available():
+                logger.warning("没有可用的联网大模型端点（未配置、冷却中或配额用尽），返回缓存信息")
                 return await self.get_cached_info()
 
             # 调用联网大模型获取信息
             web_info = await self._fetch_web_info(force_refresh=force_refresh)
+            if not web_info:
+                logger.warning("联网大模型未返回有效信息，返回缓存信息")
+                return await self.get_cached_info()
 
             # 保存到缓存
             await self._save_cache(web_info)
             await self._update_last_update_time()
+            self._index_items(web_info)
 
             logger.info(f"联网信息获取成功，获取到 {len(web_info)} 条信息")
             return web_info
@@ -223,73 +2190,51 @@ class WebLLMManager:
             return await self.get_cached_info()
 
     async def _check_api_availability(self) -> bool:
-        """检查API可用性"""
+        """检查API可用性：并行探测所有已配置端点，任一可连通即返回 True"""
+        aiohttp = _optional_import("aiohttp")
         if not aiohttp:
             logger.warning("aiohttp未安装，无法检查API可用性")
             return False
 
-        web_config = self.config.get("web_llm", {})
-        import os
-        base_url = os.getenv("WEB_LLM_BASE_URL") or web_config.get("base_url", "")
-        api_key = os.getenv("WEB_LLM_API_KEY") or web_config.get("api_key", "")
-
-        if not base_url or not api_key or api_key == "your-api-key-here":
+        self.pool.configure(self.config.get("web_llm", {}))
+        providers = [p for p in self.pool.providers if p.configured]
+        if not providers:
             logger.warning("联网大模型配置不完整")
             return False
 
-        base_url = base_url.rstrip('/')
-
-        try:
-            # 尝试简单的连接测试
-            timeout = aiohttp.ClientTimeout(total=10)  # 较短的超时时间用于快速检测
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                # 先尝试基础URL的连接
-                test_url = f"{base_url}/models"  # 通常OpenAI兼容的API都有这个端点
-                headers = {
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json"
-                }
-
-                async with session.get(test_url, headers=headers) as response:
+        async def probe(session, provider: WebLLMProvider) -> bool:
+            # 通常OpenAI兼容的API都有 /models 端点
+            headers = {
+                "Authorization": f"Bearer {provider.api_key}",
+                "Content-Type": "application/json"
+            }
+            try:
+                async with session.get(f"{provider.base_url}/models", headers=headers) as response:
                     if response.status in [200, 401, 403]:  # 200成功，401/403表示连接成功但认证问题
-                        logger.debug(f"API连接测试成功，状态码: {response.status}")
+                        logger.debug(f"API连接测试成功[{provider.name}]，状态码: {response.status}")
                         return True
-                    else:
-                        logger.warning(f"API连接测试失败，状态码: {response.status}")
-                        return False
+                    logger.warning(f"API连接测试失败[{provider.name}]，状态码: {response.status}")
+                    return False
+            except aiohttp.ClientConnectorError:
+                logger.warning(f"API连接失败[{provider.name}]: 无法连接到 {provider.base_url}")
+                return False
+            except asyncio.TimeoutError:
+                logger.warning(f"API连接超时[{provider.name}]: {provider.base_url}")
+                return False
+            except Exception as e:
+                logger.warning(f"API可用性检查异常[{provider.name}]: {e}")
+                return False
 
-        except aiohttp.ClientConnectorError as e:
-            logger.warning(f"API连接失败: 无法连接到 {base_url}")
-            return False
-        except aiohttp.ClientTimeout as e:
-            logger.warning(f"API连接超时: {base_url}")
-            return False
-        except Exception as e:
-            logger.warning(f"API可用性检查异常: {e}")
-            return False
+        # 较短的超时时间用于快速检测
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10)) as session:
+            results = await asyncio.gather(*(probe(session, p) for p in providers))
+        return any(results)
 
-    async def _fetch_web_info(self, force_refresh: bool = False) -> List[Dict[str, Any]]:
-        """调用联网大模型获取信息"""
-        if not aiohttp:
-            logger.warning("aiohttp未安装，无法调用联网大模型")
-            return []
-
-        web_config = self.config.get("web_llm", {})
-        import os
-        # 允许通过环境变量覆盖，避免明文写入配置文件
-        base_url = os.getenv("WEB_LLM_BASE_URL") or web_config.get("base_url", "")
-        api_key = os.getenv("WEB_LLM_API_KEY") or web_config.get("api_key", "")
-        model_name = web_config.get("model_name", "gpt-3.5-turbo")
-        # 如果是强制刷新（测试），使用更高的温度值增加随机性
-        base_temperature = web_config.get("temperature", 0.8)
-        temperature = min(1.0, base_temperature + 0.2) if force_refresh else base_temperature
-        max_tokens = web_config.get("max_tokens", 500)
-        timeout = web_config.get("timeout_seconds", 30)
-        prompt_template = web_config.get("web_info_prompt", "请提供最新的热点信息")
+    def _build_web_prompt(self, web_config: Any, force_refresh: bool = False) -> str:
+        """构造联网信息获取 prompt：插入当前日期时间，并加入少量随机性"""
+        prompt_template = web_config.get("web_info_prompt", "") or "请提供最新的热点信息"
 
         # 插入当前日期和时间，增加随机性
-        from datetime import datetime
-        import random
         current_date = datetime.now().strftime("%Y年%m月%d日")
         current_time = datetime.now().strftime("%H:%M")
 
@@ -307,76 +2252,235 @@ class WebLLMManager:
                 random_suffix = f"（{time_suffix}情况）"
 
         try:
-            prompt = prompt_template.format(
+            return prompt_template.format(
                 current_date=current_date,
                 current_time=current_time
             ) + random_suffix
         except KeyError:
-            prompt = prompt_template + f"（{current_date} {current_time}）" + random_suffix
+            return prompt_template + f"（{current_date} {current_time}）" + random_suffix
 
-        if not base_url or not api_key or api_key == "your-api-key-here":
-            logger.warning("联网大模型配置不完整，跳过调用。请检查 base_url 和 api_key 配置")
+    async def _fetch_web_info(self, force_refresh: bool = False) -> List[Dict[str, Any]]:
+        """调用联网大模型获取信息：从端点池中选取多个端点并行请求，合并去重"""
+        aiohttp = _optional_import("aiohttp")
+        if not aiohttp:
+            logger.warning("aiohttp未安装，无法调用联网大模型")
             return []
 
-        # 清理URL，确保格式正确
-        base_url = base_url.rstrip('/')
-        api_url = f"{base_url}/chat/completions"
+        web_config = self.config.get("web_llm", {})
+        if str(web_config.get("fetch_mode", "single")).lower() == "category":
+            return await self._fetch_by_category(web_config, force_refresh)
+        self.pool.configure(web_config)
+        # 如果是强制刷新（测试），使用更高的温度值增加随机性
+        base_temperature = web_config.get("temperature", 0.8)
+        temperature = min(1.0, base_temperature + 0.2) if force_refresh else base_temperature
+        max_tokens = web_config.get("max_tokens", 500)
+        timeout = web_config.get("timeout_seconds", 30)
+        strategy = str(web_config.get("balance_strategy", "least_outstanding")).lower()
+        fanout = max(1, int(web_config.get("parallel_providers", 2)))
+        prompt = self._build_web_prompt(web_config, force_refresh)
+
+        providers = self.pool.pick(fanout, strategy)
+        if not providers:
+            logger.warning("联网大模型配置不完整或端点均不可用，跳过调用。请检查 base_url 和 api_key 配置")
+            return []
+
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+            results = await asyncio.gather(*(
+                self._query_provider(session, p, prompt, temperature, max_tokens) for p in providers
+            ))
+            if not any(results):
+                # 所选端点全部失败：换用其余可用端点再试一轮
+                fallback = self.pool.pick(fanout, strategy, exclude={p.name for p in providers})
+                if fallback:
+                    logger.info(f"联网大模型端点均失败，改用: {', '.join(p.name for p in fallback)}")
+                    results += await asyncio.gather(*(
+                        self._query_provider(session, p, prompt, temperature, max_tokens) for p in fallback
+                    ))
+        return self._merge_results(results)
+
+    DEFAULT_CATEGORIES = ("科技", "娱乐", "体育", "财经", "社会", "国际", "文化", "健康")
+    DEFAULT_CATEGORY_PROMPT = (
+        "请联网搜索{current_date} {current_time}前后{category}领域最新的{count}条热点资讯，"
+        "每条按以下格式输出，条目之间用 --- 分隔：\n标题：xxx\n描述：一句话概括"
+    )
+    CATEGORY_STATE_KEY = "web_category_updates"
+
+    def _category_ttls(self, web_config: Any) -> Dict[str, float]:
+        """各分类的刷新间隔（秒）：category_ttl_minutes 中未列出的分类使用 web_info_update_interval"""
+        default_minutes = web_config.get("web_info_update_interval", 20)
+        overrides = web_config.get("category_ttl_minutes", {}) or {}
+        categories = list(web_config.get("categories", ()) or self.DEFAULT_CATEGORIES)
+        return {c: float(overrides.get(c, default_minutes)) * 60 for c in categories}
+
+    async def _stale_categories(self, web_config: Any) -> List[str]:
+        """超过各自刷新间隔的分类"""
+        updates = await self.store.get_meta(self.CATEGORY_STATE_KEY, {}) or {}
+        now = time.time()
+        return [c for c, ttl in self._category_ttls(web_config).items() if now - float(updates.get(c, 0)) >= ttl]
+
+    async def _fetch_by_category(self, web_config: Any, force_refresh: bool = False) -> List[Dict[str, Any]]:
+        """分类分片获取：每个到期分类发送一个更小、更聚焦的 prompt，在并发上限内并行请求
+
+        结果带分类标签；未到期或本次失败的分类保留缓存中的旧条目，只有成功刷新的分类会被替换。
+        没有任何分类刷新成功时返回空列表，由调用方返回缓存且不推进最后更新时间。
+        """
+        aiohttp = _optional_import("aiohttp")
+        self.pool.configure(web_config)
+        ttls = self._category_ttls(web_config)
+        stale = list(ttls) if force_refresh else await self._stale_categories(web_config)
+        if not stale:
+            return []
+        cached = await self.store.load_items("web")
+
+        count = max(1, int(web_config.get("items_per_category", 3)))
+        max_tokens = web_config.get("category_max_tokens", 300)
+        temperature = web_config.get("temperature", 0.8)
+        strategy = str(web_config.get("balance_strategy", "least_outstanding")).lower()
+        template = web_config.get("category_prompt", "") or self.DEFAULT_CATEGORY_PROMPT
+        semaphore = asyncio.Semaphore(max(1, int(web_config.get("max_concurrent_queries", 3))))
+        current_date = datetime.now().strftime("%Y年%m月%d日")
+        current_time = datetime.now().strftime("%H:%M")
+
+        async def fetch(session, category: str) -> Tuple[str, List[Dict[str, Any]]]:
+            try:
+                prompt = template.format(category=category, count=count,
+                                         current_date=current_date, current_time=current_time)
+            except (KeyError, IndexError):
+                prompt = f"{template}（{category}，{current_date} {current_time}）"
+            async with semaphore:
+                tried: set = set()
+                # 失败时换一个端点重试一次
+                for _ in range(2):
+                    providers = self.pool.pick(1, strategy, exclude=tried)
+                    if not providers:
+                        break
+                    items = await self._query_provider(session, providers[0], prompt, temperature, max_tokens)
+                    if items:
+                        for item in items:
+                            item["category"] = category
+                            item["tags"] = [category]
+                        return category, items[:count]
+                    tried.add(providers[0].name)
+            return category, []
 
-        logger.debug(f"尝试调用联网大模型API: {api_url}")
-        logger.debug(f"使用模型: {model_name}")
+        timeout = web_config.get("timeout_seconds", 30)
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+            results = await asyncio.gather(*(fetch(session, c) for c in stale))
+
+        refreshed = {category: items for category, items in results if items}
+        failed = [category for category, items in results if not items]
+        if failed:
+            logger.warning(f"联网信息分类刷新失败，保留旧条目: {', '.join(failed)}")
+        if not refreshed:
+            return []
+        updates = await self.store.get_meta(self.CATEGORY_STATE_KEY, {}) or {}
+        now = time.time()
+        for category in refreshed:
+            updates[category] = now
+        await self.store.set_meta(self.CATEGORY_STATE_KEY, updates)
+
+        # 新条目在前，未刷新分类的旧条目（未过期的）在后
+        max_age = web_config.get("web_info_cache_hours", 2) * 3600
+        now = time.time()
+        kept = [item for item in cached
+                if item.get("category") not in refreshed and now - item.get("timestamp", 0) < max_age]
+        logger.info(f"联网信息分类刷新: 成功 {len(refreshed)}/{len(stale)} 个分类")
+        return self._merge_results(list(refreshed.values()) + [kept])
+
+    async def _query_provider(self, session, provider: WebLLMProvider, prompt: str, temperature: float,
+                              max_tokens: int) -> List[Dict[str, Any]]:
+        """向单个端点请求一次并解析结果；成功/失败计入该端点的健康状态"""
+        aiohttp = _optional_import("aiohttp")
+        api_url = f"{provider.base_url}/chat/completions"
+        logger.debug(f"尝试调用联网大模型API[{provider.name}]: {api_url}，模型: {provider.model_name}")
 
         headers = {
-            "Authorization": f"Bearer {api_key}",
+            "Authorization": f"Bearer {provider.api_key}",
             "Content-Type": "application/json"
         }
-
         data = {
-            "model": model_name,
+            "model": provider.model_name,
             "messages": [
                 {"role": "user", "content": prompt}
             ],
-            "temperature": temperature,
-            "max_tokens": max_tokens
+            "temperature": provider.temperature if provider.temperature is not None else temperature,
+            "max_tokens": provider.max_tokens or max_tokens
         }
 
+        started = time.monotonic()
+        provider.begin(time.time())
+        status = "error"
         try:
-            # 首先测试网络连接
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
-                logger.debug("开始发送API请求...")
-                async with session.post(api_url, headers=headers, json=data) as response:
-                    logger.debug(f"API响应状态码: {response.status}")
-
-                    if response.status == 200:
-                        result = await response.json()
-                        logger.debug(f"API响应内容: {result}")
-
-                        content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
-                        logger.debug(f"提取的内容: {content[:200]}...")
-
-                        # 解析返回的内容
+            async with session.post(api_url, headers=headers, json=data) as response:
+                logger.debug(f"API响应状态码[{provider.name}]: {response.status}")
+                if response.status == 200:
+                    result = await response.json()
+                    content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
+                    logger.debug(f"提取的内容[{provider.name}]: {content[:200]}...")
+
+                    # 解析返回的内容
+                    with metrics.timer("web_llm_parse_seconds"):
                         parsed_info = self._parse_web_info(content)
-                        logger.info(f"成功解析联网信息，获得 {len(parsed_info)} 条信息")
-                        return parsed_info
-                    else:
-                        # 读取错误响应内容
-                        error_text = await response.text()
-                        logger.error(f"联网大模型调用失败，状态码: {response.status}")
-                        logger.error(f"错误响应: {error_text}")
-                        return []
+                    for item in parsed_info:
+                        item["provider"] = provider.name
+                    status = "ok" if parsed_info else "empty"
+                    provider.finish(bool(parsed_info), time.monotonic() - started, "" if parsed_info else "返回内容为空")
+                    logger.info(f"成功解析联网信息[{provider.name}]，获得 {len(parsed_info)} 条信息")
+                    return parsed_info
+
+                # 读取错误响应内容；限流时遵循 Retry-After 冷却
+                error_text = await response.text()
+                status = f"http_{response.status}"
+                retry_after = None
+                if response.status == 429:
+                    try:
+                        retry_after = float(response.headers.get("Retry-After", ""))
+                    except ValueError:
+                        retry_after = None
+                provider.finish(False, error=f"HTTP {response.status}", retry_after=retry_after)
+                logger.error(f"联网大模型调用失败[{provider.name}]，状态码: {response.status}")
+                logger.error(f"错误响应: {error_text[:500]}")
+                return []
 
         except aiohttp.ClientConnectorError as e:
-            logger.error(f"联网大模型连接失败: 无法连接到 {base_url}，请检查网络连接和URL配置")
+            status = "connect_error"
+            provider.finish(False, error="连接失败")
+            logger.error(f"联网大模型连接失败[{provider.name}]: 无法连接到 {provider.base_url}，请检查网络连接和URL配置")
             logger.error(f"连接错误详情: {e}")
             return []
-        except aiohttp.ClientTimeout as e:
-            logger.error(f"联网大模型请求超时: {timeout}秒，请检查网络连接或增加超时时间")
+        except asyncio.TimeoutError:
+            status = "timeout"
+            provider.finish(False, error="请求超时")
+            logger.error(f"联网大模型请求超时[{provider.name}]，请检查网络连接或增加超时时间")
             return []
         except aiohttp.ClientResponseError as e:
-            logger.error(f"联网大模型HTTP错误: {e.status} - {e.message}")
+            provider.finish(False, error=f"HTTP {e.status}")
+            logger.error(f"联网大模型HTTP错误[{provider.name}]: {e.status} - {e.message}")
             return []
         except Exception as e:
-            logger.error(f"联网大模型调用异常: {type(e).__name__}: {e}")
+            provider.finish(False, error=f"{type(e).__name__}: {e}")
+            logger.error(f"联网大模型调用异常[{provider.name}]: {type(e).__name__}: {e}")
             return []
+        finally:
+            metrics.observe("web_llm_request_seconds", time.monotonic() - started, provider=provider.name)
+            metrics.inc("web_llm_requests_total", provider=provider.name, status=status)
+
+    @staticmethod
+    def _merge_results(results: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """合并多个端点的结果，按归一化标题去重（保留先出现的一条）"""
+        merged: List[Dict[str, Any]] = []
+        seen: set = set()
+        for items in results:
+            for item in items:
+                key = re.sub(r"[\W_]+", "", str(item.get("title", "")).lower())
+                if not key:
+                    continue
+                if key in seen:
+                    metrics.inc("dedup_hits_total", kind="web_merge")
+                    continue
+                seen.add(key)
+                merged.append(item)
+        return merged
 
     def _parse_web_info(self, content: str) -> List[Dict[str, Any]]:
         """解析联网大模型返回的信息，支持多种格式"""
@@ -579,23 +2683,14 @@ class WebLLMManager:
     async def get_cached_info(self) -> List[Dict[str, Any]]:
         """获取缓存的联网信息"""
         try:
-            if not self.cache_file.exists():
-                logger.debug("联网信息缓存文件不存在")
+            items = await self.store.load_items("web")
+            if not items:
+                logger.debug("联网信息缓存为空")
                 return []
 
-            if not aiofiles:
-                # 如果aiofiles不可用，使用同步方式
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    items = json.loads(content)
-            else:
-                async with aiofiles.open(self.cache_file, 'r', encoding='utf-8') as f:
-                    content = await f.read()
-                    items = json.loads(content)
-
             # 过滤过期内容和时间戳错误的内容
             current_time = time.time()
-            cache_hours = self.config.get("web_llm", {}).get("web_info_cache_hours", 2)
+            cache_hours = self.config.get("web_llm.web_info_cache_hours", 2)
             max_age_seconds = cache_hours * 3600
 
             valid_items = []
@@ -613,56 +2708,51 @@ class WebLLMManager:
             logger.debug(f"联网信息缓存检查: 总数={len(items)}, 有效数={len(valid_items)}, "
                         f"缓存时长={cache_hours}小时")
 
+            if not self._index_warmed:
+                self._index_items(valid_items)
+
             return valid_items
 
         except Exception as e:
             logger.error(f"读取联网信息缓存失败: {e}")
             return []
 
+    def _index_items(self, items: List[Dict[str, Any]]):
+        """将联网信息写入倒排索引"""
+        if self.item_index is None:
+            return
+        cache_hours = self.config.get("web_llm.web_info_cache_hours", 2)
+        self.item_index.add_items(items, kind="web", ttl_seconds=cache_hours * 3600)
+        self._index_warmed = True
+
     async def _save_cache(self, items: List[Dict[str, Any]]):
         """保存联网信息缓存"""
         try:
-            if not aiofiles:
-                # 如果aiofiles不可用，使用同步方式
-                with open(self.cache_file, 'w', encoding='utf-8') as f:
-                    f.write(json.dumps(items, ensure_ascii=False, indent=2))
-            else:
-                async with aiofiles.open(self.cache_file, 'w', encoding='utf-8') as f:
-                    await f.write(json.dumps(items, ensure_ascii=False, indent=2))
+            await self.store.save_items("web", items)
         except Exception as e:
             logger.error(f"保存联网信息缓存失败: {e}")
 
     async def _update_last_update_time(self):
         """更新最后更新时间"""
         try:
-            data = {"last_update": time.time()}
-            if not aiofiles:
-                with open(self.last_update_file, 'w', encoding='utf-8') as f:
-                    f.write(json.dumps(data))
-            else:
-                async with aiofiles.open(self.last_update_file, 'w', encoding='utf-8') as f:
-                    await f.write(json.dumps(data))
+            await self.store.set_last_update("web", time.time())
         except Exception as e:
             logger.error(f"更新联网信息最后更新时间失败: {e}")
 
     async def should_update(self) -> bool:
         """检查是否需要更新联网信息"""
         try:
-            if not self.last_update_file.exists():
-                logger.debug("联网信息更新文件不存在，需要更新")
+            # 分类分片模式：任一分类到期即需要（增量）更新
+            web_config = self.config.get("web_llm", {})
+            if str(web_config.get("fetch_mode", "single")).lower() == "category":
+                return bool(await self._stale_categories(web_config))
+
+            last_update = await self.store.get_last_update("web")
+            if not last_update:
+                logger.debug("联网信息尚无更新记录，需要更新")
                 return True
 
-            if not aiofiles:
-                with open(self.last_update_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    data = json.loads(content)
-            else:
-                async with aiofiles.open(self.last_update_file, 'r', encoding='utf-8') as f:
-                    content = await f.read()
-                    data = json.loads(content)
-
-            last_update = data.get("last_update", 0)
-            update_interval = self.config.get("web_llm", {}).get("web_info_update_interval", 20) * 60
+            update_interval = self.config.get("web_llm.web_info_update_interval", 20) * 60
             current_time = time.time()
 
             # 防止时间戳错误导致的问题：如果last_update是未来时间，强制更新
@@ -691,60 +2781,240 @@ class WebLLMManager:
             return True
 
 
+class GenerationRouter:
+    """话题生成路由：按顺序尝试多个模型，记录各模型延迟，并对慢请求发起对冲
+
+    首个模型在其历史 p95 延迟内未返回时并行启动下一个模型，取最先得到的有效回答并取消其余请求；
+    某个模型失败时立即改用下一个模型。
+    """
+
+    # 样本不足时不估计 p95，使用默认对冲延迟
+    MIN_LATENCY_SAMPLES = 5
+
+    def __init__(self, history_size: int = 50):
+        self.history_size = max(self.MIN_LATENCY_SAMPLES, int(history_size))
+        self._latencies: Dict[str, "deque[float]"] = {}
+        self.counters: Dict[str, Dict[str, int]] = {}
+        self.hedges_fired = 0
+        self.hedges_won = 0
+
+    def _counter(self, model: str) -> Dict[str, int]:
+        return self.counters.setdefault(model, {"ok": 0, "failed": 0, "cancelled": 0})
+
+    def record(self, model: str, latency: Optional[float], ok: bool):
+        """记录一次请求结果；只有成功请求的延迟计入统计"""
+        self._counter(model)["ok" if ok else "failed"] += 1
+        metrics.inc("generation_requests_total", model=model, status="ok" if ok else "failed")
+        if ok and latency is not None:
+            history = self._latencies.setdefault(model, deque(maxlen=self.history_size))
+            history.append(latency)
+            metrics.observe("generation_model_seconds", latency, model=model)
+
+    def percentile(self, model: str, q: float) -> Optional[float]:
+        history = self._latencies.get(model)
+        if not history or len(history) < self.MIN_LATENCY_SAMPLES:
+            return None
+        ordered = sorted(history)
+        index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+        return ordered[index]
+
+    def hedge_delay(self, model: str, default_delay: float, min_delay: float, max_delay: float) -> float:
+        """对冲延迟：取该模型的 p95 延迟并限制在 [min_delay, max_delay]，样本不足时使用默认值"""
+        p95 = self.percentile(model, 0.95)
+        delay = default_delay if p95 is None else p95
+        return max(min_delay, min(max_delay, delay))
+
+    async def _call(self, name: str, model_config: Any, prompt: str, request_kwargs: Dict[str, Any],
+                    timeout: float) -> Optional[str]:
+        started = time.monotonic()
+        try:
+            success, response, _, _ = await asyncio.wait_for(
+                llm_api.generate_with_model(prompt=prompt, model_config=model_config, **request_kwargs),
+                timeout=timeout,
+            )
+        except asyncio.CancelledError:
+            self._counter(name)["cancelled"] += 1
+            metrics.inc("generation_requests_total", model=name, status="cancelled")
+            raise
+        except asyncio.TimeoutError:
+            logger.warning(f"话题生成模型 {name} 超时（{timeout} 秒）")
+            self.record(name, None, False)
+            return None
+        except Exception as e:
+            logger.warning(f"话题生成模型 {name} 调用失败: {e}")
+            self.record(name, None, False)
+            return None
+        text = response.strip() if success and response else ""
+        self.record(name, time.monotonic() - started, bool(text))
+        return text or None
+
+    async def generate(self, prompt: str, model_names: List[str], request_kwargs: Dict[str, Any],
+                       hedge: bool = True, default_delay: float = 8.0, min_delay: float = 2.0,
+                       max_delay: float = 20.0, timeout: float = 45.0) -> Optional[str]:
+        """依次/对冲调用模型，返回第一个有效回答；全部失败时返回 None"""
+        available = llm_api.get_available_models() or {}
+        chain = [(name, available[name]) for name in model_names if available.get(name)]
+        missing = [name for name in model_names if not available.get(name)]
+        if missing:
+            logger.debug(f"未找到话题生成模型配置: {', '.join(missing)}")
+        if not chain:
+            logger.warning(f"未找到可用的话题生成模型（{', '.join(model_names)}）")
+            return None
+
+        running: Dict[asyncio.Task, str] = {}
+        hedge_tasks: set = set()
+        next_index = 0
+
+        def launch() -> asyncio.Task:
+            nonlocal next_index
+            name, model_config = chain[next_index]
+            next_index += 1
+            task = asyncio.create_task(self._call(name, model_config, prompt, request_kwargs, timeout))
+            running[task] = name
+            return task
+
+        launch()
+        try:
+            while running:
+                wait_timeout = None
+                if hedge and next_index < len(chain):
+                    wait_timeout = self.hedge_delay(chain[next_index - 1][0], default_delay, min_delay, max_delay)
+                done, _ = await asyncio.wait(running, timeout=wait_timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # 最近启动的模型超过其 p95 仍未返回：对冲启动下一个模型，先返回者胜出
+                    self.hedges_fired += 1
+                    metrics.inc("generation_hedges_total", outcome="fired")
+                    logger.debug(f"话题生成模型 {chain[next_index - 1][0]} 超过 {wait_timeout:.1f} 秒未返回，"
+                                 f"对冲请求 {chain[next_index][0]}")
+                    hedge_tasks.add(launch())
+                    continue
+                for task in done:
+                    running.pop(task)
+                    result = task.result()
+                    if result:
+                        if task in hedge_tasks:
+                            self.hedges_won += 1
+                            metrics.inc("generation_hedges_total", outcome="won")
+                        return result
+                    # 失败：立即改用下一个模型
+                    if next_index < len(chain):
+                        launch()
+            return None
+        finally:
+            for task in running:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        result = {}
+        for name, counter in self.counters.items():
+            result[name] = dict(counter)
+            result[name]["p50"] = self.percentile(name, 0.5)
+            result[name]["p95"] = self.percentile(name, 0.95)
+        return result
+
+
 class TopicGenerator:
     """话题生成器"""
 
-    def __init__(self, config: Dict[str, Any]):
-        self.config = config
+    def __init__(self, config: Any, item_index: Optional[TopicItemIndex] = None):
+        # 配置快照：热重载时由插件整体替换引用
+        self.config = config if isinstance(config, ConfigSnapshot) else ConfigSnapshot(config)
+        self.item_index = item_index
+        self._prompt_cache_key: Optional[Tuple[str, str]] = None
+        self.router = GenerationRouter()
+        self._prompt_cache: Tuple[str, str, int] = ("", "", 0)
+
+    def candidate_items(self, kind: str, items: List[Dict[str, Any]], weights: Dict[str, float],
+                        limit: int = 4) -> List[Dict[str, Any]]:
+        """按加权关键词（如群聊兴趣画像）从索引中挑选候选资讯，索引缺失或无命中时原样返回"""
+        if not weights or not items or self.item_index is None:
+            return items
+        ranked = self.item_index.match_weights(weights, k=limit, kind=kind)
+        return ranked or items
     
+    # 未读取到主程序人设时使用的默认人设（仅用于默认模板）
+    DEFAULT_PERSONA = "你是 MaiBot（有点高冷、玩世不恭的混沌女孩）。"
+
+    DEFAULT_PROMPT_TEMPLATE = (
+        "{persona}\n"
+        "基于下列资讯生成一条能抓住注意力的中文话题钩子：\n"
+        "- 仅输出一句话，不要解释/前后缀/引号/标签/链接\n"
+        "- 26~40 字，包含一个核心名词或趋势词\n"
+        "- 语气克制、轻挑，避免冒犯与敏感内容\n\n"
+        "资讯：\n{rss_content}\n\n"
+        "输出："
+    )
+
+    # 资讯部分的最低 token 预算
+    MIN_CONTENT_TOKENS = 64
+
+    def _prompt_parts(self, persona: Optional[str]) -> Tuple[str, str, int]:
+        """将模板拆为 (资讯之前的前缀, 资讯之后的后缀, 二者估算 token 数)，按 (模板, 人设) 缓存
+
+        人设与模板固定文本全部位于前缀中，资讯只出现在末尾；同一人设下每次调用的前缀逐字相同，
+        支持前缀缓存的服务商可以命中缓存。模板缺少 {rss_content} 时资讯追加在末尾。
+        """
+        template = self.config.get("topic_generation.topic_prompt", "") or self.DEFAULT_PROMPT_TEMPLATE
+        key = (template, persona or "")
+        if self._prompt_cache_key == key:
+            return self._prompt_cache
+        persona_text = (persona or "").strip()
+        if not persona_text and template == self.DEFAULT_PROMPT_TEMPLATE:
+            persona_text = self.DEFAULT_PERSONA
+        prefix, marker, suffix = template.partition("{rss_content}")
+        if not marker:
+            prefix, suffix = template + "\n\n", ""
+
+        # 注入 persona：按字面替换，模板中的其他花括号（如 JSON 示例）原样保留；
+        # 模板未包含 {persona} 时人设放在前缀开头，仍位于每次相同的固定部分
+        if "{persona}" in template:
+            prefix = prefix.replace("{persona}", persona_text)
+            suffix = suffix.replace("{persona}", persona_text)
+        elif persona_text:
+            prefix = f"{persona_text}\n\n{prefix}"
+        self._prompt_cache_key = key
+        self._prompt_cache = (prefix, suffix, _estimate_tokens(prefix) + _estimate_tokens(suffix))
+        return self._prompt_cache
+
+    def build_prompt(self, rss_items: List[Dict[str, Any]], web_info: List[Dict[str, Any]],
+                     persona: Optional[str] = None) -> str:
+        """组装话题生成 prompt：资讯按输入 token 预算扣除固定前后缀后的余量填充；无可用资讯时返回空字符串"""
+        prefix, suffix, overhead = self._prompt_parts(persona)
+        budget = int(self.config.get("topic_generation.max_input_tokens", 700)) - overhead
+        if budget < self.MIN_CONTENT_TOKENS:
+            # 模板与人设已占满预算时仍保留少量资讯，避免每次都退回备用话题
+            logger.debug(f"prompt 固定部分约 {overhead} token，超出输入预算，资讯按 {self.MIN_CONTENT_TOKENS} token 填充")
+            budget = self.MIN_CONTENT_TOKENS
+        content = self._prepare_content(rss_items, web_info, token_budget=budget)
+        if not content:
+            return ""
+        return f"{prefix}{content}{suffix}"
+
     async def generate_topic(self, rss_items: List[Dict[str, Any]], web_info: List[Dict[str, Any]] = None, persona: Optional[str] = None) -> str:
         """生成话题"""
         try:
-            # 准备内容（RSS + 联网信息）
-            content = self._prepare_content(rss_items, web_info or [])
+            # 组装 prompt（固定前缀 + 按 token 预算挑选的 RSS/联网资讯）
+            prompt = self.build_prompt(rss_items, web_info or [], persona)
 
-            if not content:
+            if not prompt:
                 return self._get_fallback_topic()
 
-            # 获取prompt模板
-            prompt_template = self.config.get("topic_generation", {}).get(
-                "topic_prompt",
-                (
-                    "你是 MaiBot（有点高冷、玩世不恭的混沌女孩）。\n"
-                    "基于下列资讯生成一条能抓住注意力的中文话题钩子：\n"
-                    "- 仅输出一句话，不要解释/前后缀/引号/标签/链接\n"
-                    "- 26~40 字，包含一个核心名词或趋势词\n"
-                    "- 语气克制、轻挑，避免冒犯与敏感内容\n\n"
-                    "资讯：\n{rss_content}\n\n"
-                    "输出："
+            # 按模型链调用LLM生成话题（慢请求对冲、失败自动切换），默认使用主要回复模型
+            config = self.config
+            with metrics.timer("generation_seconds"):
+                response = await self.router.generate(
+                    prompt,
+                    list(config.get("topic_generation.models", ()) or ("replyer",)),
+                    {"request_type": "topic.generate", "temperature": 0.9, "max_tokens": 50},
+                    hedge=config.get("topic_generation.enable_hedging", True),
+                    default_delay=config.get("topic_generation.hedge_default_delay_seconds", 8.0),
+                    min_delay=config.get("topic_generation.hedge_min_delay_seconds", 2.0),
+                    max_delay=config.get("topic_generation.hedge_max_delay_seconds", 20.0),
+                    timeout=config.get("topic_generation.model_timeout_seconds", 45.0),
                 )
-            )
-
-            # 注入 persona（若模板未包含 {persona} 也可兼容）
-            try:
-                prompt = prompt_template.format(rss_content=content, persona=persona or "")
-            except KeyError:
-                prompt = prompt_template.format(rss_content=content)
-
-            # 获取可用模型
-            models = llm_api.get_available_models()
-            model_config = models.get("replyer")  # 使用主要回复模型生成话题
-
-            if not model_config:
-                logger.warning("未找到'replyer'模型配置，使用备用话题")
-                return self._get_fallback_topic()
-
-            # 调用LLM生成话题
-            success, response, _, _ = await llm_api.generate_with_model(
-                prompt=prompt,
-                model_config=model_config,
-                request_type="topic.generate",
-                temperature=0.9,
-                max_tokens=50
-            )
 
-            if success and response and response.strip():
-                return response.strip()
+            if response:
+                return response
             else:
                 logger.warning(f"LLM生成话题失败或为空，使用备用话题")
                 return self._get_fallback_topic()
@@ -752,58 +3022,96 @@ class TopicGenerator:
         except Exception as e:
             logger.error(f"生成话题失败: {e}")
             return self._get_fallback_topic()
-    
-    def _prepare_content(self, rss_items: List[Dict[str, Any]], web_info: List[Dict[str, Any]]) -> str:
-        """准备内容用于生成话题（RSS + 联网信息），支持合并策略与跨来源去重"""
-        content_parts: List[str] = []
 
+    @staticmethod
+    def _item_score(item: Dict[str, Any], now: float) -> float:
+        """资讯得分：时效（12 小时半衰）加随机扰动，保持话题多样性"""
+        ts = item.get("timestamp", now)
+        published = item.get("published")
+        if published:
+            from email.utils import parsedate_to_datetime  # 导入较慢，按需导入
+            try:
+                ts = parsedate_to_datetime(published).timestamp()
+            except (TypeError, ValueError, IndexError, OverflowError):
+                pass
+        age_hours = max(0.0, (now - float(ts or now)) / 3600)
+        return 0.5 ** (age_hours / 12) + random.random() * 0.5
+
+    def _prepare_content(self, rss_items: List[Dict[str, Any]], web_info: List[Dict[str, Any]],
+                         token_budget: Optional[int] = None) -> str:
+        """准备内容用于生成话题（RSS + 联网信息），支持合并策略与跨来源去重
+
+        候选资讯按得分从高到低贪心放入：先放标题，再用剩余预算放截断后的描述，直到 token 预算或条数用尽。
+        """
         # 合并策略：merge / prefer_rss / prefer_web
-        combine_strategy = (
-            self.config.get("topic_generation", {}).get("combine_strategy", "merge")
-        )
+        combine_strategy = self.config.get("topic_generation.combine_strategy", "merge")
         if not isinstance(combine_strategy, str):
             combine_strategy = "merge"
         combine_strategy = combine_strategy.lower()
 
+        if token_budget is None:
+            token_budget = int(self.config.get("topic_generation.max_input_tokens", 700))
+        max_items = max(1, int(self.config.get("topic_generation.max_items", 4)))
+        desc_tokens = int(self.config.get("topic_generation.description_max_tokens", 80))
+
         def norm_title(t: str) -> str:
             t = (t or "").strip().lower()
             for ch in [" ", "\t", "\n", "-", "_", ",", ".", "!", "?", ":", "；", "，", "。", "！", "？", "：", "·", "—", "~"]:
                 t = t.replace(ch, "")
             return t
 
-        seen: set[str] = set()
-
-        # 处理RSS内容
+        sections = []
         if rss_items and combine_strategy in ("merge", "prefer_rss"):
-            selected_rss = random.sample(rss_items, min(2, len(rss_items)))
-            content_parts.append("RSS资讯:")
-            for item in selected_rss:
-                title = item.get("title", "")
-                description = item.get("description", "")[:150]
-                key = norm_title(title)
-                if title and key not in seen:
-                    content_parts.append(f"- {title}")
-                    if description:
-                        content_parts.append(f"  {description}")
-                    seen.add(key)
-            content_parts.append("")
-
-        # 处理联网信息
+            sections.append(("RSS资讯:", rss_items))
         if web_info and combine_strategy in ("merge", "prefer_web"):
-            selected_web = random.sample(web_info, min(2, len(web_info)))
-            content_parts.append("联网热点:")
-            for item in selected_web:
-                title = item.get("title", "")
-                description = item.get("description", "")[:150]
-                key = norm_title(title)
-                if title and key not in seen:
-                    content_parts.append(f"- {title}")
-                    if description:
-                        content_parts.append(f"  {description}")
-                    seen.add(key)
-            content_parts.append("")
-
-        return "\n".join(content_parts) if content_parts else ""
+            sections.append(("联网热点:", web_info))
+        if not sections:
+            return ""
+
+        now = time.time()
+        candidates = []
+        for section_no, (_, items) in enumerate(sections):
+            for item in items:
+                candidates.append((self._item_score(item, now), section_no, item))
+        candidates.sort(key=lambda c: c[0], reverse=True)
+
+        # 每个分节标题与换行的固定开销
+        remaining = token_budget - sum(_estimate_tokens(header) + 1 for header, _ in sections)
+        chosen: List[List[str]] = [[] for _ in sections]
+        seen: set[str] = set()
+        count = 0
+        for _, section_no, item in candidates:
+            if count >= max_items:
+                break
+            title = (item.get("title") or "").strip()
+            key = norm_title(title)
+            if not title:
+                continue
+            if key in seen:
+                metrics.inc("dedup_hits_total", kind="cross_source")
+                continue
+            title_line = f"- {title}"
+            cost = _estimate_tokens(title_line) + 1
+            if cost > remaining:
+                continue
+            remaining -= cost
+            lines = chosen[section_no]
+            lines.append(title_line)
+            description = _HTML_TAG_RE.sub("", item.get("description") or "").strip()
+            description = _truncate_to_tokens(" ".join(description.split()), min(desc_tokens, remaining - 2))
+            if description:
+                lines.append(f"  {description}")
+                remaining -= _estimate_tokens(description) + 2
+            seen.add(key)
+            count += 1
+
+        content_parts: List[str] = []
+        for (header, _), lines in zip(sections, chosen):
+            if lines:
+                content_parts.append(header)
+                content_parts.extend(lines)
+                content_parts.append("")
+        return "\n".join(content_parts)
 
     def _prepare_rss_content(self, rss_items: List[Dict[str, Any]]) -> str:
         """准备RSS内容用于生成话题（保持向后兼容）"""
@@ -811,7 +3119,8 @@ class TopicGenerator:
     
     def _get_fallback_topic(self) -> str:
         """获取备用话题"""
-        fallback_topics = self.config.get("topic_generation", {}).get("fallback_topics", [
+        metrics.inc("fallback_topics_total")
+        fallback_topics = self.config.get("topic_generation.fallback_topics", [
             "今天天气不错呢，大家都在忙什么？ ☀️",
             "最近有什么好看的电影或剧推荐吗？ 🎬",
             "周末有什么有趣的计划吗？ 🎉"
@@ -820,23 +3129,662 @@ class TopicGenerator:
         return random.choice(fallback_topics) if fallback_topics else "大家好，来聊聊天吧！ 😊"
 
 
+class ChatInterestProfiles:
+    """群聊兴趣画像：按群累计消息词元计数（指数衰减），词表有上限，用于低成本挑选贴合群聊的资讯"""
+
+    # 前向衰减的指数超过该值时重新定基，避免权重数值溢出
+    _REBASE_EXPONENT = 32.0
+
+    def __init__(self, half_life_hours: float = 24.0, max_terms: int = 200, max_chats: int = 2000,
+                 max_text_chars: int = 300):
+        self.half_life_seconds = max(60.0, float(half_life_hours) * 3600)
+        self.max_terms = max(10, int(max_terms))
+        self.max_chats = max(1, int(max_chats))
+        self.max_text_chars = max(20, int(max_text_chars))
+        # chat_id -> {token: 以 base_time 为基准放大后的权重}，按最近活跃排序（LRU）
+        self._profiles: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+        self._base_time: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+    def observe(self, chat_id: Any, text: str, now: Optional[float] = None):
+        """记录一条消息文本；采用前向衰减，单条消息的开销与消息长度成正比，而非词表大小"""
+        tokens = _tokenize_text((text or "")[:self.max_text_chars])
+        if not tokens:
+            return
+        key = str(chat_id)
+        now = time.time() if now is None else now
+
+        profile = self._profiles.get(key)
+        if profile is None:
+            profile = {}
+            self._profiles[key] = profile
+            self._base_time[key] = now
+            while len(self._profiles) > self.max_chats:
+                evicted, _ = self._profiles.popitem(last=False)
+                self._base_time.pop(evicted, None)
+        else:
+            self._profiles.move_to_end(key)
+
+        exponent = (now - self._base_time[key]) / self.half_life_seconds
+        if exponent > self._REBASE_EXPONENT:
+            self._rebase(key, now)
+            profile = self._profiles[key]
+            exponent = 0.0
+        increment = 2.0 ** exponent
+
+        for tok in tokens:
+            profile[tok] = profile.get(tok, 0.0) + increment
+
+        # 词表超出上限一定比例后再裁剪，摊薄排序开销
+        if len(profile) > self.max_terms + self.max_terms // 4:
+            kept = sorted(profile.items(), key=lambda kv: kv[1], reverse=True)[:self.max_terms]
+            self._profiles[key] = dict(kept)
+
+    def _rebase(self, key: str, now: float):
+        profile = self._profiles.get(key, {})
+        factor = 2.0 ** (-(now - self._base_time[key]) / self.half_life_seconds)
+        self._profiles[key] = {t: w * factor for t, w in profile.items() if w * factor >= 1e-3}
+        self._base_time[key] = now
+
+    def weights(self, chat_id: Any, now: Optional[float] = None) -> Dict[str, float]:
+        """返回衰减到当前时刻的词元权重"""
+        key = str(chat_id)
+        profile = self._profiles.get(key)
+        if not profile:
+            return {}
+        now = time.time() if now is None else now
+        factor = 2.0 ** (-(now - self._base_time[key]) / self.half_life_seconds)
+        return {t: w * factor for t, w in profile.items()}
+
+    def top_terms(self, chat_id: Any, k: int = 10) -> List[Tuple[str, float]]:
+        """权重最高的 k 个词元（用于日志中展示群聊画像）"""
+        return sorted(self.weights(chat_id).items(), key=lambda kv: kv[1], reverse=True)[:k]
+
+
+class DailySlotScheduler:
+    """每日定时点的截止时间计算：按 (作用范围, 时区, 时间点) 求下一次/最近一次触发时刻，并按补发策略挑出到期的时间点
+
+    作用范围为空字符串表示使用全局 daily_times 的群聊，否则为拥有独立 daily_times 的群聊 ID。
+    """
+
+    ON_TIME_TOLERANCE = 60  # 晚于该秒数视为错过（需按补发策略处理）
+    POLICIES = ("skip", "latest", "all")
+
+    def __init__(self, catch_up_policy: str = "latest", catch_up_grace_seconds: float = 1800):
+        policy = str(catch_up_policy).lower()
+        self.catch_up_policy = policy if policy in self.POLICIES else "latest"
+        self.catch_up_grace_seconds = max(0.0, float(catch_up_grace_seconds))
+
+    @staticmethod
+    def parse_time(value: str) -> Optional[Tuple[int, int]]:
+        try:
+            hour, minute = map(int, str(value).split(":"))
+            if 0 <= hour < 24 and 0 <= minute < 60:
+                return hour, minute
+        except ValueError:
+            pass
+        return None
+
+    @staticmethod
+    def get_timezone(name: Optional[str]):
+        """时区名转 tzinfo；为空或无效时返回 None（使用本机时区）"""
+        if not name:
+            return None
+        zoneinfo = _optional_import("zoneinfo")
+        if zoneinfo is None:
+            return None
+        try:
+            return zoneinfo.ZoneInfo(str(name))
+        except Exception:
+            logger.warning(f"无效的时区配置: {name}，使用本机时区")
+            return None
+
+    @staticmethod
+    def _at(now_ts: float, tz, hour: int, minute: int, day_offset: int) -> float:
+        now_dt = datetime.fromtimestamp(now_ts, tz) if tz else datetime.fromtimestamp(now_ts)
+        day = now_dt.date() + timedelta(days=day_offset)
+        return datetime(day.year, day.month, day.day, hour, minute, tzinfo=tz).timestamp()
+
+    def next_fire(self, now_ts: float, tz, hour: int, minute: int) -> float:
+        """严格晚于 now_ts 的下一次触发时刻"""
+        for offset in (0, 1, 2):
+            ts = self._at(now_ts, tz, hour, minute, offset)
+            if ts > now_ts:
+                return ts
+        return now_ts + 86400
+
+    def prev_fire(self, now_ts: float, tz, hour: int, minute: int) -> float:
+        """不晚于 now_ts 的最近一次触发时刻"""
+        for offset in (0, -1, -2):
+            ts = self._at(now_ts, tz, hour, minute, offset)
+            if ts <= now_ts:
+                return ts
+        return now_ts - 86400
+
+    def due(self, slots: List[Tuple[str, str, str]], last_run_ts: float,
+            now_ts: float) -> List[Tuple[str, str, str, float]]:
+        """返回在 (last_run_ts, now_ts] 内到期、且符合补发策略的 (作用范围, 时区, 时间点, 触发时刻)"""
+        fired: List[Tuple[str, str, str, float]] = []
+        for scope, tz_name, slot in slots:
+            parsed = self.parse_time(slot)
+            if not parsed:
+                continue
+            fire_ts = self.prev_fire(now_ts, self.get_timezone(tz_name), *parsed)
+            if fire_ts <= last_run_ts:
+                continue
+            lateness = now_ts - fire_ts
+            if lateness <= self.ON_TIME_TOLERANCE:
+                fired.append((scope, tz_name, slot, fire_ts))
+            elif self.catch_up_policy != "skip" and lateness <= self.catch_up_grace_seconds:
+                logger.info(f"补发错过的定时点: {slot}（{tz_name or '本机时区'}，延迟 {int(lateness)} 秒）")
+                fired.append((scope, tz_name, slot, fire_ts))
+            else:
+                logger.info(f"跳过已错过的定时点: {slot}（{tz_name or '本机时区'}，延迟 {int(lateness)} 秒）")
+
+        if self.catch_up_policy == "latest":
+            # 同一作用范围与时区只保留最近的一个时间点，避免连发
+            latest: Dict[Tuple[str, str], Tuple[str, str, str, float]] = {}
+            for entry in fired:
+                key = (entry[0], entry[1])
+                if key not in latest or entry[3] > latest[key][3]:
+                    latest[key] = entry
+            fired = list(latest.values())
+        return sorted(fired, key=lambda e: e[3])
+
+    def next_deadline(self, slots: List[Tuple[str, str, str]], now_ts: float) -> Optional[float]:
+        deadlines = []
+        for _, tz_name, slot in slots:
+            parsed = self.parse_time(slot)
+            if parsed:
+                deadlines.append(self.next_fire(now_ts, self.get_timezone(tz_name), *parsed))
+        return min(deadlines) if deadlines else None
+
+
+class GroupEligibilityIndex:
+    """群聊发送资格索引：目标/排除群聊与 group_overrides 在构建时统一规范化
+
+    TOML 中的群号通常是整数，而聊天流 ID 与覆盖配置的键是字符串；构建时统一转为字符串集合，
+    并把每个群聊的活跃时段预计算为 24 位小时掩码，定时发送时的筛选为 O(N) 且没有类型不匹配。
+    配置变化时整体重建（见 TopicFinderPlugin._eligibility_index）。
+    """
+
+    ALL_HOURS = (1 << 24) - 1
+
+    def __init__(self, target_groups: Optional[List[Any]] = None, exclude_groups: Optional[List[Any]] = None,
+                 overrides: Optional[Dict[str, Any]] = None, default_tz: str = "",
+                 active_start: Any = 8, active_end: Any = 23):
+        self.default_tz = str(default_tz or "")
+        self.default_mask = self.hour_mask(active_start, active_end)
+        # 保持配置顺序并去重
+        self.targets: List[str] = list(dict.fromkeys(
+            key for key in (self.normalize_id(g) for g in target_groups or []) if key
+        ))
+        self.excluded = {key for key in (self.normalize_id(g) for g in exclude_groups or []) if key}
+        self._overrides: Dict[str, Dict[str, Any]] = {}
+        self._masks: Dict[str, int] = {}
+        self._timezones: Dict[str, str] = {}
+        for raw_key, ov in (overrides or {}).items():
+            key = self.normalize_id(raw_key)
+            # 来自配置快照时覆盖项为只读映射（MappingProxyType），不是 dict
+            if not key or not isinstance(ov, Mapping):
+                continue
+            self._overrides[key] = ov
+            self._timezones[key] = str(ov.get("timezone") or self.default_tz)
+            self._masks[key] = self.hour_mask(
+                ov.get("active_hours_start", active_start), ov.get("active_hours_end", active_end)
+            )
+
+    @staticmethod
+    def normalize_id(value: Any) -> str:
+        """群号/聊天流 ID 统一为字符串：整数（含整数值浮点数）转十进制，字符串去除首尾空白"""
+        if isinstance(value, bool) or value is None:
+            return ""
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        return str(value).strip()
+
+    @classmethod
+    def hour_mask(cls, start: Any, end: Any) -> int:
+        """活跃时段 [start, end]（整点、两端包含、支持跨午夜）转为小时掩码；配置无效时视为全天活跃"""
+        try:
+            start = int(start) % 24
+            end = int(end) % 24
+        except (TypeError, ValueError):
+            return cls.ALL_HOURS
+        if start <= end:
+            hours = range(start, end + 1)
+        else:
+            hours = list(range(start, 24)) + list(range(0, end + 1))
+        mask = 0
+        for hour in hours:
+            mask |= 1 << hour
+        return mask
+
+    def _key(self, chat_id: Any, group_id: Any = None) -> str:
+        """优先按群号匹配覆盖配置，其次按聊天流 ID"""
+        group_key = self.normalize_id(group_id)
+        if group_key and group_key in self._overrides:
+            return group_key
+        return self.normalize_id(chat_id)
+
+    def override(self, chat_id: Any, group_id: Any = None) -> Dict[str, Any]:
+        return self._overrides.get(self._key(chat_id, group_id), {})
+
+    def timezone(self, chat_id: Any, group_id: Any = None) -> str:
+        return self._timezones.get(self._key(chat_id, group_id), self.default_tz)
+
+    def is_active(self, hour: int, chat_id: Any, group_id: Any = None) -> bool:
+        mask = self._masks.get(self._key(chat_id, group_id), self.default_mask)
+        return bool(mask >> (int(hour) % 24) & 1)
+
+    def select(self, candidates: List[Tuple[str, Optional[str]]], tz_name: str, scope: str,
+               hour: int) -> List[str]:
+        """从 (聊天流/群聊 ID, 群号) 候选中选出本时间点应发送的群聊
+
+        scope 非空时只选该群；否则排除拥有独立 daily_times 的群。时区需与 tz_name 一致，hour 为该时区的当前小时。
+        """
+        bit = 1 << (int(hour) % 24)
+        selected = []
+        for chat_id, group_id in candidates:
+            chat_key = self.normalize_id(chat_id)
+            group_key = self.normalize_id(group_id)
+            if chat_key in self.excluded or group_key in self.excluded:
+                continue
+            key = group_key if group_key in self._overrides else chat_key
+            ov = self._overrides.get(key)
+            if scope:
+                if scope != chat_key and scope != group_key:
+                    continue
+            elif ov is not None and "daily_times" in ov:
+                continue
+            if self._timezones.get(key, self.default_tz) != tz_name:
+                continue
+            if not self._masks.get(key, self.default_mask) & bit:
+                logger.debug(f"群聊 {chat_key} 当前不在活跃时段，跳过定时发送")
+                continue
+            selected.append(chat_key)
+        return selected
+
+
+class StreamResolutionCache:
+    """群聊 ID -> 聊天流 ID 的解析缓存，含未找到结果的负缓存与群聊流列表缓存
+
+    宿主没有聊天流创建/删除事件：收到某聊天流的消息即视为“创建”（清除负缓存并使流列表失效），
+    发送失败视为“可能已删除”（使该条目失效）。
+    """
+
+    def __init__(self, ttl_seconds: float = 3600, negative_ttl_seconds: float = 300,
+                 list_ttl_seconds: float = 300, max_entries: int = 10000):
+        self.ttl_seconds = float(ttl_seconds)
+        self.negative_ttl_seconds = float(negative_ttl_seconds)
+        self.list_ttl_seconds = float(list_ttl_seconds)
+        self.max_entries = max(100, int(max_entries))
+        # chat_id -> (stream_id 或 None, 过期时间)
+        self._entries: "OrderedDict[str, Tuple[Optional[str], float]]" = OrderedDict()
+        self._known_streams: set = set()
+        self._stream_list: Optional[List[Tuple[str, Optional[str]]]] = None
+        self._stream_list_expires = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, chat_id: Any) -> Tuple[bool, Optional[str]]:
+        """返回 (是否命中, stream_id)；命中负缓存时 stream_id 为 None"""
+        key = str(chat_id)
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, entry[0]
+
+    def put(self, chat_id: Any, stream_id: Optional[str]):
+        ttl = self.ttl_seconds if stream_id else self.negative_ttl_seconds
+        key = str(chat_id)
+        self._entries[key] = (stream_id, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        if stream_id:
+            self._known_streams.add(stream_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, chat_id: Any):
+        entry = self._entries.pop(str(chat_id), None)
+        if entry and entry[0]:
+            self._known_streams.discard(entry[0])
+            self._stream_list = None
+
+    def note_stream_seen(self, stream_id: str, group_id: Optional[Any] = None):
+        """收到某聊天流的消息：记录正缓存并清除相关负缓存；新出现的流使流列表失效"""
+        if stream_id not in self._known_streams:
+            self._stream_list = None
+        for key in (stream_id, group_id):
+            if key is not None:
+                self.put(key, stream_id)
+
+    def get_stream_list(self, loader) -> List[Tuple[str, Optional[str]]]:
+        """获取 (聊天流 ID, 群号) 列表，缓存 list_ttl_seconds 秒；loader 为实际查询函数
+
+        加载时顺带记录群号 -> 聊天流的解析结果，之后按群号发送无需再次查询。
+        """
+        now = time.monotonic()
+        if self._stream_list is None or now >= self._stream_list_expires:
+            self._stream_list = list(loader())
+            self._stream_list_expires = now + self.list_ttl_seconds
+            for stream_id, group_id in self._stream_list:
+                self._known_streams.add(stream_id)
+                if group_id is not None:
+                    self.put(group_id, stream_id)
+        return self._stream_list
+
+
+class TokenBucket:
+    """令牌桶：rate 为每秒补充的令牌数，burst 为桶容量"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = max(0.0, float(rate))
+        self.burst = max(1.0, float(burst))
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        if self.rate > 0:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: Optional[float] = None) -> float:
+        """距离可取得一个令牌还需等待的秒数（0 表示立即可用）；rate 为 0 时不限速"""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def reconfigure(self, rate: float, burst: float):
+        """修改速率与容量，保留当前令牌数（不超过新容量）"""
+        self._refill(time.monotonic())
+        self.rate = max(0.0, float(rate))
+        self.burst = max(1.0, float(burst))
+        self.tokens = min(self.tokens, self.burst)
+
+    def consume(self, now: Optional[float] = None):
+        if self.rate <= 0:
+            return
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        self.tokens -= 1
+
+
+class OutboundDispatcher:
+    """出站发送队列：全局与按群令牌桶限速、按优先级出队、发送失败退避重试（不重新生成内容）
+
+    作业分两个堆：就绪堆按 (优先级, 序号) 排序；暂不可发（重试退避中或所在群聊的令牌未回满）的作业
+    进入延迟堆，按可发时刻排序，到期后移回就绪堆。每次出队为 O(log N)，不再扫描整个队列。
+    """
+
+    PRIORITY_MANUAL = 0
+    PRIORITY_SILENCE = 1
+    PRIORITY_SCHEDULED = 2
+    PRIORITY_NAMES = {PRIORITY_MANUAL: "manual", PRIORITY_SILENCE: "silence", PRIORITY_SCHEDULED: "scheduled"}
+
+    def __init__(self, global_rate: float = 1.0, global_burst: int = 3, per_chat_rate: float = 0.1,
+                 per_chat_burst: int = 1, max_queue_size: int = 500, max_retries: int = 2,
+                 retry_backoff_seconds: float = 2.0, queue_warn_size: int = 100):
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self.per_chat_rate = per_chat_rate
+        self.per_chat_burst = per_chat_burst
+        self.max_queue_size = max(1, int(max_queue_size))
+        self.max_retries = max(0, int(max_retries))
+        self.retry_backoff_seconds = max(0.0, float(retry_backoff_seconds))
+        self.queue_warn_size = max(1, int(queue_warn_size))
+
+        self._chat_buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        # 就绪堆元素：(优先级, 序号, 作业)；作业为 dict，包含 chat_key/send_fn/future/attempts/not_before/enqueued
+        self._ready: List[Tuple[int, int, Dict[str, Any]]] = []
+        # 延迟堆元素：(可发时刻, 优先级, 序号, 作业)
+        self._delayed: List[Tuple[float, int, int, Dict[str, Any]]] = []
+        self._seq = 0
+        # 已交给发送函数的作业（含等待重试的）：不能再撤回，结果一定会写入其 Future
+        self._started: Set["asyncio.Future"] = set()
+        self._wakeup = asyncio.Event()
+        self._worker: Optional[asyncio.Task] = None
+        self._warned = False
+        self.counters = {"sent": 0, "failed": 0, "retried": 0, "rejected": 0}
+
+    def reconfigure(self, global_rate: float = 1.0, global_burst: int = 3, per_chat_rate: float = 0.1,
+                    per_chat_burst: int = 1, max_queue_size: int = 500, max_retries: int = 2,
+                    retry_backoff_seconds: float = 2.0, queue_warn_size: int = 100):
+        """配置热重载：就地更新限速与队列参数，已排队的作业保留"""
+        self.global_bucket.reconfigure(global_rate, global_burst)
+        self.per_chat_rate = per_chat_rate
+        self.per_chat_burst = per_chat_burst
+        for bucket in self._chat_buckets.values():
+            bucket.reconfigure(per_chat_rate, per_chat_burst)
+        # 延迟堆中的可发时刻按旧速率计算，放回后按新速率重新判断（重试退避仍然生效）
+        delayed, self._delayed = self._delayed, []
+        for _, priority, seq, job in delayed:
+            self._push(priority, seq, job)
+        self.max_queue_size = max(1, int(max_queue_size))
+        self.max_retries = max(0, int(max_retries))
+        self.retry_backoff_seconds = max(0.0, float(retry_backoff_seconds))
+        self.queue_warn_size = max(1, int(queue_warn_size))
+        self._wakeup.set()
+
+    def size(self) -> int:
+        """排队中的作业数（就绪 + 延迟）"""
+        return len(self._ready) + len(self._delayed)
+
+    def _push(self, priority: int, seq: int, job: Dict[str, Any]):
+        if job["not_before"] > time.monotonic():
+            heapq.heappush(self._delayed, (job["not_before"], priority, seq, job))
+        else:
+            heapq.heappush(self._ready, (priority, seq, job))
+
+    def _chat_wait(self, chat_key: str, now: float) -> float:
+        """群聊令牌桶的等待时间；只查询，不创建桶也不改变淘汰顺序（没有桶说明令牌是满的）"""
+        bucket = self._chat_buckets.get(chat_key)
+        return 0.0 if bucket is None else bucket.wait_time(now)
+
+    def _chat_bucket(self, chat_key: str) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_key)
+        if bucket is None:
+            bucket = self._chat_buckets[chat_key] = TokenBucket(self.per_chat_rate, self.per_chat_burst)
+            # 长期不活跃的群聊桶已回满，淘汰不影响限速效果
+            while len(self._chat_buckets) > 4096:
+                self._chat_buckets.popitem(last=False)
+        else:
+            self._chat_buckets.move_to_end(chat_key)
+        return bucket
+
+    def submit(self, chat_key: Any, send_fn, priority: int = PRIORITY_SCHEDULED) -> "asyncio.Future":
+        """提交一次发送，返回在发送成功/最终失败后完成的 Future（结果为 bool）"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if self.size() >= self.max_queue_size:
+            self.counters["rejected"] += 1
+            logger.warning(f"出站发送队列已满（{self.size()}），拒绝发送: {chat_key}")
+            future.set_result(False)
+            return future
+
+        self._seq += 1
+        job = {
+            "chat_key": str(chat_key),
+            "send_fn": send_fn,
+            "future": future,
+            "attempts": 0,
+            "not_before": 0.0,
+            "enqueued": time.monotonic(),
+        }
+        heapq.heappush(self._ready, (priority, self._seq, job))
+        queued = self.size()
+        metrics.set("dispatch_queue_depth", queued)
+        if queued >= self.queue_warn_size and not self._warned:
+            self._warned = True
+            logger.warning(f"出站发送队列积压: {queued} 条待发送")
+        elif queued < self.queue_warn_size // 2:
+            self._warned = False
+
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        self._wakeup.set()
+        return future
+
+    async def send(self, chat_key: Any, send_fn, priority: int = PRIORITY_SCHEDULED) -> bool:
+        return await self.submit(chat_key, send_fn, priority)
+
+    def cancel(self, future: "asyncio.Future") -> bool:
+        """撤回尚未开始发送的作业；已开始发送的作业无法撤回（返回 False），发送结果仍会写入 Future"""
+        if future in self._started:
+            return False
+        return future.cancel() or future.cancelled()
+
+    async def _sleep(self, timeout: float):
+        """休眠到 timeout 秒后，或有新作业提交/配置变化时提前醒来"""
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self):
+        while self._ready or self._delayed:
+            now = time.monotonic()
+            while self._delayed and self._delayed[0][0] <= now:
+                _, priority, seq, job = heapq.heappop(self._delayed)
+                heapq.heappush(self._ready, (priority, seq, job))
+            if not self._ready:
+                await self._sleep(self._delayed[0][0] - now)
+                continue
+            global_wait = self.global_bucket.wait_time(now)
+            if global_wait > 0:
+                await self._sleep(global_wait)
+                continue
+
+            priority, seq, job = heapq.heappop(self._ready)
+            metrics.set("dispatch_queue_depth", self.size())
+            if job["future"].done():
+                # 调用方已取消（如发送阶段超时），不再发送
+                continue
+            chat_wait = self._chat_wait(job["chat_key"], now)
+            if chat_wait > 0:
+                # 该群聊暂时没有令牌：移入延迟堆，不阻塞其他群聊
+                heapq.heappush(self._delayed, (now + chat_wait, priority, seq, job))
+                continue
+
+            self.global_bucket.consume(now)
+            self._chat_bucket(job["chat_key"]).consume(now)
+            job["attempts"] += 1
+            self._started.add(job["future"])
+
+            try:
+                ok = await job["send_fn"]()
+                ok = ok is not False
+            except Exception as e:
+                logger.warning(f"发送到 {job['chat_key']} 失败（第 {job['attempts']} 次）: {e}")
+                ok = False
+
+            if ok:
+                self.counters["sent"] += 1
+                self._started.discard(job["future"])
+                if not job["future"].done():
+                    job["future"].set_result(True)
+            elif job["attempts"] <= self.max_retries:
+                # 只重试发送本身，内容沿用已生成的文本
+                self.counters["retried"] += 1
+                metrics.inc("dispatch_retries_total")
+                job["not_before"] = time.monotonic() + self.retry_backoff_seconds * (2 ** (job["attempts"] - 1))
+                heapq.heappush(self._delayed, (job["not_before"], priority, seq, job))
+            else:
+                self.counters["failed"] += 1
+                self._started.discard(job["future"])
+                if not job["future"].done():
+                    job["future"].set_result(False)
+
+    def stats(self) -> Dict[str, Any]:
+        """队列积压情况（用于背压观测）"""
+        now = time.monotonic()
+        by_priority: Dict[str, int] = {}
+        oldest = 0.0
+        for priority, _, job in self._ready + [entry[1:] for entry in self._delayed]:
+            name = self.PRIORITY_NAMES.get(priority, str(priority))
+            by_priority[name] = by_priority.get(name, 0) + 1
+            oldest = max(oldest, now - job["enqueued"])
+        return {
+            "queued": self.size(),
+            "queued_by_priority": by_priority,
+            "oldest_wait_seconds": round(oldest, 1),
+            "capacity": self.max_queue_size,
+            **self.counters,
+        }
+
+
 class TopicSchedulerTask(AsyncTask):
     """话题调度任务"""
     
     def __init__(self, plugin_instance):
         super().__init__(
             task_name="topic_scheduler",
-            wait_before_start=60,  # 启动后1分钟开始检查
-            run_interval=300  # 每5分钟检查一次
+            wait_before_start=60,  # 启动后1分钟开始调度
+            run_interval=300  # run() 内部按截止时间休眠；仅在调度循环异常退出后 5 分钟重启
         )
         self.plugin = plugin_instance
     
     async def run(self):
-        """执行定时检查"""
+        """运行定时调度循环"""
         try:
-            await self.plugin._check_scheduled_topics()
+            await self.plugin._run_schedule_loop()
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            logger.error(f"定时话题检查失败: {e}")
+            logger.error(f"定时话题调度失败: {e}")
+
+
+class ConfigReloadTask(AsyncTask):
+    """配置热重载任务：定期检查 config.toml 的修改时间"""
+
+    def __init__(self, plugin_instance, interval_seconds: int = 10):
+        interval = max(1, int(interval_seconds))
+        super().__init__(
+            task_name="topic_config_reload",
+            wait_before_start=interval,
+            run_interval=interval
+        )
+        self.plugin = plugin_instance
+
+    async def run(self):
+        """检查并应用配置修改"""
+        try:
+            await self.plugin.reload_config_if_changed()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"配置热重载失败: {e}")
+
+
+class MetricsExportTask(AsyncTask):
+    """指标导出任务：定期将 Prometheus 文本写入配置的文件"""
+
+    def __init__(self, plugin_instance, interval_seconds: int = 60):
+        interval = max(1, int(interval_seconds))
+        super().__init__(
+            task_name="topic_metrics_export",
+            wait_before_start=interval,
+            run_interval=interval
+        )
+        self.plugin = plugin_instance
+
+    async def run(self):
+        """写入指标文件"""
+        try:
+            await self.plugin.export_metrics()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"导出指标失败: {e}")
 
 
 class TopicSchedulerEventHandler(BaseEventHandler):
@@ -855,30 +3803,78 @@ class TopicSchedulerEventHandler(BaseEventHandler):
     async def execute(
         self, message: MaiMessages | None
     ) -> Tuple[bool, bool, Optional[str], Optional[CustomEventHandlerResult], Optional[MaiMessages]]:
-        """启动定时任务"""
+        """启动定时任务"""
+        try:
+            # 获取插件实例
+            from src.plugin_system.core.plugin_manager import plugin_manager
+            self.plugin_instance = plugin_manager.get_plugin_instance("topic_finder_plugin")
+
+            if not self.plugin_instance:
+                logger.error("无法获取话题插件实例")
+                return False, True, None, None, None
+
+            # 检查是否启用
+            if not self.get_config("plugin.enabled", False):
+                logger.info("话题插件未启用")
+                return True, True, None, None, None
+
+            # 后台预加载主程序人设，首次生成话题时无需等待读取
+            self.plugin_instance.persona.preload()
+
+            # 恢复持久化状态后启动定时任务
+            await self.plugin_instance._load_persistent_state()
+            task = TopicSchedulerTask(self.plugin_instance)
+            await async_task_manager.add_task(task)
+
+            if self.get_config("plugin.enable_hot_reload", True) and self.plugin_instance._config_reloader:
+                reload_task = ConfigReloadTask(
+                    self.plugin_instance, self.get_config("plugin.config_reload_interval_seconds", 10)
+                )
+                await async_task_manager.add_task(reload_task)
+
+            # 指标导出：文件（定期写入）与 /metrics 端点均为可选
+            if self.get_config("metrics.export_path", ""):
+                export_task = MetricsExportTask(
+                    self.plugin_instance, self.get_config("metrics.export_interval_seconds", 60)
+                )
+                await async_task_manager.add_task(export_task)
+            await self.plugin_instance.start_metrics_server()
+
+            logger.info("话题调度任务已启动")
+            return True, True, None, None, None
+
+        except Exception as e:
+            logger.error(f"启动话题调度任务失败: {e}")
+            return False, True, None, None, None
+
+
+class TopicStoreShutdownEventHandler(BaseEventHandler):
+    """停止时落盘待写数据并关闭存储"""
+
+    event_type = EventType.ON_STOP
+    handler_name = "topic_store_shutdown"
+    handler_description = "落盘待写数据并关闭话题插件存储"
+    weight = 50
+    intercept_message = False
+
+    async def execute(
+        self, message: MaiMessages | None
+    ) -> Tuple[bool, bool, Optional[str], Optional[CustomEventHandlerResult], Optional[MaiMessages]]:
+        """关闭存储"""
         try:
-            # 获取插件实例
             from src.plugin_system.core.plugin_manager import plugin_manager
-            self.plugin_instance = plugin_manager.get_plugin_instance("topic_finder_plugin")
-
-            if not self.plugin_instance:
-                logger.error("无法获取话题插件实例")
-                return False, True, None, None, None
-
-            # 检查是否启用
-            if not self.get_config("plugin.enabled", False):
-                logger.info("话题插件未启用")
-                return True, True, None, None, None
-
-            # 启动定时任务
-            task = TopicSchedulerTask(self.plugin_instance)
-            await async_task_manager.add_task(task)
+            plugin_instance = plugin_manager.get_plugin_instance("topic_finder_plugin")
 
-            logger.info("话题调度任务已启动")
+            if plugin_instance:
+                await plugin_instance.stop_metrics_server()
+                await plugin_instance.export_metrics()
+            if plugin_instance and plugin_instance.store:
+                await plugin_instance.store.close()
+                logger.info("话题插件存储已关闭")
             return True, True, None, None, None
 
         except Exception as e:
-            logger.error(f"启动话题调度任务失败: {e}")
+            logger.error(f"关闭话题插件存储失败: {e}")
             return False, True, None, None, None
 
 
@@ -895,27 +3891,45 @@ class ChatSilenceDetectorEventHandler(BaseEventHandler):
         super().__init__()
         self.last_check_time = {}  # 记录每个群聊的最后检查时间
 
-    def _get_group_override(self, chat_id: Any) -> Dict[str, Any]:
-        """获取群聊覆盖配置（若无则返回空字典）"""
+    def _get_group_override(self, chat_id: Any, group_id: Any = None) -> Dict[str, Any]:
+        """获取群聊覆盖配置（若无则返回空字典）；按群号或聊天流 ID 匹配"""
         try:
+            from src.plugin_system.core.plugin_manager import plugin_manager
+            plugin_instance = plugin_manager.get_plugin_instance("topic_finder_plugin")
+            if plugin_instance:
+                return plugin_instance._eligibility_index().override(chat_id, group_id)
             overrides = self.get_config("group_overrides", {}) or {}
-            key = str(chat_id)
-            return overrides.get(key, {})
+            return overrides.get(str(chat_id), {})
         except Exception:
             return {}
 
-    @staticmethod
-    def _in_active_window(current_hour: int, start: int, end: int) -> bool:
-        """支持跨午夜的活跃时段判断，例如 22-6 表示 22:00-次日06:00"""
-        try:
-            start = int(start)
-            end = int(end)
-            if start <= end:
-                return start <= current_hour <= end
-            # 跨午夜
-            return (current_hour >= start) or (current_hour <= end)
+    def _get_timezone_name(self, chat_id: Any, group_id: Any = None) -> str:
+        """获取群聊所用时区名：群聊覆盖的 timezone 优先，否则为 schedule.timezone（与定时发送一致）"""
+        try:
+            from src.plugin_system.core.plugin_manager import plugin_manager
+            plugin_instance = plugin_manager.get_plugin_instance("topic_finder_plugin")
+            if plugin_instance:
+                return plugin_instance._eligibility_index().timezone(chat_id, group_id)
         except Exception:
-            return True
+            pass
+        override = self._get_group_override(chat_id, group_id)
+        return str(override.get("timezone") or self.get_config("schedule.timezone", "") or "")
+
+    def _is_active_hour(self, hour: int, chat_id: Any, group_id: Any = None) -> bool:
+        """当前小时是否在群聊的活跃时段内（支持群聊覆盖、跨午夜）；与定时发送共用资格索引的小时掩码"""
+        try:
+            from src.plugin_system.core.plugin_manager import plugin_manager
+            plugin_instance = plugin_manager.get_plugin_instance("topic_finder_plugin")
+            if plugin_instance:
+                return plugin_instance._eligibility_index().is_active(hour, chat_id, group_id)
+        except Exception:
+            pass
+        override = self._get_group_override(chat_id, group_id)
+        mask = GroupEligibilityIndex.hour_mask(
+            override.get("active_hours_start", self.get_config("silence_detection.active_hours_start", 8)),
+            override.get("active_hours_end", self.get_config("silence_detection.active_hours_end", 23)),
+        )
+        return bool(mask >> (int(hour) % 24) & 1)
 
     async def execute(
         self, message: MaiMessages | None
@@ -932,6 +3946,7 @@ class ChatSilenceDetectorEventHandler(BaseEventHandler):
             # 安全地获取消息信息
             msg = None
             chat_id = None
+            group_id = None
             is_group = False
 
             # 尝试不同的属性访问方式
@@ -939,6 +3954,8 @@ class ChatSilenceDetectorEventHandler(BaseEventHandler):
                 msg = message.message_recv
                 chat_id = getattr(msg, 'chat_id', None)
                 is_group = getattr(msg, 'is_group', False)
+                group_info = getattr(getattr(msg, 'message_info', None), 'group_info', None)
+                group_id = getattr(group_info, 'group_id', None)
             elif hasattr(message, 'chat_id'):
                 chat_id = message.chat_id
                 is_group = getattr(message, 'is_group', False)
@@ -950,13 +3967,10 @@ class ChatSilenceDetectorEventHandler(BaseEventHandler):
             if not is_group:
                 return True, True, None, None, None
 
-            # 检查是否在活跃时间段（支持群聊覆盖）
-            current_hour = datetime.now().hour
-            override = self._get_group_override(chat_id)
-            active_start = override.get("active_hours_start", self.get_config("silence_detection.active_hours_start", 8))
-            active_end = override.get("active_hours_end", self.get_config("silence_detection.active_hours_end", 23))
-
-            if not self._in_active_window(current_hour, active_start, active_end):
+            # 检查是否在活跃时间段（支持群聊覆盖；按群聊时区取当前小时）
+            tz = DailySlotScheduler.get_timezone(self._get_timezone_name(chat_id, group_id))
+            current_hour = datetime.now(tz).hour if tz else datetime.now().hour
+            if not self._is_active_hour(current_hour, chat_id, group_id):
                 return True, True, None, None, None
 
             # 检查间隔控制
@@ -970,7 +3984,7 @@ class ChatSilenceDetectorEventHandler(BaseEventHandler):
             self.last_check_time[chat_id] = current_time
 
             # 检查群聊静默时间
-            await self._check_chat_silence(chat_id)
+            await self._check_chat_silence(chat_id, group_id)
 
             return True, True, None, None, None
 
@@ -978,11 +3992,11 @@ class ChatSilenceDetectorEventHandler(BaseEventHandler):
             logger.error(f"群聊静默检测失败: {e}")
             return True, True, None, None, None
 
-    async def _check_chat_silence(self, chat_id: str):
+    async def _check_chat_silence(self, chat_id: str, group_id: Any = None):
         """检查特定群聊的静默状态"""
         try:
             # 支持群聊覆盖静默阈值
-            override = self._get_group_override(chat_id)
+            override = self._get_group_override(chat_id, group_id)
             silence_minutes = override.get("silence_threshold_minutes", self.get_config("silence_detection.silence_threshold_minutes", 60))
             silence_threshold = int(silence_minutes) * 60
             current_time = time.time()
@@ -1000,18 +4014,83 @@ class ChatSilenceDetectorEventHandler(BaseEventHandler):
             # 如果没有最近消息，说明群聊静默了
             if not recent_messages:
                 logger.info(f"检测到群聊 {chat_id} 静默超过阈值，准备发起话题")
+                metrics.inc("silence_triggers_total")
 
                 # 获取插件实例并发起话题
                 from src.plugin_system.core.plugin_manager import plugin_manager
                 plugin_instance = plugin_manager.get_plugin_instance("topic_finder_plugin")
 
                 if plugin_instance:
-                    await plugin_instance._send_topic_to_chat(chat_id, reason="群聊静默检测")
+                    await plugin_instance._send_topic_to_chat(
+                        chat_id, reason="群聊静默检测", priority=OutboundDispatcher.PRIORITY_SILENCE
+                    )
 
         except Exception as e:
             logger.error(f"检查群聊静默状态失败: {e}")
 
 
+class ChatInterestProfileEventHandler(BaseEventHandler):
+    """群聊消息观察处理器：更新兴趣画像，并据消息刷新聊天流解析缓存"""
+
+    event_type = EventType.ON_MESSAGE
+    handler_name = "chat_interest_profiler"
+    handler_description = "根据群聊消息增量更新兴趣画像与聊天流缓存"
+    weight = 5
+    intercept_message = False
+
+    def __init__(self):
+        super().__init__()
+        self.plugin_instance = None
+
+    async def execute(
+        self, message: MaiMessages | None
+    ) -> Tuple[bool, bool, Optional[str], Optional[CustomEventHandlerResult], Optional[MaiMessages]]:
+        """记录消息文本到对应群聊的兴趣画像，并标记该聊天流存在"""
+        try:
+            if not message:
+                return True, True, None, None, None
+
+            chat_id = None
+            group_id = None
+            is_group = False
+            text = getattr(message, 'plain_text', None)
+
+            if hasattr(message, 'message_recv') and message.message_recv:
+                msg = message.message_recv
+                chat_id = getattr(msg, 'chat_id', None)
+                is_group = getattr(msg, 'is_group', False)
+                text = text or getattr(msg, 'processed_plain_text', None)
+                group_info = getattr(getattr(msg, 'message_info', None), 'group_info', None)
+                group_id = getattr(group_info, 'group_id', None)
+            elif hasattr(message, 'chat_id'):
+                chat_id = message.chat_id
+                is_group = getattr(message, 'is_group', False)
+
+            if not chat_id or not is_group:
+                return True, True, None, None, None
+
+            if self.plugin_instance is None:
+                from src.plugin_system.core.plugin_manager import plugin_manager
+                self.plugin_instance = plugin_manager.get_plugin_instance("topic_finder_plugin")
+
+            stream_cache = getattr(self.plugin_instance, "stream_cache", None)
+            if stream_cache is not None:
+                stream_cache.note_stream_seen(chat_id, group_id)
+
+            if not text or text.startswith("/"):
+                return True, True, None, None, None
+
+            profiles = getattr(self.plugin_instance, "interest_profiles", None)
+            if profiles is not None:
+                profiles.observe(chat_id, text)
+
+            return True, True, None, None, None
+
+        except Exception as e:
+            logger.error(f"更新群聊兴趣画像失败: {e}")
+            return True, True, None, None, None
+
+
 class StartTopicAction(BaseAction):
     """发起话题动作"""
 
@@ -1036,18 +4115,25 @@ class StartTopicAction(BaseAction):
             topic_content = self.action_data.get("topic_content", "")
             reason = self.action_data.get("reason", "发起话题")
 
+            from src.plugin_system.core.plugin_manager import plugin_manager
+            plugin_instance = plugin_manager.get_plugin_instance("topic_finder_plugin")
+
             if not topic_content:
                 # 如果没有提供话题内容，生成一个
-                from src.plugin_system.core.plugin_manager import plugin_manager
-                plugin_instance = plugin_manager.get_plugin_instance("topic_finder_plugin")
-
                 if plugin_instance:
                     topic_content = await plugin_instance._generate_topic_content()
                 else:
                     topic_content = "大家好，来聊聊天吧！ 😊"
 
-            # 发送话题
-            await self.send_text(topic_content)
+            # 发送话题（经插件出站队列限速，以手动优先级插队）
+            dispatcher = getattr(plugin_instance, "dispatcher", None) if plugin_instance else None
+            if dispatcher:
+                chat_key = getattr(self, "chat_id", None) or "action"
+                if not await dispatcher.send(chat_key, lambda: self.send_text(topic_content),
+                                             priority=OutboundDispatcher.PRIORITY_MANUAL):
+                    return False, "发起话题失败: 发送未成功"
+            else:
+                await self.send_text(topic_content)
 
             logger.info(f"发起话题成功: {reason} - {topic_content[:50]}...")
             return True, f"发起了话题: {reason}"
@@ -1146,6 +4232,42 @@ class TopicConfigCommand(BaseCommand):
             if target_groups:
                 config_info.append(f"🎯 目标群聊: {len(target_groups)} 个")
 
+            # 出站队列状态
+            queue_stats = plugin_instance.dispatcher.stats()
+            config_info.append(
+                f"📤 出站队列: 待发送 {queue_stats['queued']}/{queue_stats['capacity']}，"
+                f"最久等待 {queue_stats['oldest_wait_seconds']} 秒"
+            )
+            config_info.append(
+                f"   已发送 {queue_stats['sent']}，重试 {queue_stats['retried']}，"
+                f"失败 {queue_stats['failed']}，拒绝 {queue_stats['rejected']}"
+            )
+
+            # 配置快照版本与最近一次重载错误
+            config_info.append(f"⚙️ 配置版本: v{plugin_instance.config_snapshot.version}")
+            reloader = plugin_instance._config_reloader
+            if reloader and reloader.last_error:
+                config_info.append(f"   ⚠️ 最近一次重载失败: {reloader.last_error}")
+
+            # 联网大模型端点健康状态（管理器已创建时）
+            web_manager = plugin_instance._web_llm_manager
+            if web_manager:
+                for st in web_manager.pool.stats():
+                    state = "✅" if st["healthy"] else f"⏸️ 冷却中（{st['last_error']}）"
+                    quota = "不限" if st["quota_left"] is None else st["quota_left"]
+                    config_info.append(f"🌐 端点 {st['name']}: {state}，在途 {st['outstanding']}，剩余配额 {quota}")
+
+            # 话题生成模型链的成功率与延迟
+            generator = plugin_instance.topic_generator
+            if generator:
+                for name, st in generator.router.stats().items():
+                    p95 = f"{st['p95']:.1f} 秒" if st["p95"] is not None else "样本不足"
+                    config_info.append(f"🤖 模型 {name}: 成功 {st['ok']}，失败 {st['failed']}，p95 {p95}")
+                if generator.router.hedges_fired:
+                    config_info.append(
+                        f"   对冲请求 {generator.router.hedges_fired} 次，其中 {generator.router.hedges_won} 次先返回"
+                    )
+
             response = "\n".join(config_info)
             await self.send_text(response)
 
@@ -1371,6 +4493,246 @@ class WebInfoTestCommand(BaseCommand):
             return False, f"联网信息测试失败: {str(e)}", False
 
 
+class TopicSearchCommand(BaseCommand):
+    """检索资讯索引命令"""
+
+    command_name = "topic_search"
+    command_description = "按关键词或 #标签 检索已缓存的 RSS/联网资讯"
+    command_usage = "/topic_search <关键词> - 检索资讯"
+    command_pattern = r"^/topic_search\s+(?P<keyword>.+)$"
+
+    async def execute(self, **kwargs) -> Tuple[bool, str, bool]:
+        """执行资讯检索命令"""
+        try:
+            # 获取插件实例
+            from src.plugin_system.core.plugin_manager import plugin_manager
+            plugin_instance = plugin_manager.get_plugin_instance("topic_finder_plugin")
+
+            if not plugin_instance:
+                await self.send_text("❌ 无法获取话题插件实例")
+                return False, "插件实例获取失败", False
+
+            keyword = (self.matched_groups or {}).get("keyword", "").strip()
+            if not keyword:
+                await self.send_text("用法：/topic_search <关键词>")
+                return False, "缺少关键词", False
+
+            limit = int(plugin_instance.get_config("advanced.search_result_limit", 5))
+            results = plugin_instance.item_index.search(keyword, k=limit)
+
+            if not results:
+                await self.send_text(f"🔍 未找到与「{keyword}」相关的资讯（索引共 {len(plugin_instance.item_index)} 条）")
+                return True, "资讯检索完成", False
+
+            now = time.time()
+            response_parts = [f"🔍 「{keyword}」相关资讯 {len(results)} 条：\n"]
+            for i, item in enumerate(results, 1):
+                age_minutes = int((now - float(item.get("timestamp") or now)) / 60)
+                origin = "联网" if item.get("source") == "web_llm" else "RSS"
+                response_parts.append(f"{i}. [{origin}] {item.get('title', '无标题')}（{age_minutes} 分钟前）")
+
+            await self.send_text("\n".join(response_parts))
+            return True, "资讯检索完成", False
+
+        except Exception as e:
+            logger.error(f"资讯检索失败: {e}")
+            await self.send_text(f"❌ 资讯检索失败: {str(e)}")
+            return False, f"资讯检索失败: {str(e)}", False
+
+
+class TopicRSSHealthCommand(BaseCommand):
+    """查看RSS源健康状态命令"""
+
+    command_name = "topic_rss_health"
+    command_description = "查看各RSS源的连续失败次数、最近错误、延迟与退避/隔离状态"
+    command_usage = "/topic_rss_health - 查看RSS源健康状态"
+    command_pattern = r"^/topic_rss_health$"
+
+    @staticmethod
+    def _format_delay(seconds: float) -> str:
+        if seconds <= 0:
+            return "已到期"
+        if seconds < 3600:
+            return f"{int(seconds // 60)} 分钟后"
+        return f"{seconds / 3600:.1f} 小时后"
+
+    async def execute(self, **kwargs) -> Tuple[bool, str, bool]:
+        """执行RSS健康查看命令"""
+        try:
+            # 获取插件实例
+            from src.plugin_system.core.plugin_manager import plugin_manager
+            plugin_instance = plugin_manager.get_plugin_instance("topic_finder_plugin")
+
+            if not plugin_instance:
+                await self.send_text("❌ 无法获取话题插件实例")
+                return False, "插件实例获取失败", False
+
+            rss_manager = plugin_instance.rss_manager
+            if not rss_manager:
+                await self.send_text("RSS 功能未启用")
+                return True, "RSS未启用", False
+
+            report = await rss_manager.health_report()
+            if not report:
+                await self.send_text("未配置RSS订阅源")
+                return True, "RSS健康查看完成", False
+
+            now = time.time()
+            response_parts = [f"📡 RSS源健康状态（共 {len(report)} 个）：\n"]
+            for i, entry in enumerate(report, 1):
+                if entry["quarantined_since"]:
+                    status = "⛔ 隔离中"
+                elif entry["retry_at"] > now:
+                    status = "⏳ 退避中"
+                elif entry["total_polls"]:
+                    status = "✅ 正常"
+                else:
+                    status = "⚪ 未拉取"
+                response_parts.append(f"{i}. {status} {entry['url']}")
+                details = []
+                if entry["latency_ewma"] is not None:
+                    details.append(f"延迟 {entry['latency_ewma'] * 1000:.0f}ms")
+                details.append(f"失败 {entry['total_failures']}/{entry['total_polls']} 次")
+                if entry["interval"]:
+                    details.append(f"轮询间隔 {entry['interval'] / 60:.0f} 分钟")
+                next_poll = max(entry["next_poll"] or 0, entry["retry_at"])
+                details.append(("下次探测 " if entry["quarantined_since"] else "下次拉取 ") + self._format_delay(next_poll - now))
+                response_parts.append("   " + " · ".join(details))
+                if entry["consecutive_failures"]:
+                    response_parts.append(f"   连续失败 {entry['consecutive_failures']} 次，最近错误：{entry['last_error']}")
+
+            await self.send_text("\n".join(response_parts))
+            return True, "RSS健康查看完成", False
+
+        except Exception as e:
+            logger.error(f"查看RSS健康状态失败: {e}")
+            await self.send_text(f"❌ 查看RSS健康状态失败: {str(e)}")
+            return False, f"查看RSS健康状态失败: {str(e)}", False
+
+
+class TopicStatsCommand(BaseCommand):
+    """查看运行指标命令"""
+
+    command_name = "topic_stats"
+    command_description = "汇总话题流水线各阶段的耗时分位数（p50/p95/p99）与计数"
+    command_usage = "/topic_stats [指标名关键词] - 查看运行指标，带关键词时按标签展开"
+    command_pattern = r"^/topic_stats(?:\s+(?P<keyword>\S+))?$"
+
+    @staticmethod
+    def _format_seconds(value: Optional[float]) -> str:
+        if value is None:
+            return "-"
+        return f"{value * 1000:.0f}ms" if value < 1 else f"{value:.2f}s"
+
+    @classmethod
+    def _format_histogram(cls, stats: Dict[str, Any]) -> str:
+        return (f"{stats['count']} 次 / p50 {cls._format_seconds(stats.get('p50'))} / "
+                f"p95 {cls._format_seconds(stats.get('p95'))} / p99 {cls._format_seconds(stats.get('p99'))}")
+
+    async def execute(self, **kwargs) -> Tuple[bool, str, bool]:
+        """执行指标查看命令"""
+        try:
+            if not metrics.enabled:
+                await self.send_text("运行指标未启用（metrics.enable_metrics = false）")
+                return True, "指标未启用", False
+
+            keyword = ((self.matched_groups or {}).get("keyword") or "").strip()
+            summary = metrics.summary(keyword)
+            if not any(summary.values()):
+                await self.send_text(f"暂无{'与「' + keyword + '」相关的' if keyword else ''}指标数据")
+                return True, "指标查看完成", False
+
+            response_parts = ["📊 话题插件运行指标" + (f"（{keyword}）" if keyword else "") + "\n"]
+            if summary["histograms"]:
+                response_parts.append("⏱️ 耗时（次数 / p50 / p95 / p99）:")
+                for name, stats in summary["histograms"].items():
+                    response_parts.append(f"- {name}: {self._format_histogram(stats)}")
+                    for labels, label_stats in stats.get("labels", {}).items():
+                        response_parts.append(f"    {labels or '(无标签)'}: {self._format_histogram(label_stats)}")
+            for title, key in (("🔢 计数:", "counters"), ("📈 当前值:", "gauges")):
+                if not summary[key]:
+                    continue
+                response_parts.append(title)
+                for name, stats in summary[key].items():
+                    response_parts.append(f"- {name}: {stats['total']:g}")
+                    for labels, value in stats.get("labels", {}).items():
+                        response_parts.append(f"    {labels or '(无标签)'}: {value:g}")
+
+            await self.send_text("\n".join(response_parts))
+            return True, "指标查看完成", False
+
+        except Exception as e:
+            logger.error(f"查看运行指标失败: {e}")
+            await self.send_text(f"❌ 查看运行指标失败: {str(e)}")
+            return False, f"查看运行指标失败: {str(e)}", False
+
+
+class TopicTraceCommand(BaseCommand):
+    """查看发送追踪命令"""
+
+    command_name = "topic_trace"
+    command_description = "查看最近 N 次话题发送的关联 ID 与各阶段耗时"
+    command_usage = "/topic_trace [n] - 查看最近 n 次（默认 3，最多 20）话题发送的阶段耗时"
+    command_pattern = r"^/topic_trace(?:\s+(?P<count>\d+))?$"
+
+    MAX_COUNT = 20
+    STATUS_ICONS = {"ok": "✅", "timeout": "⏱️", "in_progress": "⏳"}
+    SPAN_FIELDS = ("name", "start_ms", "duration_ms", "status")
+
+    @staticmethod
+    def _format_ms(value: Optional[float]) -> str:
+        if value is None:
+            return "-"
+        return f"{value:.0f}ms" if value < 1000 else f"{value / 1000:.2f}s"
+
+    @classmethod
+    def _format_trace(cls, record: Dict[str, Any]) -> List[str]:
+        started = datetime.fromtimestamp(record["started_at"]).strftime("%m-%d %H:%M:%S")
+        icon = cls.STATUS_ICONS.get(record["status"], "❌")
+        lines = [f"#{record['trace_id']} {started} 群 {record['chat_id']}（{record['reason']}）"
+                 f"{icon} {record['status']} {cls._format_ms(record['duration_ms'])}"]
+        for span in record["spans"]:
+            indent = "  " * (span["name"].count(".") + 1)
+            extras = [f"{k}={v}" for k, v in span.items() if k not in cls.SPAN_FIELDS]
+            if span["status"] != "ok":
+                extras.insert(0, span["status"])
+            suffix = f"（{', '.join(extras)}）" if extras else ""
+            lines.append(f"{indent}+{cls._format_ms(span['start_ms'])} {span['name']} "
+                         f"{cls._format_ms(span['duration_ms'])}{suffix}")
+        return lines
+
+    async def execute(self, **kwargs) -> Tuple[bool, str, bool]:
+        """执行追踪查看命令"""
+        try:
+            # 获取插件实例
+            from src.plugin_system.core.plugin_manager import plugin_manager
+            plugin_instance = plugin_manager.get_plugin_instance("topic_finder_plugin")
+
+            if not plugin_instance:
+                await self.send_text("❌ 无法获取话题插件实例")
+                return False, "插件实例获取失败", False
+
+            count = int((self.matched_groups or {}).get("count") or 3)
+            records = plugin_instance.traces.recent(min(max(1, count), self.MAX_COUNT))
+            if not records:
+                enabled = plugin_instance.get_config("tracing.enable_tracing", True)
+                await self.send_text("暂无话题发送追踪记录" if enabled else "发送追踪未启用（tracing.enable_tracing = false）")
+                return True, "追踪查看完成", False
+
+            response_parts = [f"🧭 最近 {len(records)} 次话题发送：\n"]
+            for record in records:
+                response_parts.extend(self._format_trace(record))
+                response_parts.append("")
+
+            await self.send_text("\n".join(response_parts).rstrip())
+            return True, "追踪查看完成", False
+
+        except Exception as e:
+            logger.error(f"查看发送追踪失败: {e}")
+            await self.send_text(f"❌ 查看发送追踪失败: {str(e)}")
+            return False, f"查看发送追踪失败: {str(e)}", False
+
+
 @register_plugin
 class TopicFinderPlugin(BasePlugin):
     """麦麦找话题插件"""
@@ -1385,11 +4747,18 @@ class TopicFinderPlugin(BasePlugin):
         "plugin": {
             "enabled": ConfigField(bool, default=True, description="是否启用插件"),
             "config_version": ConfigField(str, default="1.0.0", description="配置文件版本"),
+            "enable_hot_reload": ConfigField(bool, default=True, description="是否监视 config.toml 并热重载（存储后端、组件开关等仍需重启）"),
+            "config_reload_interval_seconds": ConfigField(int, default=10, description="配置文件修改检查间隔（秒）"),
         },
         "schedule": {
             "daily_times": ConfigField(list, default=["09:00", "14:00", "20:00"], description="每日发送话题的时间点"),
             "enable_daily_schedule": ConfigField(bool, default=True, description="是否启用定时发送"),
             "min_interval_hours": ConfigField(int, default=2, description="话题发送最小间隔（小时）"),
+            "timezone": ConfigField(str, default="", description="定时时间点所用时区（如 Asia/Shanghai），留空为本机时区"),
+            "catch_up_policy": ConfigField(str, default="latest", description="错过时间点的补发策略：skip/latest/all"),
+            "catch_up_grace_minutes": ConfigField(int, default=30, description="错过时间点后仍允许补发的宽限时间（分钟）"),
+            "stagger_window_seconds": ConfigField(int, default=300, description="同一时间点的多群发送分散到该窗口内（秒）"),
+            "max_sends_per_second": ConfigField(float, default=0.5, description="定时发送的持续速率上限（次/秒），0 表示不限"),
         },
         "silence_detection": {
             "enable_silence_detection": ConfigField(bool, default=True, description="是否启用群聊静默检测"),
@@ -1404,11 +4773,29 @@ class TopicFinderPlugin(BasePlugin):
             "update_interval_minutes": ConfigField(int, default=30, description="RSS更新间隔（分钟）"),
             "cache_hours": ConfigField(int, default=6, description="RSS内容缓存时间（小时）"),
             "max_items_per_source": ConfigField(int, default=10, description="每次获取的最大条目数"),
+            "max_download_kb": ConfigField(int, default=2048, description="单个RSS源的下载上限（KB），解析满 max_items_per_source 条即提前停止"),
+            "request_timeout_seconds": ConfigField(int, default=30, description="单个RSS源的请求超时（秒）"),
+            "failure_backoff_minutes": ConfigField(int, default=5, description="源拉取失败后的退避基准时间（分钟），按连续失败次数指数增长"),
+            "max_backoff_minutes": ConfigField(int, default=120, description="失败退避时间上限（分钟）"),
+            "quarantine_after_failures": ConfigField(int, default=5, description="连续失败达到该次数后隔离该源（0 为不隔离）"),
+            "quarantine_probe_minutes": ConfigField(int, default=360, description="隔离中的源的探测间隔（分钟），探测成功即解除隔离"),
+            "adaptive_polling": ConfigField(bool, default=True, description="按各源的更新频率与 ttl/sy:updatePeriod/Cache-Control 提示分别调整轮询间隔"),
+            "min_poll_minutes": ConfigField(int, default=5, description="自适应轮询的最短间隔（分钟）"),
+            "max_poll_minutes": ConfigField(int, default=360, description="自适应轮询的最长间隔（分钟），不超过 cache_hours"),
         },
         "topic_generation": {
             "topic_prompt": ConfigField(str, default="", description="话题生成的prompt模板"),
             "fallback_topics": ConfigField(list, default=[], description="备用话题列表"),
             "combine_strategy": ConfigField(str, default="merge", description="内容合并策略：merge/prefer_rss/prefer_web"),
+            "max_input_tokens": ConfigField(int, default=700, description="话题生成 prompt 的输入 token 预算（估算值，含模板与人设）"),
+            "max_items": ConfigField(int, default=4, description="每次放入 prompt 的资讯条数上限"),
+            "description_max_tokens": ConfigField(int, default=80, description="单条资讯描述的 token 上限，超出部分截断"),
+            "models": ConfigField(list, default=["replyer"], description="话题生成模型（主程序模型任务名）按优先级排列，失败或过慢时依次切换"),
+            "enable_hedging": ConfigField(bool, default=True, description="首选模型超过其 p95 延迟未返回时并行请求下一个模型"),
+            "hedge_default_delay_seconds": ConfigField(float, default=8.0, description="延迟样本不足时的对冲等待时间（秒）"),
+            "hedge_min_delay_seconds": ConfigField(float, default=2.0, description="对冲等待时间下限（秒）"),
+            "hedge_max_delay_seconds": ConfigField(float, default=20.0, description="对冲等待时间上限（秒）"),
+            "model_timeout_seconds": ConfigField(float, default=45.0, description="单个模型请求超时（秒）"),
         },
         "filtering": {
             "target_groups": ConfigField(list, default=[], description="目标群聊列表"),
@@ -1426,6 +4813,16 @@ class TopicFinderPlugin(BasePlugin):
             "web_info_prompt": ConfigField(str, default="", description="联网信息获取prompt"),
             "web_info_update_interval": ConfigField(int, default=20, description="联网信息更新间隔（分钟）"),
             "web_info_cache_hours": ConfigField(int, default=2, description="联网信息缓存时间（小时）"),
+            "providers": ConfigField(list, default=[], description="多个联网大模型端点（[[web_llm.providers]]：name/base_url/api_key 或 api_key_env/model_name/weight/quota_per_hour），为空时使用上面的单一端点"),
+            "balance_strategy": ConfigField(str, default="least_outstanding", description="端点负载均衡策略：least_outstanding（最少在途请求）/weighted（按权重随机）"),
+            "parallel_providers": ConfigField(int, default=2, description="每次刷新并行请求的端点数，结果合并去重"),
+            "fetch_mode": ConfigField(str, default="single", description="获取方式：single（一次通用请求）/category（按分类分片并行请求，各分类独立刷新）"),
+            "categories": ConfigField(list, default=["科技", "娱乐", "体育", "财经", "社会", "国际", "文化", "健康"], description="category 模式下的资讯分类"),
+            "category_prompt": ConfigField(str, default="", description="分类请求的prompt模板，支持 {category} {count} {current_date} {current_time}，留空使用内置模板"),
+            "items_per_category": ConfigField(int, default=3, description="每个分类获取的条目数"),
+            "category_max_tokens": ConfigField(int, default=300, description="单个分类请求的最大输出token数"),
+            "max_concurrent_queries": ConfigField(int, default=3, description="category 模式下同时进行的请求数上限"),
+            "category_ttl_minutes": ConfigField(dict, default={}, description="各分类的刷新间隔（分钟），未列出的分类使用 web_info_update_interval"),
         },
         "advanced": {
             "enable_smart_timing": ConfigField(bool, default=True, description="是否启用智能时机检测"),
@@ -1433,6 +4830,52 @@ class TopicFinderPlugin(BasePlugin):
             "debug_mode": ConfigField(bool, default=False, description="调试模式"),
             "recent_topics_window_hours": ConfigField(int, default=48, description="近N小时内避免重复话题"),
             "recent_topics_max_items": ConfigField(int, default=50, description="最近话题缓存的最大条目数/每群"),
+            "item_index_max_items": ConfigField(int, default=5000, description="资讯倒排索引的最大条目数"),
+            "search_result_limit": ConfigField(int, default=5, description="/topic_search 返回的最大条目数"),
+            "persona_check_interval_seconds": ConfigField(int, default=60, description="检查主程序人设文件是否修改的间隔（秒）"),
+        },
+        "metrics": {
+            "enable_metrics": ConfigField(bool, default=True, description="是否记录运行指标（/topic_stats 与导出依赖此项）"),
+            "export_path": ConfigField(str, default="", description="定期写入 Prometheus 文本格式指标的文件路径（相对插件目录），留空不导出"),
+            "export_interval_seconds": ConfigField(int, default=60, description="指标文件的写入间隔（秒）"),
+            "http_port": ConfigField(int, default=0, description="在该端口提供 /metrics 供 Prometheus 抓取，0 表示不启用"),
+            "http_host": ConfigField(str, default="127.0.0.1", description="/metrics 监听地址"),
+        },
+        "tracing": {
+            "enable_tracing": ConfigField(bool, default=True, description="是否记录每次话题发送的阶段耗时追踪（/topic_trace 查看）"),
+            "buffer_size": ConfigField(int, default=200, description="内存中保留的最近追踪条数"),
+            "jsonl_path": ConfigField(str, default="", description="追加写入追踪记录的 JSONL 文件路径（相对插件目录），留空不写文件"),
+            "jsonl_max_kb": ConfigField(int, default=10240, description="JSONL 文件超过该大小（KB）时轮转为 .1"),
+        },
+        "interest_profile": {
+            "enable_interest_profile": ConfigField(bool, default=True, description="是否根据群聊消息构建兴趣画像以挑选资讯"),
+            "half_life_hours": ConfigField(float, default=24.0, description="兴趣词权重的衰减半衰期（小时）"),
+            "max_terms_per_chat": ConfigField(int, default=200, description="每个群聊画像保留的最大词数"),
+            "max_chats": ConfigField(int, default=2000, description="最多维护画像的群聊数量（超出按最久未活跃淘汰）"),
+            "candidate_pool": ConfigField(int, default=4, description="按画像选出的候选资讯数量"),
+        },
+        "pipeline": {
+            "stream_timeout_seconds": ConfigField(float, default=5, description="聊天流解析阶段超时（秒）"),
+            "generation_timeout_seconds": ConfigField(float, default=90, description="话题获取/生成阶段超时（秒）"),
+            "send_timeout_seconds": ConfigField(float, default=120, description="发送阶段超时（秒，含排队等待；已开始发送的消息会等待结果，不计为超时）"),
+            "stream_cache_ttl_seconds": ConfigField(int, default=3600, description="聊天流解析结果缓存时间（秒）"),
+            "stream_negative_ttl_seconds": ConfigField(int, default=300, description="未找到聊天流的负缓存时间（秒）"),
+            "stream_list_ttl_seconds": ConfigField(int, default=300, description="群聊流列表缓存时间（秒）"),
+        },
+        "dispatch": {
+            "global_rate_per_second": ConfigField(float, default=1.0, description="全局发送速率上限（条/秒），0 表示不限"),
+            "global_burst": ConfigField(int, default=3, description="全局发送允许的突发条数"),
+            "per_chat_rate_per_minute": ConfigField(float, default=6, description="单个群聊发送速率上限（条/分钟），0 表示不限"),
+            "per_chat_burst": ConfigField(int, default=2, description="单个群聊允许的突发条数"),
+            "max_queue_size": ConfigField(int, default=500, description="出站队列容量，超出时拒绝新的发送"),
+            "queue_warn_size": ConfigField(int, default=100, description="队列积压达到该数量时输出告警"),
+            "max_send_retries": ConfigField(int, default=2, description="发送失败的重试次数（不重新生成话题）"),
+            "retry_backoff_seconds": ConfigField(float, default=2.0, description="重试退避基准时间（秒），按次数指数增长"),
+        },
+        "storage": {
+            "backend": ConfigField(str, default="sqlite", description="数据存储后端：sqlite（默认，首次启动自动迁移旧JSON）/json"),
+            "cache_format": ConfigField(str, default="json", description="仅 json 后端生效，资讯缓存文件格式：json/binary（带版本头的紧凑格式，文件更小、加载不慢于 json；安装 msgpack 时使用 msgpack）"),
+            "write_debounce_seconds": ConfigField(float, default=2.0, description="json 后端高频写入（最近话题）的防抖落盘延迟（秒），0 表示立即写入"),
         },
         # 按群覆盖：active_hours_start/end、silence_threshold_minutes
         "group_overrides": ConfigField(dict, default={}, description="群聊级别的活跃时段与静默阈值覆盖"),
@@ -1440,20 +4883,73 @@ class TopicFinderPlugin(BasePlugin):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.rss_manager = None
-        self.web_llm_manager = None
+        # RSS / 联网管理器在对应功能启用且首次使用时才创建（见 rss_manager / web_llm_manager）
+        self._rss_manager: Optional[RSSManager] = None
+        self._web_llm_manager: Optional[WebLLMManager] = None
         self.topic_generator = None
         self.last_topic_time = {}  # 记录每个群聊最后发送话题的时间
-        self.last_scheduled_check = 0  # 记录最后一次定时检查的时间
-        self._persona_cache: Optional[str] = None
-        self._recent_topics_path = None
+        self._next_dispatch_ts = 0.0  # 全局下一个可用的定时发送时刻（限速预约）
+        # 不可变配置快照：组件按引用读取，热重载时整体替换
+        self.config_snapshot = ConfigSnapshot(validate_config(self.config, self.config_schema)[0], version=1)
+        self._config_reloader: Optional[ConfigReloader] = None
+        self._schedule_changed = asyncio.Event()
+        self.dispatcher = OutboundDispatcher(**self._dispatch_settings())
+        self._background_tasks: set = set()
+        self._inflight_chats: set = set()  # 正在执行发送流程的群聊
+        self._unsent_topics: Dict[str, str] = {}  # 已生成但未成功发出的话题，下次优先复用
+        self.stream_cache = StreamResolutionCache(
+            ttl_seconds=self.get_config("pipeline.stream_cache_ttl_seconds", 3600),
+            negative_ttl_seconds=self.get_config("pipeline.stream_negative_ttl_seconds", 300),
+            list_ttl_seconds=self.get_config("pipeline.stream_list_ttl_seconds", 300),
+        )
+        self._eligibility: Optional[GroupEligibilityIndex] = None
+        self._eligibility_snapshot: Optional[ConfigSnapshot] = None
+        metrics.enabled = bool(self.get_config("metrics.enable_metrics", True))
+        self._metrics_writer = AtomicFileWriter()
+        self._metrics_runner = None
+        self.traces = TraceRecorder(**self._trace_settings())
+        base_dir = Path(self.plugin_dir).parent if self.plugin_dir else Path.cwd()
+        self.persona = PersonaLoader(
+            base_dir / "MaiBot" / "config" / "bot_config.toml",
+            check_interval_seconds=self.get_config("advanced.persona_check_interval_seconds", 60),
+        )
+        self.store = None
+        self.interest_profiles: Optional[ChatInterestProfiles] = None
+        self.item_index = TopicItemIndex(max_items=self.get_config("advanced.item_index_max_items", 5000))
+
+        if self.get_config("interest_profile.enable_interest_profile", True):
+            self.interest_profiles = ChatInterestProfiles(
+                half_life_hours=self.get_config("interest_profile.half_life_hours", 24.0),
+                max_terms=self.get_config("interest_profile.max_terms_per_chat", 200),
+                max_chats=self.get_config("interest_profile.max_chats", 2000),
+            )
 
         # 初始化管理器
         if self.plugin_dir:
-            self.rss_manager = RSSManager(Path(self.plugin_dir), self.config)
-            self.web_llm_manager = WebLLMManager(Path(self.plugin_dir), self.config)
-            self.topic_generator = TopicGenerator(self.config)
-            self._recent_topics_path = Path(self.plugin_dir) / "data" / "recent_topics.json"
+            data_dir = Path(self.plugin_dir) / "data"
+            self.store = create_topic_store(
+                data_dir,
+                self.get_config("storage.backend", "sqlite"),
+                write_debounce_seconds=self.get_config("storage.write_debounce_seconds", 2.0),
+                cache_format=self.get_config("storage.cache_format", "json"),
+            )
+            self.topic_generator = TopicGenerator(self.config_snapshot, self.item_index)
+            self._config_reloader = ConfigReloader(Path(self.plugin_dir) / self.config_file_name, self.config_schema)
+            self._config_reloader.prime()
+
+    @property
+    def rss_manager(self) -> Optional[RSSManager]:
+        """RSS 管理器；未启用 RSS 时不创建并返回 None"""
+        if self._rss_manager is None and self.plugin_dir and self.get_config("rss.enable_rss", True):
+            self._rss_manager = RSSManager(Path(self.plugin_dir), self.config_snapshot, self.item_index, self.store)
+        return self._rss_manager
+
+    @property
+    def web_llm_manager(self) -> Optional[WebLLMManager]:
+        """联网大模型管理器；未启用联网大模型时不创建并返回 None"""
+        if self._web_llm_manager is None and self.plugin_dir and self.get_config("web_llm.enable_web_llm", False):
+            self._web_llm_manager = WebLLMManager(Path(self.plugin_dir), self.config_snapshot, self.item_index, self.store)
+        return self._web_llm_manager
 
     def get_plugin_components(self) -> List[Tuple[Any, type]]:
         """获取插件组件"""
@@ -1462,10 +4958,14 @@ class TopicFinderPlugin(BasePlugin):
         if self.get_config("plugin.enabled", True):
             # 添加事件处理器
             components.append((TopicSchedulerEventHandler.get_handler_info(), TopicSchedulerEventHandler))
+            components.append((TopicStoreShutdownEventHandler.get_handler_info(), TopicStoreShutdownEventHandler))
 
             if self.get_config("silence_detection.enable_silence_detection", True):
                 components.append((ChatSilenceDetectorEventHandler.get_handler_info(), ChatSilenceDetectorEventHandler))
 
+            # 消息观察：兴趣画像（可关闭）与聊天流缓存刷新
+            components.append((ChatInterestProfileEventHandler.get_handler_info(), ChatInterestProfileEventHandler))
+
             # 添加动作组件
             components.append((StartTopicAction.get_action_info(), StartTopicAction))
 
@@ -1475,143 +4975,487 @@ class TopicFinderPlugin(BasePlugin):
             components.append((TopicDebugCommand.get_command_info(), TopicDebugCommand))
             components.append((WebApiTestCommand.get_command_info(), WebApiTestCommand))
             components.append((WebInfoTestCommand.get_command_info(), WebInfoTestCommand))
+            components.append((TopicSearchCommand.get_command_info(), TopicSearchCommand))
+            components.append((TopicRSSHealthCommand.get_command_info(), TopicRSSHealthCommand))
+            components.append((TopicStatsCommand.get_command_info(), TopicStatsCommand))
+            components.append((TopicTraceCommand.get_command_info(), TopicTraceCommand))
 
         return components
 
-    async def _check_scheduled_topics(self):
-        """检查定时话题发送"""
-        try:
-            if not self.get_config("schedule.enable_daily_schedule", True):
-                return
-
-            current_time = datetime.now()
-            current_time_str = current_time.strftime("%H:%M")
+    # 调度循环单次最长休眠，用于感知系统时钟跳变（每小时至多一次空闲唤醒）
+    SCHEDULE_MAX_SLEEP_SECONDS = 3600
+
+    # 变更后需重启插件才会生效的配置项（仅在构建组件或存储时读取一次）
+    RESTART_REQUIRED_KEYS = (
+        "plugin.enabled", "storage.backend", "storage.cache_format", "storage.write_debounce_seconds",
+        "advanced.item_index_max_items", "interest_profile.enable_interest_profile",
+        "interest_profile.half_life_hours", "interest_profile.max_terms_per_chat", "interest_profile.max_chats",
+        "silence_detection.enable_silence_detection", "schedule.enable_daily_schedule",
+        "metrics.export_interval_seconds", "metrics.http_port", "metrics.http_host",
+    )
+
+    def _dispatch_settings(self) -> Dict[str, Any]:
+        """出站发送队列参数"""
+        return {
+            "global_rate": self.get_config("dispatch.global_rate_per_second", 1.0),
+            "global_burst": self.get_config("dispatch.global_burst", 3),
+            "per_chat_rate": self.get_config("dispatch.per_chat_rate_per_minute", 6) / 60,
+            "per_chat_burst": self.get_config("dispatch.per_chat_burst", 2),
+            "max_queue_size": self.get_config("dispatch.max_queue_size", 500),
+            "max_retries": self.get_config("dispatch.max_send_retries", 2),
+            "retry_backoff_seconds": self.get_config("dispatch.retry_backoff_seconds", 2.0),
+            "queue_warn_size": self.get_config("dispatch.queue_warn_size", 100),
+        }
 
-            # 检查是否已经在这个时间点检查过了（避免重复发送）
-            current_minute = current_time.hour * 60 + current_time.minute
-            if abs(current_minute - self.last_scheduled_check) < 5:  # 5分钟内不重复检查
-                return
+    def _trace_settings(self) -> Dict[str, Any]:
+        """发送追踪缓冲区与 JSONL 输出参数"""
+        sink = str(self.get_config("tracing.jsonl_path", "") or "").strip()
+        sink_path = Path(sink) if sink else None
+        if sink_path is not None and not sink_path.is_absolute() and self.plugin_dir:
+            sink_path = Path(self.plugin_dir) / sink_path
+        return {
+            "capacity": self.get_config("tracing.buffer_size", 200),
+            "sink_path": sink_path,
+            "sink_max_bytes": self.get_config("tracing.jsonl_max_kb", 10240) * 1024,
+        }
 
-            daily_times = self.get_config("schedule.daily_times", [])
+    async def reload_config_if_changed(self) -> bool:
+        """检查 config.toml 是否有修改，校验通过则切换到新快照；返回是否发生了重载"""
+        if self._config_reloader is None:
+            return False
+        snapshot = await self._config_reloader.poll(self.config_snapshot.version + 1)
+        if snapshot is None:
+            return False
+        self._apply_config_snapshot(snapshot)
+        return True
+
+    def _apply_config_snapshot(self, snapshot: ConfigSnapshot):
+        """原子切换配置：以下赋值之间没有 await，其他协程只会看到完整的旧配置或新配置
+
+        进行中的刷新/发送在开始时已取得旧快照的引用，会用旧配置完成，不会被中断。
+        """
+        previous = self.config_snapshot
+        restart_keys = [key for key in self.RESTART_REQUIRED_KEYS if previous.get(key) != snapshot.get(key)]
+
+        # 宿主组件通过该字典读取配置，原地替换内容以保持引用不变
+        self.config.clear()
+        self.config.update(snapshot.to_dict())
+        self.config_snapshot = snapshot
+        for component in (self._rss_manager, self._web_llm_manager, self.topic_generator):
+            if component is not None:
+                component.config = snapshot
+
+        self.stream_cache.ttl_seconds = float(self.get_config("pipeline.stream_cache_ttl_seconds", 3600))
+        self.stream_cache.negative_ttl_seconds = float(self.get_config("pipeline.stream_negative_ttl_seconds", 300))
+        self.stream_cache.list_ttl_seconds = float(self.get_config("pipeline.stream_list_ttl_seconds", 300))
+        self.dispatcher.reconfigure(**self._dispatch_settings())
+        self.persona.check_interval_seconds = max(0.0, float(self.get_config("advanced.persona_check_interval_seconds", 60)))
+        metrics.enabled = bool(self.get_config("metrics.enable_metrics", True))
+        self.traces.reconfigure(**self._trace_settings())
+        self._schedule_changed.set()
+
+        logger.info(f"配置已热重载（版本 {snapshot.version}）")
+        if restart_keys:
+            logger.warning(f"以下配置项的修改需重启后生效: {', '.join(restart_keys)}")
+
+    async def export_metrics(self):
+        """将指标以 Prometheus 文本格式写入 metrics.export_path（原子替换，便于 node_exporter textfile 采集）"""
+        export_path = str(self.get_config("metrics.export_path", "") or "").strip()
+        if not export_path or not metrics.enabled:
+            return
+        path = Path(export_path)
+        if not path.is_absolute() and self.plugin_dir:
+            path = Path(self.plugin_dir) / path
+        await self._metrics_writer.write_text(path, metrics.render_prometheus())
+
+    async def start_metrics_server(self):
+        """在 metrics.http_host:metrics.http_port 提供 /metrics 端点"""
+        port = int(self.get_config("metrics.http_port", 0) or 0)
+        if not port or self._metrics_runner is not None:
+            return
+        aiohttp = _optional_import("aiohttp")
+        if not aiohttp:
+            logger.warning("aiohttp未安装，无法提供 /metrics 端点")
+            return
+        from aiohttp import web
 
-            for scheduled_time in daily_times:
-                try:
-                    scheduled_hour, scheduled_minute = map(int, scheduled_time.split(":"))
-                    scheduled_minute_total = scheduled_hour * 60 + scheduled_minute
-
-                    # 检查是否到了发送时间（允许5分钟误差）
-                    if abs(current_minute - scheduled_minute_total) <= 5:
-                        logger.info(f"到达定时发送时间: {scheduled_time}")
-                        await self._send_scheduled_topics()
-                        self.last_scheduled_check = current_minute
-                        break
+        async def handle(request):
+            return web.Response(text=metrics.render_prometheus(), content_type="text/plain",
+                                headers={"X-Content-Type-Options": "nosniff"})
 
-                except ValueError:
-                    logger.error(f"无效的时间格式: {scheduled_time}")
+        app = web.Application()
+        app.router.add_get("/metrics", handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        host = self.get_config("metrics.http_host", "127.0.0.1")
+        try:
+            await web.TCPSite(runner, host, port).start()
+        except OSError as e:
+            await runner.cleanup()
+            logger.error(f"启动 /metrics 端点失败（{host}:{port}）: {e}")
+            return
+        self._metrics_runner = runner
+        logger.info(f"指标端点已启动: http://{host}:{port}/metrics")
+
+    async def stop_metrics_server(self):
+        if self._metrics_runner is not None:
+            runner, self._metrics_runner = self._metrics_runner, None
+            await runner.cleanup()
+
+    def _eligibility_index(self) -> GroupEligibilityIndex:
+        """获取群聊资格索引；配置快照替换（热重载）后首次使用时重建"""
+        snapshot = self.config_snapshot
+        if self._eligibility is None or self._eligibility_snapshot is not snapshot:
+            self._eligibility = GroupEligibilityIndex(
+                snapshot.get("filtering.target_groups", ()),
+                snapshot.get("filtering.exclude_groups", ()),
+                snapshot.get("group_overrides") or {},
+                snapshot.get("schedule.timezone", ""),
+                snapshot.get("silence_detection.active_hours_start", 8),
+                snapshot.get("silence_detection.active_hours_end", 23),
+            )
+            self._eligibility_snapshot = snapshot
+        return self._eligibility
+
+    def _schedule_slots(self) -> List[Tuple[str, str, str]]:
+        """汇总所有 (作用范围, 时区, 时间点)
+
+        全局 daily_times 按 schedule.timezone 及各群的时区覆盖展开（作用范围为空）；
+        在 group_overrides 中设置了 daily_times 的群聊使用独立的时间点（作用范围为群聊 ID）。
+        """
+        daily_times = self.get_config("schedule.daily_times", []) or []
+        default_tz = str(self.get_config("schedule.timezone", "") or "")
+        overrides = self.get_config("group_overrides", {}) or {}
+
+        timezones = {default_tz}
+        slots: List[Tuple[str, str, str]] = []
+        for chat_id, ov in overrides.items():
+            if not isinstance(ov, Mapping):
+                continue
+            group_tz = str(ov.get("timezone") or default_tz)
+            if "daily_times" in ov:
+                scope = GroupEligibilityIndex.normalize_id(chat_id)
+                slots.extend((scope, group_tz, str(t)) for t in ov.get("daily_times") or [])
+            else:
+                timezones.add(group_tz)
+        slots.extend(("", tz_name, str(t)) for tz_name in sorted(timezones) for t in daily_times)
+        return slots
+
+    async def _run_schedule_loop(self):
+        """按截止时间调度 daily_times：休眠到最近的触发时刻，醒来后按补发策略处理到期/错过的时间点"""
+        if not self.get_config("schedule.enable_daily_schedule", True):
+            logger.info("定时发送未启用，调度循环退出")
+            return
 
-        except Exception as e:
-            logger.error(f"检查定时话题失败: {e}")
+        scheduler = DailySlotScheduler(
+            catch_up_policy=self.get_config("schedule.catch_up_policy", "latest"),
+            catch_up_grace_seconds=self.get_config("schedule.catch_up_grace_minutes", 30) * 60,
+        )
+        for _, _, slot in self._schedule_slots():
+            if not scheduler.parse_time(slot):
+                logger.error(f"无效的时间格式: {slot}")
 
-    async def _send_scheduled_topics(self):
-        """发送定时话题到所有目标群聊"""
+        # 从检查点恢复，重启后可按策略补发停机期间错过的时间点
+        last_run = time.time()
+        if self.store:
+            try:
+                last_run = float(await self.store.get_meta("schedule_last_run", last_run))
+            except Exception as e:
+                logger.warning(f"读取定时调度检查点失败: {e}")
+
+        while True:
+            now = time.time()
+            if now < last_run - 1:
+                # 时钟回拨：回拨幅度超出补发宽限时重置检查点，否则保持以免重复触发
+                logger.warning(f"检测到系统时钟回拨 {int(last_run - now)} 秒")
+                if last_run - now > scheduler.catch_up_grace_seconds:
+                    last_run = now
+            else:
+                slots = self._schedule_slots()
+                for scope, tz_name, slot, _ in scheduler.due(slots, last_run, now):
+                    logger.info(f"到达定时发送时间: {slot}（{tz_name or '本机时区'}{f'，群聊 {scope}' if scope else ''}）")
+                    # 分散发送可能持续数分钟，放到后台执行，不阻塞后续时间点的调度
+                    self._spawn_background(self._send_scheduled_topics(tz_name, scope))
+                last_run = now
+                if self.store:
+                    try:
+                        await self.store.set_meta("schedule_last_run", last_run)
+                    except Exception as e:
+                        logger.warning(f"保存定时调度检查点失败: {e}")
+
+            deadline = scheduler.next_deadline(self._schedule_slots(), time.time())
+            if deadline is None:
+                logger.info("未配置有效的定时时间点，调度循环退出")
+                return
+            delay = max(0.0, deadline - time.time())
+            logger.debug(f"下一次定时检查在 {int(delay)} 秒后")
+            # 配置热重载后提前唤醒，按新的时间点重新计算截止时间
+            self._schedule_changed.clear()
+            try:
+                await asyncio.wait_for(self._schedule_changed.wait(), timeout=min(delay, self.SCHEDULE_MAX_SLEEP_SECONDS))
+            except asyncio.TimeoutError:
+                pass
+
+    def _spawn_background(self, coro):
+        """启动后台任务并保留引用，避免任务被提前回收"""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    def _stagger_delays(self, count: int) -> List[float]:
+        """为一次定时发送的 count 个群聊计算分散发送延迟
+
+        在 stagger_window_seconds 窗口内等间距排布并加随机抖动；按 max_sends_per_second
+        在全局范围预约发送时刻（跨时间点、跨作用范围共享），保证持续发送速率不超过上限。
+        """
+        if count <= 0:
+            return []
+        window = max(0.0, float(self.get_config("schedule.stagger_window_seconds", 300)))
+        rate = float(self.get_config("schedule.max_sends_per_second", 0.5))
+        min_gap = 1.0 / rate if rate > 0 else 0.0
+        window = max(window, min_gap * count)
+        spacing = window / count
+        jitter = max(0.0, spacing - min_gap)
+
+        now = time.time()
+        delays = []
+        for i in range(count):
+            planned = now + i * spacing + random.uniform(0, jitter)
+            reserved = max(planned, self._next_dispatch_ts)
+            self._next_dispatch_ts = reserved + min_gap
+            delays.append(reserved - now)
+        return delays
+
+    async def _send_scheduled_topics(self, tz_name: str = "", scope: str = ""):
+        """发送定时话题到目标群聊：scope 为空时发送给使用全局时间点且时区为 tz_name 的群聊，否则只发送给该群"""
         try:
-            # 获取目标群聊列表
-            target_groups = self.get_config("filtering.target_groups", [])
-            exclude_groups = self.get_config("filtering.exclude_groups", [])
-            group_only = self.get_config("filtering.group_only", True)
+            eligibility = self._eligibility_index()
 
-            # 获取所有群聊
-            if not target_groups:
-                # 如果没有指定目标群聊，获取所有群聊
-                all_streams = chat_api.get_group_streams() if group_only else chat_api.get_all_streams()
-                target_chats = [stream.stream_id for stream in all_streams]
+            # 候选为 (聊天流/群聊 ID, 群号)：指定了目标群聊时直接使用群号
+            if eligibility.targets:
+                candidates = [(group_id, group_id) for group_id in eligibility.targets]
             else:
-                target_chats = target_groups
+                # 如果没有指定目标群聊，获取所有群聊（流列表有缓存，不在每个时间点重复查询）
+                group_only = self.get_config("filtering.group_only", True)
 
-            # 过滤排除的群聊
-            target_chats = [chat_id for chat_id in target_chats if chat_id not in exclude_groups]
+                def load_streams() -> List[Tuple[str, Optional[str]]]:
+                    all_streams = chat_api.get_group_streams() if group_only else chat_api.get_all_streams()
+                    entries = []
+                    for stream in all_streams:
+                        group_info = getattr(stream, "group_info", None)
+                        entries.append((stream.stream_id, getattr(group_info, "group_id", None)))
+                    return entries
 
-            # 发送话题到每个目标群聊（尊重群聊活跃时段覆盖）
-            now_hour = datetime.now().hour
-            overrides = self.get_config("group_overrides", {}) or {}
+                candidates = self.stream_cache.get_stream_list(load_streams)
 
-            def in_window(hour: int, start: int, end: int) -> bool:
-                if start <= end:
-                    return start <= hour <= end
-                return (hour >= start) or (hour <= end)
+            # 按排除列表、作用范围、时区与活跃时段筛选本次发送的群聊（该时区的当前小时只计算一次）
+            tz = DailySlotScheduler.get_timezone(tz_name)
+            now_hour = datetime.now(tz).hour if tz else datetime.now().hour
+            selected = eligibility.select(candidates, tz_name, eligibility.normalize_id(scope), now_hour)
 
-            for chat_id in target_chats:
-                ov = overrides.get(str(chat_id), {})
-                active_start = ov.get("active_hours_start", self.get_config("silence_detection.active_hours_start", 8))
-                active_end = ov.get("active_hours_end", self.get_config("silence_detection.active_hours_end", 23))
+            if not selected:
+                return
 
-                if not in_window(now_hour, active_start, active_end):
-                    logger.debug(f"群聊 {chat_id} 当前不在活跃时段[{active_start}-{active_end}]，跳过定时发送")
-                    continue
+            # 打乱顺序并分散到发送窗口内，避免同一分钟集中生成与发送
+            random.shuffle(selected)
+            delays = self._stagger_delays(len(selected))
+            logger.info(f"定时发送 {len(selected)} 个群聊，分散在 {int(delays[-1])} 秒内完成")
 
+            async def send_later(chat_id: Any, delay: float):
+                if delay > 0:
+                    await asyncio.sleep(delay)
                 await self._send_topic_to_chat(chat_id, reason="定时发送")
 
+            await asyncio.gather(*(send_later(c, d) for c, d in zip(selected, delays)))
+
         except Exception as e:
             logger.error(f"发送定时话题失败: {e}")
 
-    async def _send_topic_to_chat(self, chat_id: str, reason: str = "话题发送"):
-        """发送话题到指定群聊"""
-        try:
-            # 检查发送间隔
-            min_interval = self.get_config("schedule.min_interval_hours", 2) * 3600
-            current_time = time.time()
+    async def _send_topic_to_chat(self, chat_id: str, reason: str = "话题发送",
+                                  priority: int = OutboundDispatcher.PRIORITY_SCHEDULED):
+        """发送话题到指定群聊
 
-            if chat_id in self.last_topic_time:
-                if current_time - self.last_topic_time[chat_id] < min_interval:
-                    logger.debug(f"群聊 {chat_id} 话题发送间隔未到，跳过")
-                    return
+        分阶段执行，廉价的拒绝尽量前置：资格检查 -> 聊天流解析 -> 获取话题（未发出的缓存/生成） -> 排队发送；
+        每个阶段有独立超时，整个流程可被取消。
+        """
+        if not self._check_send_eligibility(chat_id):
+            return
 
-            # 生成话题内容
-            topic_content = await self._generate_topic_content()
-
-            # 近N小时去重：如重复，重试一次，否则使用备用话题
-            if await self._is_recent_duplicate(chat_id, topic_content):
-                logger.info(f"检测到与近时段内话题重复，进行一次重试: {chat_id}")
-                retry = await self._generate_topic_content()
-                if retry and not await self._is_recent_duplicate(chat_id, retry):
-                    topic_content = retry
-                else:
-                    topic_content = self.topic_generator._get_fallback_topic()
+        self._inflight_chats.add(chat_id)
+        started = time.perf_counter()
+        status = "error"
+        # 发送追踪：各阶段（含嵌套的抓取/生成/排队）记录到同一条追踪，日志带关联 ID 便于对照
+        trace = self.traces.start(chat_id, reason) if self.get_config("tracing.enable_tracing", True) else None
+        trace_token = _CURRENT_TRACE.set(trace)
+        tag = f"[{trace.trace_id}] " if trace else ""
+        try:
+            stage = "聊天流解析"
+            with trace_span("resolve_stream"):
+                stream_id = await asyncio.wait_for(
+                    self._resolve_stream_id(chat_id),
+                    timeout=self.get_config("pipeline.stream_timeout_seconds", 5),
+                )
+            if not stream_id:
+                status = "no_stream"
+                logger.error(f"{tag}发送话题到群聊失败: 未找到聊天流 {chat_id}")
+                return
 
+            stage = "话题获取"
+            with trace_span("acquire"):
+                topic_content = await asyncio.wait_for(
+                    self._acquire_topic(chat_id),
+                    timeout=self.get_config("pipeline.generation_timeout_seconds", 90),
+                )
             if not topic_content:
-                logger.warning(f"无法生成话题内容，跳过群聊 {chat_id}")
+                status = "no_topic"
+                logger.warning(f"{tag}无法生成话题内容，跳过群聊 {chat_id}")
                 return
 
-            # 发送话题
-            stream_id = str(chat_id)
-            stream = get_chat_manager().get_stream(stream_id)
-            if not stream:
-                stream_obj = chat_api.get_stream_by_group_id(str(chat_id))
-                if not stream_obj:
-                    stream_obj = chat_api.get_stream_by_user_id(str(chat_id))
-                if not stream_obj:
-                    logger.error(f"发送话题到群聊失败: 未找到聊天流 {chat_id}")
-                    return
-                stream_id = stream_obj.stream_id
-
-            await send_api.text_to_stream(
-                text=topic_content,
-                stream_id=stream_id,
-                typing=False,
-                storage_message=True,
-            )
+            stage = "发送"
+            with trace_span("dispatch"):
+                pending = self._dispatch_topic(stream_id, topic_content, priority)
+                try:
+                    sent = await asyncio.wait_for(
+                        asyncio.shield(pending),
+                        timeout=self.get_config("pipeline.send_timeout_seconds", 120),
+                    )
+                except asyncio.TimeoutError:
+                    # 仍在排队的作业撤回后计为超时；已交给发送接口的消息可能已经发出，等待结果后照常记录
+                    if self.dispatcher.cancel(pending):
+                        raise
+                    logger.warning(f"{tag}发送阶段超时，但消息已在发送中，等待发送结果: {chat_id}")
+                    sent = await pending
+                except asyncio.CancelledError:
+                    self.dispatcher.cancel(pending)
+                    raise
+            if not sent:
+                status = "send_failed"
+                # 保留已生成的话题，下次发送时直接复用，不再重复生成；聊天流可能已失效，下次重新解析
+                self._unsent_topics[chat_id] = topic_content
+                self.stream_cache.invalidate(chat_id)
+                logger.error(f"{tag}发送话题到群聊失败: {chat_id} - 发送未成功或队列已满")
+                return
 
             # 记录发送时间
-            self.last_topic_time[chat_id] = current_time
-            await self._record_recent_topic(chat_id, topic_content)
+            with trace_span("record"):
+                sent_time = time.time()
+                self._unsent_topics.pop(chat_id, None)
+                self.last_topic_time[chat_id] = sent_time
+                if self.store:
+                    await self.store.set_send_time(chat_id, sent_time)
+                await self._record_recent_topic(chat_id, topic_content)
+
+            status = "ok"
+            logger.info(f"{tag}话题发送成功 - {reason}: {chat_id} - {topic_content[:50]}...")
+
+        except asyncio.TimeoutError:
+            status = "timeout"
+            logger.error(f"{tag}发送话题到群聊失败: {chat_id} - {stage}阶段超时")
+        except Exception as e:
+            logger.error(f"{tag}发送话题到群聊失败: {chat_id} - {e}")
+        finally:
+            self._inflight_chats.discard(chat_id)
+            metrics.observe("send_seconds", time.perf_counter() - started, reason=reason)
+            metrics.inc("sends_total", reason=reason, status=status)
+            _CURRENT_TRACE.reset(trace_token)
+            if trace is not None:
+                await self.traces.finish(trace, status)
+
+    def _check_send_eligibility(self, chat_id: str) -> bool:
+        """资格检查（纯内存、无IO）：发送间隔未到或已有进行中的发送时直接拒绝"""
+        if chat_id in self._inflight_chats:
+            logger.debug(f"群聊 {chat_id} 已有进行中的话题发送，跳过")
+            return False
 
-            logger.info(f"话题发送成功 - {reason}: {chat_id} - {topic_content[:50]}...")
+        min_interval = self.get_config("schedule.min_interval_hours", 2) * 3600
+        last_time = self.last_topic_time.get(chat_id)
+        if last_time is not None and time.time() - last_time < min_interval:
+            logger.debug(f"群聊 {chat_id} 话题发送间隔未到，跳过")
+            return False
+        return True
+
+    async def _resolve_stream_id(self, chat_id: str) -> Optional[str]:
+        """将群聊 ID 解析为聊天流 ID，未找到时返回 None；结果（含未找到）会被缓存"""
+        hit, cached = self.stream_cache.get(chat_id)
+        if hit:
+            return cached
+
+        stream_id = str(chat_id)
+        if not get_chat_manager().get_stream(stream_id):
+            stream_obj = chat_api.get_stream_by_group_id(stream_id)
+            if not stream_obj:
+                stream_obj = chat_api.get_stream_by_user_id(stream_id)
+            stream_id = stream_obj.stream_id if stream_obj else None
+
+        self.stream_cache.put(chat_id, stream_id)
+        return stream_id
+
+    async def _acquire_topic(self, chat_id: str) -> str:
+        """获取待发送话题：优先复用上次未发出的话题，否则生成；近N小时重复时重试一次，仍重复则使用备用话题"""
+        cached = self._unsent_topics.pop(chat_id, None)
+        if cached:
+            with trace_span("acquire.reuse_unsent"):
+                duplicate = await self._is_recent_duplicate(chat_id, cached)
+            if not duplicate:
+                logger.debug(f"复用未发出的话题: {chat_id}")
+                return cached
+
+        with trace_span("acquire.generate", attempt=1):
+            topic_content = await self._generate_topic_content(chat_id)
+
+        # 近N小时去重：如重复，重试一次，否则使用备用话题
+        with trace_span("acquire.dedup_check", attempt=1):
+            duplicate = await self._is_recent_duplicate(chat_id, topic_content)
+        if duplicate:
+            logger.info(f"检测到与近时段内话题重复，进行一次重试: {chat_id}")
+            metrics.inc("dedup_hits_total", kind="recent_topic")
+            metrics.inc("topic_retries_total", reason="duplicate")
+            with trace_span("acquire.generate", attempt=2):
+                retry = await self._generate_topic_content(chat_id)
+            with trace_span("acquire.dedup_check", attempt=2):
+                duplicate = not retry or await self._is_recent_duplicate(chat_id, retry)
+            if not duplicate:
+                topic_content = retry
+            else:
+                with trace_span("acquire.fallback"):
+                    topic_content = self.topic_generator._get_fallback_topic()
+        return topic_content
+
+    def _dispatch_topic(self, stream_id: str, topic_content: str, priority: int) -> "asyncio.Future":
+        """提交到出站队列限速发送，返回发送结果的 Future；发送失败只重试发送，不重新生成
+
+        发送函数在出站队列的后台任务中执行，不在本协程的上下文内，因此显式记录排队与发送阶段。
+        """
+        trace = current_trace()
+        queued = time.perf_counter()
+        attempts = 0
+
+        async def send() -> bool:
+            nonlocal attempts, queued
+            attempts += 1
+            started = time.perf_counter()
+            if trace is not None:
+                trace.record("dispatch.queue_wait", queued, started, attempt=attempts)
+            status = "error"
+            try:
+                ok = await send_api.text_to_stream(
+                    text=topic_content,
+                    stream_id=stream_id,
+                    typing=False,
+                    storage_message=True,
+                )
+                status = "ok" if ok is not False else "failed"
+                return ok
+            finally:
+                queued = time.perf_counter()
+                if trace is not None:
+                    trace.record("dispatch.send_api", started, queued, status=status, attempt=attempts)
 
-        except Exception as e:
-            logger.error(f"发送话题到群聊失败: {chat_id} - {e}")
+        return self.dispatcher.submit(stream_id, send, priority=priority)
 
-    async def _generate_topic_content(self) -> str:
-        """生成话题内容"""
+    async def _generate_topic_content(self, chat_id: Optional[str] = None) -> str:
+        """生成话题内容；提供 chat_id 时按该群兴趣画像优先挑选资讯"""
         try:
             if not self.topic_generator:
                 return "不说话是吧"
@@ -1630,19 +5474,22 @@ class TopicFinderPlugin(BasePlugin):
             async def get_rss_items() -> List[Dict[str, Any]]:
                 if not use_rss:
                     return []
-                # 检查是否需要更新RSS
-                if await self.rss_manager.should_update():
-                    logger.info("开始更新RSS订阅源...")
-                    await self.rss_manager.update_rss_feeds()
-                # 获取缓存的RSS内容
-                cache_hours_local = self.get_config("rss.cache_hours", 6)
-                return await self.rss_manager.get_cached_items(cache_hours_local)
+                with trace_span("acquire.generate.rss"):
+                    # 检查是否需要更新RSS
+                    if await self.rss_manager.should_update():
+                        logger.info("开始更新RSS订阅源...")
+                        with trace_span("acquire.generate.rss.refresh"):
+                            await self.rss_manager.update_rss_feeds()
+                    # 获取缓存的RSS内容
+                    cache_hours_local = self.get_config("rss.cache_hours", 6)
+                    return await self.rss_manager.get_cached_items(cache_hours_local)
 
             async def get_web_items() -> List[Dict[str, Any]]:
                 if not use_web:
                     return []
                 logger.info("开始获取联网信息...")
-                return await self.web_llm_manager.get_web_info()
+                with trace_span("acquire.generate.web"):
+                    return await self.web_llm_manager.get_web_info()
 
             # 并发抓取，缩短等待时间
             tasks = []
@@ -1669,9 +5516,16 @@ class TopicFinderPlugin(BasePlugin):
                     else:
                         web_info = web_result or []
 
+            # 按群聊兴趣画像收窄候选资讯（无命中时保持随机挑选）
+            if chat_id is not None:
+                rss_items = self._select_interest_items(chat_id, "rss", rss_items)
+                web_info = self._select_interest_items(chat_id, "web", web_info)
+
             # 生成话题（依据启用的来源合并内容），注入主程序人设
-            persona = await self._get_personality()
-            topic_content = await self.topic_generator.generate_topic(rss_items, web_info, persona=persona)
+            with trace_span("acquire.generate.persona"):
+                persona = await self._get_personality()
+            with trace_span("acquire.generate.llm", rss_items=len(rss_items), web_items=len(web_info)):
+                topic_content = await self.topic_generator.generate_topic(rss_items, web_info, persona=persona)
 
             return topic_content
 
@@ -1679,62 +5533,29 @@ class TopicFinderPlugin(BasePlugin):
             logger.error(f"生成话题内容失败: {e}")
             return "不说话是吧"
 
-    async def _get_personality(self) -> str:
-        """从主程序 bot_config.toml 读取 personality 文本，失败则返回空字符串并不影响生成"""
-        try:
-            if self._persona_cache is not None:
-                return self._persona_cache
-
-            base_dir = Path(self.plugin_dir).parent if self.plugin_dir else Path.cwd()
-            bot_cfg = base_dir / "MaiBot" / "config" / "bot_config.toml"
-            if bot_cfg.exists():
-                data = None
-                if toml_lib is not None:
-                    with open(bot_cfg, 'rb') as f:
-                        data = toml_lib.load(f)
-                elif toml_pkg is not None:
-                    data = toml_pkg.load(str(bot_cfg))
-                else:
-                    return ""
-                p = data.get("personality", {}).get("personality", "")
-                reply_style = data.get("personality", {}).get("reply_style", "")
-                persona_text = p.strip()
-                if reply_style:
-                    persona_text = f"{persona_text}。说话风格：{reply_style.strip()}"
-                self._persona_cache = persona_text
-                return persona_text
-        except Exception as e:
-            logger.warning(f"读取主程序personality失败: {e}")
-        return ""
-
-    async def _load_recent_topics(self) -> Dict[str, List[Dict[str, Any]]]:
+    def _select_interest_items(self, chat_id: str, kind: str, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """根据群聊兴趣画像挑选候选资讯，无画像或无命中时原样返回"""
+        if not self.interest_profiles or not self.topic_generator or not items:
+            return items
         try:
-            path = self._recent_topics_path
-            if not path or not path.exists():
-                return {}
-            if aiofiles:
-                async with aiofiles.open(path, 'r', encoding='utf-8') as f:
-                    content = await f.read()
-            else:
-                with open(path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-            return json.loads(content or "{}")
-        except Exception:
-            return {}
+            limit = int(self.get_config("interest_profile.candidate_pool", 4))
+            weights = self.interest_profiles.weights(chat_id)
+            ranked = self.topic_generator.candidate_items(kind, items, weights, limit=limit)
+            if ranked is not items:
+                top = "、".join(term for term, _ in self.interest_profiles.top_terms(chat_id, 5))
+                logger.debug(f"群聊 {chat_id} 按兴趣画像（{top}）选出 {len(ranked)} 条候选资讯")
+                return ranked
+        except Exception as e:
+            logger.warning(f"按兴趣画像挑选资讯失败: {e}")
+        return items
 
-    async def _save_recent_topics(self, data: Dict[str, List[Dict[str, Any]]]):
+    async def _get_personality(self) -> str:
+        """获取主程序 bot_config.toml 中的 personality 文本（读取在后台完成），失败则返回空字符串并不影响生成"""
         try:
-            path = self._recent_topics_path
-            if not path:
-                return
-            if aiofiles:
-                async with aiofiles.open(path, 'w', encoding='utf-8') as f:
-                    await f.write(json.dumps(data, ensure_ascii=False))
-            else:
-                with open(path, 'w', encoding='utf-8') as f:
-                    f.write(json.dumps(data, ensure_ascii=False))
+            return await self.persona.get()
         except Exception as e:
-            logger.error(f"保存最近话题失败: {e}")
+            logger.warning(f"读取主程序personality失败: {e}")
+        return ""
 
     def _norm_text(self, s: str) -> str:
         s = (s or "").strip().lower()
@@ -1745,30 +5566,37 @@ class TopicFinderPlugin(BasePlugin):
     async def _is_recent_duplicate(self, chat_id: str, content: Optional[str]) -> bool:
         if not content:
             return False
+        if not self.store:
+            return False
         try:
-            data = await self._load_recent_topics()
-            items = data.get(str(chat_id), [])
             win_hours = int(self.get_config("advanced.recent_topics_window_hours", 48))
             cutoff = time.time() - win_hours * 3600
+            items = await self.store.load_recent_topics(chat_id, since=cutoff)
             norm_c = self._norm_text(content)
             for it in items:
-                if it.get('ts', 0) >= cutoff:
-                    if self._norm_text(it.get('content', '')) == norm_c:
-                        return True
+                if self._norm_text(it.get('content', '')) == norm_c:
+                    return True
             return False
         except Exception:
             return False
 
     async def _record_recent_topic(self, chat_id: str, content: Optional[str]):
-        if not content:
+        if not content or not self.store:
             return
         try:
-            data = await self._load_recent_topics()
-            items = data.get(str(chat_id), [])
-            items.append({"content": content, "ts": time.time()})
             max_keep = int(self.get_config("advanced.recent_topics_max_items", 50))
-            items = items[-max_keep:]
-            data[str(chat_id)] = items
-            await self._save_recent_topics(data)
+            await self.store.add_recent_topic(chat_id, content, time.time(), max_keep)
         except Exception as e:
             logger.error(f"记录最近话题失败: {e}")
+
+    async def _load_persistent_state(self):
+        """从存储恢复各群聊最后发送话题的时间"""
+        if not self.store:
+            return
+        try:
+            send_times = await self.store.load_send_times()
+            for chat_id, ts in send_times.items():
+                self.last_topic_time[chat_id] = max(ts, self.last_topic_time.get(chat_id, 0))
+            logger.debug(f"已恢复 {len(send_times)} 个群聊的话题发送时间")
+        except Exception as e:
+            logger.error(f"恢复话题发送时间失败: {e}")
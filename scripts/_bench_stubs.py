@@ -0,0 +1,201 @@
+"""
+基准测试与负载模拟共用的本地替身
+
+- StubEndpoints：本地 aiohttp 服务，提供合成 RSS 源（可配置条目数、单条大小、延迟与错误率，
+  每次请求会“发布”若干新条目）以及 OpenAI 兼容的 /v1/chat/completions（返回联网信息格式的文本）。
+- StubHostAPIs：替换插件使用的 llm_api / send_api / chat_api / message_api / get_chat_manager，
+  可配置延迟与失败率，记录调用次数与发送结果；内置按群的消息时间线供静默检测查询。
+
+全部在本机回环地址上运行，不访问外部网络。
+"""
+
+import asyncio
+import bisect
+import random
+import sys
+import time
+import types
+from typing import Any, Callable, Dict, List, Optional
+
+from aiohttp import web
+
+_WORDS = ["人工智能", "芯片", "新能源", "开源", "手机", "发布会", "游戏", "模型", "卫星", "电池",
+          "Apple", "Linux", "GPU", "Rust", "Python", "startup", "release", "security", "cloud", "AI"]
+
+
+class StubEndpoints:
+    """合成 RSS 源与假的 OpenAI 兼容接口"""
+
+    def __init__(self, feeds: int = 20, items_per_feed: int = 50, item_bytes: int = 400,
+                 new_items_per_request: int = 2, latency_ms: float = 20.0, error_rate: float = 0.0,
+                 llm_latency_ms: float = 200.0, llm_items: int = 5, seed: int = 42):
+        self.feeds = feeds
+        self.items_per_feed = items_per_feed
+        self.item_bytes = item_bytes
+        self.new_items_per_request = new_items_per_request
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.llm_latency_ms = llm_latency_ms
+        self.llm_items = llm_items
+        self.rng = random.Random(seed)
+        self.requests: Dict[str, int] = {"feed": 0, "feed_errors": 0, "chat": 0}
+        self._feed_heads: Dict[int, int] = {}
+        self._runner: Optional[web.AppRunner] = None
+        self.base_url = ""
+
+    def _text(self, min_words: int, max_words: int) -> str:
+        return "".join(self.rng.choice(_WORDS) for _ in range(self.rng.randint(min_words, max_words)))
+
+    def _item_xml(self, feed: int, n: int) -> str:
+        description = self._text(8, 16)
+        while len(description.encode("utf-8")) < self.item_bytes:
+            description += self._text(8, 16)
+        return (f"<item><title>{self._text(3, 6)} #{feed}-{n}</title>"
+                f"<link>https://feeds.example.com/{feed}/item/{n}</link>"
+                f"<description><![CDATA[<p>{description}</p>]]></description>"
+                f"<pubDate>Mon, 19 Oct 2026 09:00:00 +0800</pubDate>"
+                f"<category>{self.rng.choice(_WORDS)}</category></item>")
+
+    async def _delay(self, latency_ms: float):
+        if latency_ms > 0:
+            await asyncio.sleep(latency_ms / 1000 * self.rng.uniform(0.5, 1.5))
+
+    async def _handle_feed(self, request: web.Request) -> web.StreamResponse:
+        feed = int(request.match_info["feed"])
+        self.requests["feed"] += 1
+        await self._delay(self.latency_ms)
+        if self.rng.random() < self.error_rate:
+            self.requests["feed_errors"] += 1
+            return web.Response(status=503, text="unavailable")
+        head = self._feed_heads.get(feed, self.items_per_feed) + self.new_items_per_request
+        self._feed_heads[feed] = head
+        # 分块写出，便于插件的流式解析在读够条目后提前停止
+        response = web.StreamResponse(headers={"Content-Type": "application/rss+xml; charset=utf-8"})
+        await response.prepare(request)
+        await response.write(f'<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel>'
+                             f'<title>feed {feed}</title>'.encode("utf-8"))
+        try:
+            for n in range(head, head - self.items_per_feed, -1):
+                await response.write(self._item_xml(feed, n).encode("utf-8"))
+            await response.write(b"</channel></rss>")
+        except (ConnectionResetError, RuntimeError):
+            # 客户端读够条目后断开
+            pass
+        return response
+
+    async def _handle_chat(self, request: web.Request) -> web.Response:
+        self.requests["chat"] += 1
+        await request.json()
+        await self._delay(self.llm_latency_ms)
+        blocks = [f"标题：{self._text(3, 6)}\n描述：{self._text(10, 20)}" for _ in range(self.llm_items)]
+        return web.json_response({"choices": [{"message": {"content": "\n---\n".join(blocks)}}]})
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        app = web.Application()
+        app.router.add_get("/feed/{feed}", self._handle_feed)
+        app.router.add_post("/v1/chat/completions", self._handle_chat)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound = self._runner.addresses[0]
+        self.base_url = f"http://{bound[0]}:{bound[1]}"
+        return self.base_url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def feed_urls(self, count: Optional[int] = None) -> List[str]:
+        return [f"{self.base_url}/feed/{i}" for i in range(self.feeds if count is None else count)]
+
+    def provider_config(self, name: str = "stub") -> Dict[str, Any]:
+        return {"name": name, "base_url": f"{self.base_url}/v1", "api_key": "stub-key", "model_name": "stub"}
+
+
+class StubHostAPIs:
+    """宿主接口替身：话题生成、发送与聊天流解析均在本地完成，可配置延迟与失败率"""
+
+    def __init__(self, llm_latency_ms: float = 50.0, send_latency_ms: float = 5.0,
+                 llm_error_rate: float = 0.0, send_error_rate: float = 0.0, seed: int = 7,
+                 clock: Callable[[], float] = time.time):
+        self.llm_latency_ms = llm_latency_ms
+        self.send_latency_ms = send_latency_ms
+        self.llm_error_rate = llm_error_rate
+        self.send_error_rate = send_error_rate
+        self.rng = random.Random(seed)
+        self.llm_calls = 0
+        self.sent: List[Dict[str, Any]] = []
+        self.send_failures = 0
+        self.clock = clock
+        # 消息时间线：chat_id -> 按时间递增的时间戳，以及对应是否为机器人自己发送
+        self._message_times: Dict[str, List[float]] = {}
+        self._message_is_bot: Dict[str, List[bool]] = {}
+        self.group_ids: List[str] = []
+
+    async def generate_with_model(self, prompt: str, model_config: Any = None, **kwargs):
+        self.llm_calls += 1
+        if self.llm_latency_ms > 0:
+            await asyncio.sleep(self.llm_latency_ms / 1000)
+        if self.rng.random() < self.llm_error_rate:
+            return False, "", None, "stub"
+        return True, f"聊聊这个话题吧 #{self.llm_calls}", None, "stub"
+
+    def get_available_models(self) -> Dict[str, Any]:
+        return {"replyer": object()}
+
+    async def text_to_stream(self, text: str, stream_id: str, typing: bool = False,
+                             storage_message: bool = True) -> bool:
+        if self.send_latency_ms > 0:
+            await asyncio.sleep(self.send_latency_ms / 1000)
+        if self.rng.random() < self.send_error_rate:
+            self.send_failures += 1
+            return False
+        now = self.clock()
+        self.sent.append({"stream_id": stream_id, "text": text, "ts": now})
+        if storage_message:
+            self.record_message(stream_id, now, is_bot=True)
+        return True
+
+    def record_message(self, chat_id: str, ts: float, is_bot: bool = False):
+        times = self._message_times.setdefault(chat_id, [])
+        flags = self._message_is_bot.setdefault(chat_id, [])
+        index = bisect.bisect_right(times, ts)
+        times.insert(index, ts)
+        flags.insert(index, is_bot)
+
+    def get_messages_by_time_in_chat(self, chat_id: str, start_time: float, end_time: float, limit: int = 0,
+                                     filter_mai: bool = False, filter_command: bool = False, **kwargs) -> List[Dict[str, Any]]:
+        """按时间范围查询消息（从新到旧取 limit 条），filter_mai 时排除机器人自己的消息"""
+        times = self._message_times.get(chat_id, [])
+        flags = self._message_is_bot.get(chat_id, [])
+        result = []
+        for index in range(bisect.bisect_right(times, end_time) - 1, bisect.bisect_left(times, start_time) - 1, -1):
+            if filter_mai and flags[index]:
+                continue
+            result.append({"chat_id": chat_id, "time": times[index]})
+            if limit and len(result) >= limit:
+                break
+        return result
+
+    def group_streams(self) -> List[Any]:
+        return [types.SimpleNamespace(stream_id=g, group_info=types.SimpleNamespace(group_id=g)) for g in self.group_ids]
+
+    def install(self, plugin_module):
+        """替换插件模块引用的宿主接口；任何 ID 都解析为同名聊天流，群列表为 group_ids"""
+        plugin_module.llm_api.generate_with_model = self.generate_with_model
+        plugin_module.llm_api.get_available_models = self.get_available_models
+        plugin_module.send_api.text_to_stream = self.text_to_stream
+        plugin_module.chat_api.get_stream_by_group_id = lambda group_id: types.SimpleNamespace(stream_id=str(group_id))
+        plugin_module.chat_api.get_stream_by_user_id = lambda user_id: None
+        plugin_module.chat_api.get_group_streams = self.group_streams
+        plugin_module.chat_api.get_all_streams = self.group_streams
+        plugin_module.message_api.get_messages_by_time_in_chat = self.get_messages_by_time_in_chat
+        plugin_module.get_chat_manager = lambda: types.SimpleNamespace(get_stream=lambda stream_id: True)
+
+    @staticmethod
+    def register_plugin(instance: Any):
+        """让事件处理器通过 plugin_manager 取得该插件实例"""
+        manager = sys.modules["src.plugin_system.core.plugin_manager"].plugin_manager
+        manager.get_plugin_instance = lambda name: instance
@@ -0,0 +1,127 @@
+"""
+脱离 MaiBot 宿主运行插件代码时使用的最小桩模块
+
+供 tests/ 下的单元测试与 scripts/ 下的基准脚本使用：当 `src.plugin_system` 不可导入时，
+注册一组只满足 plugin.py 导入与基本调用的替身模块。
+"""
+
+import logging
+import sys
+import types
+from pathlib import Path
+
+PLUGIN_ROOT = Path(__file__).resolve().parent.parent
+
+
+class _StubComponent:
+    """BasePlugin / BaseAction / BaseCommand / BaseEventHandler 的共同替身"""
+
+    plugin_dir = None
+
+    def __init__(self, *args, **kwargs):
+        self.config = kwargs.pop("config", None) or {}
+        self.plugin_dir = kwargs.pop("plugin_dir", None) or self.plugin_dir
+
+    def get_config(self, key, default=None):
+        current = self.config
+        for part in key.split("."):
+            if isinstance(current, dict) and part in current:
+                current = current[part]
+            else:
+                return default
+        return current
+
+    @classmethod
+    def get_handler_info(cls):
+        return cls.__name__
+
+    get_action_info = get_handler_info
+    get_command_info = get_handler_info
+
+
+class _ConfigField:
+    def __init__(self, type, default=None, description="", **kwargs):
+        self.type = type
+        self.default = default
+        self.description = description
+
+
+class _AsyncTask:
+    def __init__(self, task_name="", wait_before_start=0, run_interval=0):
+        self.task_name = task_name
+        self.wait_before_start = wait_before_start
+        self.run_interval = run_interval
+
+
+class _AsyncTaskManager:
+    def __init__(self):
+        self.tasks = []
+
+    async def add_task(self, task):
+        self.tasks.append(task)
+
+
+def _enum(name, **members):
+    return type(name, (), members)
+
+
+def install_host_stubs():
+    """在 sys.modules 中注册宿主模块替身（宿主可导入时不做任何事），返回 apis 模块便于替换接口"""
+    try:
+        import src.plugin_system  # noqa: F401
+        from src.plugin_system import apis
+        return apis
+    except ImportError:
+        pass
+
+    def module(name, **attrs):
+        mod = types.ModuleType(name)
+        mod.__dict__.update(attrs)
+        sys.modules[name] = mod
+        return mod
+
+    module("src", __path__=[])
+    module(
+        "src.plugin_system",
+        __path__=[],
+        BasePlugin=_StubComponent,
+        BaseAction=_StubComponent,
+        BaseCommand=_StubComponent,
+        BaseEventHandler=_StubComponent,
+        ActionInfo=object,
+        CommandInfo=object,
+        EventHandlerInfo=object,
+        ActionActivationType=_enum("ActionActivationType", KEYWORD="keyword", ALWAYS="always"),
+        EventType=_enum("EventType", ON_START="on_start", ON_STOP="on_stop", ON_MESSAGE="on_message"),
+        ComponentType=_enum("ComponentType"),
+        ConfigField=_ConfigField,
+        register_plugin=lambda cls: cls,
+        get_logger=logging.getLogger,
+        MaiMessages=object,
+        CustomEventHandlerResult=object,
+    )
+    ns = types.SimpleNamespace
+    apis = module(
+        "src.plugin_system.apis",
+        send_api=ns(),
+        message_api=ns(),
+        chat_api=ns(),
+        llm_api=ns(),
+    )
+    module("src.plugin_system.core", __path__=[])
+    module("src.plugin_system.core.plugin_manager", plugin_manager=ns(get_plugin_instance=lambda name: None))
+    module("src.manager", __path__=[])
+    module("src.manager.async_task_manager", AsyncTask=_AsyncTask, async_task_manager=_AsyncTaskManager())
+    module("src.chat", __path__=[])
+    module("src.chat.message_receive", __path__=[])
+    module("src.chat.message_receive.chat_stream", get_chat_manager=lambda: ns(get_stream=lambda stream_id: None))
+    return apis
+
+
+def import_plugin():
+    """安装替身后导入 plugin.py"""
+    install_host_stubs()
+    if str(PLUGIN_ROOT) not in sys.path:
+        sys.path.insert(0, str(PLUGIN_ROOT))
+    import plugin
+    return plugin
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+资讯缓存序列化格式基准：对比 json 与 binary 两种格式的保存/加载耗时与文件大小
+
+用法：python scripts/bench_cache_format.py [--sources 40] [--items 20] [--rounds 20]
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from _host_stubs import import_plugin
+
+plugin = import_plugin()
+
+_WORDS = ["人工智能", "芯片", "新能源", "开源", "手机", "发布会", "游戏", "模型", "卫星", "电池",
+          "Apple", "Linux", "GPU", "Rust", "Python", "startup", "release", "security", "cloud", "AI"]
+
+
+def make_feed_set(sources: int, items_per_source: int) -> list:
+    """构造接近真实 RSS 抓取结果的条目：中英混排标题、带 HTML 的较长描述"""
+    rng = random.Random(42)
+    now = time.time()
+    items = []
+    for s in range(sources):
+        source = f"https://feeds.example.com/{s}/rss"
+        for i in range(items_per_source):
+            title = "".join(rng.choice(_WORDS) for _ in range(rng.randint(3, 7)))
+            paragraphs = "".join(f"<p>{''.join(rng.choice(_WORDS) for _ in range(rng.randint(10, 30)))}</p>"
+                                 for _ in range(rng.randint(1, 4)))
+            items.append({
+                "title": title,
+                "description": paragraphs,
+                "link": f"{source}/item/{i}",
+                "published": "Mon, 19 Oct 2026 09:00:00 +0800",
+                "tags": rng.sample(_WORDS, 2),
+                "source": source,
+                "timestamp": now - rng.random() * 3600,
+            })
+    return items
+
+
+async def bench(fmt: str, items: list, rounds: int, data_dir: Path) -> dict:
+    store = plugin.JsonTopicStore(data_dir / fmt, write_debounce_seconds=0, cache_format=fmt)
+    save_times, load_times = [], []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        await store.save_items("rss", items)
+        save_times.append(time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        loaded = await store.load_items("rss")
+        load_times.append(time.perf_counter() - t0)
+    assert len(loaded) == len(items)
+    size = store._item_path("rss").stat().st_size
+    return {
+        "format": fmt,
+        "save_ms": sorted(save_times)[len(save_times) // 2] * 1000,
+        "load_ms": sorted(load_times)[len(load_times) // 2] * 1000,
+        "size_kb": size / 1024,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sources", type=int, default=40)
+    parser.add_argument("--items", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    items = make_feed_set(args.sources, args.items)
+    codec = "msgpack" if plugin._optional_import("msgpack") is not None else "紧凑 JSON（标准库）"
+    print(f"条目数: {len(items)}，binary 编码: {codec}，每项取 {args.rounds} 轮中位数")
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [await bench(fmt, items, args.rounds, Path(tmp)) for fmt in plugin.CACHE_SERIALIZERS]
+
+    baseline = results[0]
+    print(f"{'格式':<8}{'保存(ms)':>10}{'加载(ms)':>10}{'大小(KB)':>10}{'相对大小':>10}")
+    for r in results:
+        print(f"{r['format']:<8}{r['save_ms']:>10.2f}{r['load_ms']:>10.2f}{r['size_kb']:>10.1f}"
+              f"{r['size_kb'] / baseline['size_kb']:>10.0%}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+离线端到端基准：在本机替身服务上测量 RSS 刷新、话题生成吞吐、去重开销与多群发送扇出
+
+RSS 源与联网大模型接口由本地 aiohttp 替身提供（可配置源数量、条目大小、延迟与错误率），
+主程序的 llm_api / send_api / chat_api 由可计时的替身代替，全程不访问外部网络。
+
+每次运行的结果追加到历史文件（默认 data/bench_history.jsonl），并与参数相同的最近若干次运行的中位数对比，
+变差超过阈值的指标标记为回退；加 --fail-on-regression 时有回退则以非零状态退出，便于接入 CI。
+
+用法：python scripts/bench_pipeline.py [--rounds 3] [--groups 1,100,1000] [--feeds 20] [--feed-latency-ms 20]
+      [--error-rate 0] [--llm-latency-ms 50] [--threshold 0.2] [--fail-on-regression]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+PLUGIN_ROOT = SCRIPTS_DIR.parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from _bench_stubs import StubEndpoints, StubHostAPIs  # noqa: E402
+from _host_stubs import import_plugin  # noqa: E402
+
+# 参与回退判断时数值越大越好的指标（其余均为越小越好）
+HIGHER_IS_BETTER_SUFFIX = "_per_s"
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))]
+
+
+def bench_config(args, server: StubEndpoints, groups: int = 1, web: bool = False) -> Dict[str, Any]:
+    """基准用插件配置：发送限速放开，只测插件自身的流水线开销"""
+    return {
+        "plugin": {"enabled": True},
+        "rss": {
+            "enable_rss": True,
+            "sources": server.feed_urls(),
+            "max_items_per_source": args.items_per_source,
+            "request_timeout_seconds": 10,
+        },
+        "web_llm": {
+            "enable_web_llm": web,
+            "providers": [server.provider_config()],
+            "parallel_providers": 1,
+        },
+        "topic_generation": {"models": ["replyer"], "enable_hedging": False},
+        "dispatch": {
+            "global_rate_per_second": 1_000_000.0,
+            "global_burst": groups,
+            "per_chat_rate_per_minute": 60_000,
+            "per_chat_burst": 10,
+            "max_queue_size": groups * 2 + 10,
+            "queue_warn_size": groups * 2 + 10,
+        },
+        "storage": {"backend": args.storage},
+        "silence_detection": {"enable_silence_detection": False},
+        "metrics": {"enable_metrics": True},
+        "tracing": {"enable_tracing": True},
+    }
+
+
+class Bench:
+    def __init__(self, args, plugin, server: StubEndpoints, apis: StubHostAPIs):
+        self.args = args
+        self.plugin = plugin
+        self.server = server
+        self.apis = apis
+
+    async def _instance(self, tmp: Path, **kwargs):
+        plugin_dir = Path(tempfile.mkdtemp(dir=tmp))
+        return self.plugin.TopicFinderPlugin(plugin_dir=str(plugin_dir), config=bench_config(self.args, self.server, **kwargs))
+
+    @staticmethod
+    async def _close(instance):
+        if instance.store:
+            await instance.store.close()
+
+    async def refresh(self, tmp: Path) -> Dict[str, float]:
+        """RSS 全量刷新（冷：空缓存；热：已有缓存与轮询状态）与联网信息刷新的墙钟时间"""
+        cold, warm, web = [], [], []
+        for _ in range(self.args.rounds):
+            instance = await self._instance(tmp, web=True)
+            rss = instance.rss_manager
+            started = time.perf_counter()
+            await rss.update_rss_feeds(force=True)
+            cold.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            await rss.update_rss_feeds(force=True)
+            warm.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            await instance.web_llm_manager.get_web_info(force_refresh=True)
+            web.append(time.perf_counter() - started)
+            await self._close(instance)
+        return {
+            "refresh_cold_ms": statistics.median(cold) * 1000,
+            "refresh_warm_ms": statistics.median(warm) * 1000,
+            "web_refresh_ms": statistics.median(web) * 1000,
+        }
+
+    async def generation(self, tmp: Path) -> Dict[str, float]:
+        """话题生成吞吐（替身模型有固定延迟，按并发度限流）与 prompt 组装的 CPU 开销"""
+        instance = await self._instance(tmp)
+        await instance.rss_manager.update_rss_feeds(force=True)
+        items = await instance.rss_manager.get_cached_items(6)
+        generator = instance.topic_generator
+        semaphore = asyncio.Semaphore(self.args.concurrency)
+
+        async def one():
+            async with semaphore:
+                return await generator.generate_topic(items, [], persona="一个爱聊科技新闻的群友")
+
+        throughput, prompt_us = [], []
+        for _ in range(self.args.rounds):
+            started = time.perf_counter()
+            await asyncio.gather(*(one() for _ in range(self.args.topics)))
+            throughput.append(self.args.topics / (time.perf_counter() - started))
+            started = time.perf_counter()
+            for _ in range(1000):
+                generator.build_prompt(items, [], persona="一个爱聊科技新闻的群友")
+            prompt_us.append((time.perf_counter() - started) * 1000)
+        await self._close(instance)
+        return {
+            "generation_topics_per_s": statistics.median(throughput),
+            "prompt_build_us": statistics.median(prompt_us),
+        }
+
+    async def dedup(self, tmp: Path) -> Dict[str, float]:
+        """近期话题去重检查的单次耗时（已存满 recent_topics_max_items 条、未命中，即最坏情况）"""
+        instance = await self._instance(tmp)
+        keep = int(instance.get_config("advanced.recent_topics_max_items", 50))
+        now = time.time()
+        for i in range(keep):
+            await instance.store.add_recent_topic("bench", f"历史话题 {i}：今天聊聊第 {i} 条新闻吧", now - i, keep)
+        costs = []
+        for _ in range(self.args.rounds):
+            started = time.perf_counter()
+            for i in range(self.args.dedup_checks):
+                await instance._is_recent_duplicate("bench", f"全新话题 {i}")
+            costs.append((time.perf_counter() - started) / self.args.dedup_checks * 1e6)
+        await self._close(instance)
+        return {"dedup_check_us": statistics.median(costs)}
+
+    async def fanout(self, tmp: Path, groups: int) -> Dict[str, float]:
+        """同时向 groups 个群发送话题：总墙钟时间与单群发送耗时分位数（RSS 已预热，不含抓取）"""
+        walls, p50s, p95s, failed = [], [], [], 0
+        for _ in range(self.args.rounds):
+            instance = await self._instance(tmp, groups=groups)
+            await instance.rss_manager.update_rss_feeds(force=True)
+            sent_before = len(self.apis.sent)
+            latencies: List[float] = []
+
+            async def one(chat_id: str):
+                started = time.perf_counter()
+                await instance._send_topic_to_chat(chat_id, reason="基准测试")
+                latencies.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(one(f"bench_group_{i}") for i in range(groups)))
+            walls.append(time.perf_counter() - started)
+            p50s.append(percentile(latencies, 0.5))
+            p95s.append(percentile(latencies, 0.95))
+            failed += groups - (len(self.apis.sent) - sent_before)
+            await self._close(instance)
+        return {
+            f"fanout_{groups}_wall_ms": statistics.median(walls) * 1000,
+            f"fanout_{groups}_p50_ms": statistics.median(p50s) * 1000,
+            f"fanout_{groups}_p95_ms": statistics.median(p95s) * 1000,
+            f"fanout_{groups}_failed": failed / self.args.rounds,
+        }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "-C", str(PLUGIN_ROOT), "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def load_history(path: Path) -> List[Dict[str, Any]]:
+    if not path.exists():
+        return []
+    entries = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            entries.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return entries
+
+
+def compare(results: Dict[str, float], history: List[Dict[str, Any]], params: Dict[str, Any],
+            window: int, threshold: float) -> List[str]:
+    """打印本次结果与基线（参数相同的最近 window 次运行的中位数），返回回退的指标名"""
+    previous = [h["results"] for h in history if h.get("params") == params][-window:]
+    regressions = []
+    print(f"\n{'指标':<26}{'本次':>12}{'基线':>12}{'变化':>9}")
+    for name, value in results.items():
+        samples = [p[name] for p in previous if name in p]
+        if not samples:
+            print(f"{name:<26}{value:>12.2f}{'-':>12}{'-':>9}")
+            continue
+        baseline = statistics.median(samples)
+        change = (value - baseline) / baseline if baseline else 0.0
+        worse = -change if name.endswith(HIGHER_IS_BETTER_SUFFIX) else change
+        flag = ""
+        # 失败数等以 0 为常态的指标按绝对值判断
+        if (baseline and worse > threshold) or (not baseline and value > 0):
+            regressions.append(name)
+            flag = "  ← 回退"
+        print(f"{name:<26}{value:>12.2f}{baseline:>12.2f}{change:>+9.1%}{flag}")
+    if not previous:
+        print("（没有参数相同的历史记录，本次作为基线）")
+    return regressions
+
+
+async def run(args) -> Dict[str, float]:
+    plugin = import_plugin()
+    apis = StubHostAPIs(llm_latency_ms=args.llm_latency_ms, send_latency_ms=args.send_latency_ms)
+    apis.install(plugin)
+    server = StubEndpoints(feeds=args.feeds, items_per_feed=args.items_per_feed, item_bytes=args.item_bytes,
+                           latency_ms=args.feed_latency_ms, error_rate=args.error_rate,
+                           llm_latency_ms=args.web_latency_ms)
+    await server.start()
+    bench = Bench(args, plugin, server, apis)
+    results: Dict[str, float] = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            print(f"替身服务 {server.base_url}：{args.feeds} 个源 × {args.items_per_feed} 条，"
+                  f"延迟 {args.feed_latency_ms} ms，错误率 {args.error_rate:.0%}")
+            results.update(await bench.refresh(tmp_path))
+            results.update(await bench.generation(tmp_path))
+            results.update(await bench.dedup(tmp_path))
+            for groups in args.groups:
+                results.update(await bench.fanout(tmp_path, groups))
+    finally:
+        await server.stop()
+    print(f"替身请求数：RSS {server.requests['feed']}（失败 {server.requests['feed_errors']}），"
+          f"联网 {server.requests['chat']}，话题生成 {apis.llm_calls}，发送 {len(apis.sent)}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=3, help="每项测量的轮数，取中位数")
+    parser.add_argument("--groups", default="1,100,1000", help="扇出测试的群数量，逗号分隔")
+    parser.add_argument("--feeds", type=int, default=20, help="替身 RSS 源数量")
+    parser.add_argument("--items-per-feed", type=int, default=50, help="每个替身源输出的条目数")
+    parser.add_argument("--item-bytes", type=int, default=400, help="每条描述的大致字节数")
+    parser.add_argument("--items-per-source", type=int, default=10, help="插件每个源读取的条目数（rss.max_items_per_source）")
+    parser.add_argument("--feed-latency-ms", type=float, default=20.0, help="替身 RSS 源的平均响应延迟")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="替身 RSS 源返回 503 的概率")
+    parser.add_argument("--web-latency-ms", type=float, default=200.0, help="替身联网大模型接口的平均延迟")
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0, help="替身话题生成模型的延迟")
+    parser.add_argument("--send-latency-ms", type=float, default=5.0, help="替身 send_api 的延迟")
+    parser.add_argument("--topics", type=int, default=200, help="吞吐测试中生成的话题数")
+    parser.add_argument("--concurrency", type=int, default=20, help="吞吐测试的并发生成数")
+    parser.add_argument("--dedup-checks", type=int, default=500, help="去重测试每轮的检查次数")
+    parser.add_argument("--storage", choices=["sqlite", "json"], default="sqlite", help="存储后端")
+    parser.add_argument("--history", default=str(PLUGIN_ROOT / "data" / "bench_history.jsonl"), help="历史结果文件")
+    parser.add_argument("--window", type=int, default=5, help="基线取最近多少次同参数运行的中位数")
+    parser.add_argument("--threshold", type=float, default=0.2, help="变差超过该比例视为回退")
+    parser.add_argument("--no-record", action="store_true", help="不把本次结果写入历史文件")
+    parser.add_argument("--fail-on-regression", action="store_true", help="有回退时以状态码 1 退出")
+    parser.add_argument("--verbose", action="store_true", help="输出插件日志")
+    args = parser.parse_args()
+    args.groups = [int(g) for g in args.groups.split(",") if g.strip()]
+    if not args.verbose:
+        logging.disable(logging.CRITICAL)
+
+    results = asyncio.run(run(args))
+    params = {k: v for k, v in vars(args).items()
+              if k not in ("history", "window", "threshold", "no_record", "fail_on_regression", "verbose")}
+    history_path = Path(args.history)
+    regressions = compare(results, load_history(history_path), params, args.window, args.threshold)
+    if not args.no_record:
+        history_path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {"ts": time.strftime("%Y-%m-%dT%H:%M:%S"), "rev": git_revision(), "params": params, "results": results}
+        with history_path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    if regressions:
+        print(f"\n{len(regressions)} 项指标回退超过 {args.threshold:.0%}: {', '.join(regressions)}")
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
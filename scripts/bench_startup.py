@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+插件启动开销测量：在全新的子进程中分别测量导入 plugin.py 与构造插件实例的耗时
+
+每轮启动一个新解释器，避免模块缓存影响结果；同时记录导入阶段加载了哪些较重的可选依赖、
+构造阶段是否创建了数据目录。可通过 --baseline 指定一个 git 版本，对比改动前后的启动开销。
+
+用法：python scripts/bench_startup.py [--rounds 15] [--features none|all] [--baseline HEAD~1]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+PLUGIN_ROOT = SCRIPTS_DIR.parent
+
+HEAVY_MODULES = ["aiohttp", "aiofiles", "feedparser", "msgpack", "toml", "tomllib", "sqlite3", "zoneinfo"]
+
+# 子进程中执行：安装宿主替身，计时导入与实例化
+_CHILD = r"""
+import json, sys, time, tempfile
+from pathlib import Path
+sys.path.insert(0, {scripts_dir!r})
+from _host_stubs import install_host_stubs
+install_host_stubs()
+# 宿主进程中这些模块早已加载，不计入插件的导入开销
+import asyncio, concurrent.futures, json, logging, re, random, datetime
+before = set(sys.modules)
+sys.path.insert(0, {plugin_root!r})
+t0 = time.perf_counter()
+import plugin
+t1 = time.perf_counter()
+plugin_dir = Path(tempfile.mkdtemp())
+instance = plugin.TopicFinderPlugin(plugin_dir=str(plugin_dir), config={config!r})
+t2 = time.perf_counter()
+loaded = sorted(set(sys.modules) - before)
+print(json.dumps({{
+    "import_ms": (t1 - t0) * 1000,
+    "init_ms": (t2 - t1) * 1000,
+    "heavy": [m for m in {heavy!r} if m in loaded],
+    "modules": len(loaded),
+    "data_dir_created": (plugin_dir / "data").exists(),
+}}))
+"""
+
+
+def feature_config(features: str) -> dict:
+    enabled = features == "all"
+    return {
+        "plugin": {"enabled": True},
+        "rss": {"enable_rss": enabled, "sources": ["https://example.com/rss"]},
+        "web_llm": {"enable_web_llm": enabled},
+        "silence_detection": {"enable_silence_detection": enabled},
+    }
+
+
+def measure(plugin_root: Path, config: dict, rounds: int) -> dict:
+    code = _CHILD.format(scripts_dir=str(SCRIPTS_DIR), plugin_root=str(plugin_root),
+                         config=config, heavy=HEAVY_MODULES)
+    runs = []
+    for _ in range(rounds):
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {
+        "import_ms": statistics.median(r["import_ms"] for r in runs),
+        "init_ms": statistics.median(r["init_ms"] for r in runs),
+        "heavy": runs[-1]["heavy"],
+        "modules": runs[-1]["modules"],
+        "data_dir_created": runs[-1]["data_dir_created"],
+    }
+
+
+def checkout_plugin(rev: str, target: Path) -> Path:
+    """把指定 git 版本的 plugin.py 取出到临时目录"""
+    source = subprocess.run(["git", "-C", str(PLUGIN_ROOT), "show", f"{rev}:plugin.py"],
+                            capture_output=True, text=True, check=True).stdout
+    (target / "plugin.py").write_text(source, encoding="utf-8")
+    return target
+
+
+def report(label: str, result: dict):
+    print(f"{label:<12} 导入 {result['import_ms']:7.1f} ms   实例化 {result['init_ms']:6.1f} ms   "
+          f"新增模块 {result['modules']:4d}   数据目录 {'已创建' if result['data_dir_created'] else '未创建'}")
+    print(f"{'':<12} 已加载可选依赖: {', '.join(result['heavy']) or '无'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=15, help="每个版本启动的子进程数，取中位数")
+    parser.add_argument("--features", choices=["none", "all"], default="none",
+                        help="none: RSS/联网/静默检测均关闭；all: 全部开启")
+    parser.add_argument("--baseline", default=None, help="对比的 git 版本（如 HEAD~1），不指定则只测当前工作区")
+    args = parser.parse_args()
+
+    config = feature_config(args.features)
+    print(f"功能开关: {args.features}，每项 {args.rounds} 轮（中位数）")
+    if args.baseline:
+        with tempfile.TemporaryDirectory() as tmp:
+            report(args.baseline, measure(checkout_plugin(args.baseline, Path(tmp)), config, args.rounds))
+    report("当前工作区", measure(PLUGIN_ROOT, config, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+群聊规模负载模拟：为数千个群合成（或回放）消息流，驱动静默检测与兴趣画像事件处理器以及定时发送
+
+插件内的 time.time() / datetime.now() 换成虚拟时钟，按消息时间戳推进，可以在几十秒内模拟数小时的流量；
+耗时仍用真实时钟测量。宿主接口（消息查询、聊天流、话题生成、发送）和 RSS 源都由本机替身提供。
+
+报告四部分：
+- 每条消息的处理器开销：分位数。触发静默话题的消息单独统计，因为它们会同步等待整个发送流程。
+- 按群状态的内存增长：tracemalloc 只统计 plugin.py 分配的内存，按已出现的群数折算每群字节数，
+  并列出各类按群状态的条目数。
+- 静默触发准确率：消息到达时，若距该群上一条人类消息的间隔超过阈值且处于活跃时段，则应当触发。
+  统计命中 / 误触发 / 漏触发，以及模拟结束时仍处于静默、因没有新消息而从未被检测到的群。
+- 发送扇出：静默触发发送与一次全量定时发送的耗时分位数和结果，以及按生产配置计算的错峰发送跨度。
+
+用法：python scripts/loadtest_groups.py [--chats 2000] [--hours 6] [--min-gap 60] [--max-gap 14400]
+      [--silence-minutes 60] [--visibility after|before] [--replay messages.jsonl] [--no-memory]
+"""
+
+import argparse
+import ast
+import asyncio
+import json
+import logging
+import math
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from _bench_stubs import StubEndpoints, StubHostAPIs  # noqa: E402
+from _host_stubs import import_plugin  # noqa: E402
+
+SILENCE_REASON = "群聊静默检测"
+SCHEDULE_REASON = "定时发送"
+
+SAMPLE_TEXTS = [
+    "今天的新手机发布会有人看了吗", "这个开源模型跑起来效果不错", "周末一起打游戏吗", "新能源车降价了",
+    "显卡又涨价了，GPU 太难买", "Rust 写起来真舒服", "卫星发射直播开始了", "电池续航是硬伤",
+    "哈哈哈", "确实", "有人在吗", "/help", "晚上吃什么", "Python 3.13 出了", "AI 画图越来越离谱了",
+]
+
+
+class VirtualClock:
+    """虚拟时钟：替换插件模块中的 time.time 与 datetime.now，其余计时函数保持真实"""
+
+    def __init__(self, start: float):
+        self.now = start
+
+    def time(self) -> float:
+        return self.now
+
+    def install(self, plugin_module):
+        clock = self
+        shim = types.ModuleType("time")
+        shim.__dict__.update(plugin_module.time.__dict__)
+        shim.time = self.time
+        plugin_module.time = shim
+
+        class VirtualDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return datetime.fromtimestamp(clock.now, tz)
+
+        plugin_module.datetime = VirtualDatetime
+
+
+def percentiles(values: List[float]) -> str:
+    if not values:
+        return "无样本"
+    ordered = sorted(values)
+
+    def q(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))] * 1000
+
+    return f"n={len(ordered)}  p50 {q(0.5):.3f} ms  p95 {q(0.95):.3f} ms  p99 {q(0.99):.3f} ms  max {ordered[-1] * 1000:.1f} ms"
+
+
+def synthesize(args, start: float, rng: random.Random) -> Tuple[List[Tuple[float, str, str]], Dict[str, float]]:
+    """每个群的平均消息间隔在 [min_gap, max_gap] 内按对数均匀分布抽取，消息到达为泊松过程
+
+    返回按时间排序的 (时间戳, 群, 文本) 以及每个群在模拟开始前的最后一条消息时间。
+    """
+    end = start + args.hours * 3600
+    log_min, log_max = math.log(args.min_gap), math.log(args.max_gap)
+    events, prior = [], {}
+    for i in range(args.chats):
+        chat_id = f"group_{i}"
+        mean_gap = math.exp(rng.uniform(log_min, log_max))
+        ts = start - rng.uniform(0, mean_gap)
+        prior[chat_id] = ts
+        while True:
+            ts += rng.expovariate(1 / mean_gap)
+            if ts >= end:
+                break
+            if ts < start:
+                prior[chat_id] = ts
+                continue
+            events.append((ts, chat_id, rng.choice(SAMPLE_TEXTS)))
+    events.sort()
+    return events, prior
+
+
+def load_replay(path: Path) -> Tuple[List[Tuple[float, str, str]], Dict[str, float]]:
+    """读取 JSONL 消息记录：每行包含 chat_id、ts（Unix 秒）与可选的 text"""
+    events = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        events.append((float(record["ts"]), str(record["chat_id"]), record.get("text") or ""))
+    events.sort()
+    return events, {}
+
+
+def make_message(chat_id: str, text: str) -> Any:
+    ns = types.SimpleNamespace
+    return ns(
+        plain_text=text,
+        message_recv=ns(chat_id=chat_id, is_group=True, processed_plain_text=text,
+                        message_info=ns(group_info=ns(group_id=chat_id))),
+    )
+
+
+def loadtest_config(args, server: StubEndpoints, stagger_window: float = 0, max_sends_per_second: float = 0) -> Dict[str, Any]:
+    dispatch_rate = args.dispatch_rate if args.dispatch_rate > 0 else 1_000_000.0
+    return {
+        "plugin": {"enabled": True},
+        "rss": {"enable_rss": True, "sources": server.feed_urls()},
+        "web_llm": {"enable_web_llm": False},
+        "topic_generation": {"models": ["replyer"], "enable_hedging": False},
+        "silence_detection": {
+            "enable_silence_detection": True,
+            "silence_threshold_minutes": args.silence_minutes,
+            "check_interval_minutes": args.check_interval_minutes,
+            "active_hours_start": args.active_start,
+            "active_hours_end": args.active_end,
+        },
+        "schedule": {
+            "min_interval_hours": args.min_interval_hours,
+            "stagger_window_seconds": stagger_window,
+            "max_sends_per_second": max_sends_per_second,
+        },
+        "dispatch": {
+            "global_rate_per_second": dispatch_rate,
+            "global_burst": max(3, int(min(dispatch_rate, args.chats))),
+            "max_queue_size": args.chats * 2 + 10,
+            "queue_warn_size": args.chats * 2 + 10,
+        },
+        "metrics": {"enable_metrics": True},
+    }
+
+
+def state_sizes(instance, silence_handler) -> Dict[str, int]:
+    """各类按群保存的状态条目数"""
+    profiles = getattr(instance.interest_profiles, "_profiles", {}) if instance.interest_profiles else {}
+    return {
+        "静默检测 last_check_time": len(silence_handler.last_check_time),
+        "最后发送时间 last_topic_time": len(instance.last_topic_time),
+        "聊天流缓存": len(getattr(instance.stream_cache, "_entries", {})),
+        "兴趣画像": len(profiles),
+        "出站按群令牌桶": len(getattr(instance.dispatcher, "_chat_buckets", {})),
+        "未发出的话题": len(instance._unsent_topics),
+    }
+
+
+def function_ranges(source_file: str) -> List[Tuple[int, int, str]]:
+    """源文件中各函数的 (起始行, 结束行, 限定名)，用于把分配位置标注为所属函数"""
+    ranges = []
+
+    def visit(node, prefix: str):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+                name = f"{prefix}{child.name}"
+                if not isinstance(child, ast.ClassDef):
+                    ranges.append((child.lineno, child.end_lineno, name))
+                visit(child, name + ".")
+
+    visit(ast.parse(Path(source_file).read_text(encoding="utf-8")), "")
+    return ranges
+
+
+def owner_of(ranges: List[Tuple[int, int, str]], lineno: int) -> str:
+    # 取包含该行的最内层函数
+    owners = [r for r in ranges if r[0] <= lineno <= r[1]]
+    return min(owners, key=lambda r: r[1] - r[0])[2] if owners else "<module>"
+
+
+def plugin_snapshot(plugin_file: str) -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(True, plugin_file)])
+
+
+def plugin_memory(plugin_file: str) -> int:
+    return sum(stat.size for stat in plugin_snapshot(plugin_file).statistics("filename"))
+
+
+async def run(args):
+    plugin = import_plugin()
+    start = datetime.now().replace(hour=args.start_hour, minute=0, second=0, microsecond=0).timestamp()
+    clock = VirtualClock(start)
+    clock.install(plugin)
+    apis = StubHostAPIs(llm_latency_ms=args.llm_latency_ms, send_latency_ms=args.send_latency_ms, clock=clock.time)
+    apis.install(plugin)
+    server = StubEndpoints(feeds=5, items_per_feed=30, latency_ms=5, llm_latency_ms=0)
+    await server.start()
+
+    rng = random.Random(args.seed)
+    if args.replay:
+        events, prior = load_replay(Path(args.replay))
+        if events:
+            clock.now = events[0][0]
+    else:
+        events, prior = synthesize(args, start, rng)
+    chats = sorted({chat_id for _, chat_id, _ in events} | set(prior))
+    for chat_id, ts in prior.items():
+        apis.record_message(chat_id, ts)
+    print(f"消息 {len(events)} 条，群 {len(chats)} 个，虚拟时长 "
+          f"{(events[-1][0] - events[0][0]) / 3600 if events else 0:.1f} 小时，消息可见性: {args.visibility}")
+
+    tmp = tempfile.TemporaryDirectory()
+    config = loadtest_config(args, server)
+    instance = plugin.TopicFinderPlugin(plugin_dir=tmp.name, config=config)
+    apis.register_plugin(instance)
+    silence_handler = plugin.ChatSilenceDetectorEventHandler()
+    profile_handler = plugin.ChatInterestProfileEventHandler()
+    silence_handler.config = profile_handler.config = config
+
+    # 记录每次发送调用（含发送前资格检查的结果与真实耗时）
+    calls: List[Dict[str, Any]] = []
+    original_send = instance._send_topic_to_chat
+
+    async def recorded_send(chat_id, reason="话题发送", priority=plugin.OutboundDispatcher.PRIORITY_SCHEDULED):
+        record = {"chat_id": chat_id, "reason": reason, "eligible": instance._check_send_eligibility(chat_id)}
+        started = time.perf_counter()
+        await original_send(chat_id, reason=reason, priority=priority)
+        record["seconds"] = time.perf_counter() - started
+        calls.append(record)
+
+    instance._send_topic_to_chat = recorded_send
+
+    threshold = args.silence_minutes * 60
+
+    def in_window(hour: int, start: int, end: int) -> bool:
+        return bool(plugin.GroupEligibilityIndex.hour_mask(start, end) >> hour & 1)
+
+    last_human: Dict[str, float] = dict(prior)
+    quiet_times, trigger_times, profile_times = [], [], []
+    outcome = {"命中": 0, "误触发": 0, "漏触发": 0, "正确未触发": 0}
+    seen: set = set()
+    memory_points: List[Tuple[int, int, int]] = []
+    checkpoint = max(1, len(events) // 10)
+
+    if not args.no_memory:
+        tracemalloc.start()
+        baseline_snapshot = plugin_snapshot(plugin.__file__)
+        baseline = sum(stat.size for stat in baseline_snapshot.statistics("filename"))
+
+    for index, (ts, chat_id, text) in enumerate(events, 1):
+        clock.now = ts
+        if args.visibility == "before":
+            apis.record_message(chat_id, ts)
+        message = make_message(chat_id, text)
+        calls_before = len(calls)
+        started = time.perf_counter()
+        await silence_handler.execute(message)
+        middle = time.perf_counter()
+        await profile_handler.execute(message)
+        profile_times.append(time.perf_counter() - middle)
+        triggered = any(c["reason"] == SILENCE_REASON for c in calls[calls_before:])
+        (trigger_times if triggered else quiet_times).append(middle - started)
+        if args.visibility == "after":
+            apis.record_message(chat_id, ts)
+
+        previous = last_human.get(chat_id)
+        expected = (previous is None or ts - previous >= threshold) and \
+            in_window(datetime.fromtimestamp(ts).hour, args.active_start, args.active_end)
+        outcome[("命中" if expected else "误触发") if triggered else ("漏触发" if expected else "正确未触发")] += 1
+        last_human[chat_id] = ts
+        seen.add(chat_id)
+
+        if not args.no_memory and (index % checkpoint == 0 or index == len(events)):
+            memory_points.append((index, len(seen), plugin_memory(plugin.__file__) - baseline))
+
+    end_time = clock.now
+    unobserved = sum(1 for ts in last_human.values() if end_time - ts >= threshold)
+
+    print("\n== 每条消息的处理器开销 ==")
+    print(f"静默检测（未触发）   {percentiles(quiet_times)}")
+    print(f"静默检测（触发发送） {percentiles(trigger_times)}")
+    print(f"兴趣画像             {percentiles(profile_times)}")
+
+    print("\n== 按群状态 ==")
+    if memory_points:
+        for done, chat_count, size in memory_points:
+            print(f"  已处理 {done:>8} 条  群 {chat_count:>6}  plugin.py 分配 {size / 1024:>9.1f} KB"
+                  f"  ≈ {size / max(chat_count, 1):>7.0f} B/群")
+        print("  增长最多的分配位置（含全局共享的缓存，如资讯索引）：")
+        ranges = function_ranges(plugin.__file__)
+        for stat in plugin_snapshot(plugin.__file__).compare_to(baseline_snapshot, "lineno")[:6]:
+            lineno = stat.traceback[0].lineno
+            print(f"    {stat.size_diff / 1024:>+9.1f} KB  {stat.count_diff:>+7} 个对象  "
+                  f"plugin.py:{lineno} {owner_of(ranges, lineno)}")
+    for name, count in state_sizes(instance, silence_handler).items():
+        print(f"  {name:<28}{count:>8}")
+
+    print("\n== 静默触发准确率 ==")
+    hits, misses, false_alarms = outcome["命中"], outcome["漏触发"], outcome["误触发"]
+    recall = hits / (hits + misses) if hits + misses else 1.0
+    precision = hits / (hits + false_alarms) if hits + false_alarms else 1.0
+    print("  " + "  ".join(f"{k} {v}" for k, v in outcome.items()))
+    print(f"  召回率 {recall:.1%}  精确率 {precision:.1%}（阈值 {args.silence_minutes} 分钟，"
+          f"检查间隔 {args.check_interval_minutes} 分钟）")
+    print(f"  模拟结束时已静默超过阈值但没有新消息、因而未被检测的群: {unobserved}")
+
+    silence_calls = [c for c in calls if c["reason"] == SILENCE_REASON]
+    print("\n== 发送扇出 ==")
+    print(f"静默触发发送 {len(silence_calls)} 次（通过发送间隔检查 {sum(c['eligible'] for c in silence_calls)} 次）"
+          f"  {percentiles([c['seconds'] for c in silence_calls if c['eligible']])}")
+
+    # 全量定时发送：放开错峰与限速，测量插件自身的扇出开销
+    apis.group_ids = chats
+    sent_before, calls_before = len(apis.sent), len(calls)
+    clock.now = end_time + 60
+    started = time.perf_counter()
+    await instance._send_scheduled_topics()
+    wall = time.perf_counter() - started
+    scheduled = [c for c in calls[calls_before:] if c["reason"] == SCHEDULE_REASON]
+    print(f"定时发送 {len(chats)} 个群：调用 {len(scheduled)}，通过发送间隔检查 {sum(c['eligible'] for c in scheduled)}，"
+          f"成功 {len(apis.sent) - sent_before}，墙钟 {wall * 1000:.0f} ms")
+    print(f"  单群 {percentiles([c['seconds'] for c in scheduled if c['eligible']])}")
+    sends = plugin.metrics.summary("sends_total")["counters"].get("sends_total", {}).get("labels", {})
+    for labels, value in sorted(sends.items()):
+        print(f"  sends_total{labels} = {value:g}")
+
+    # 生产配置下的错峰计划（只计算，不等待）
+    planner = plugin.TopicFinderPlugin(config=loadtest_config(args, server, args.stagger_window, args.max_sends_per_second))
+    delays = planner._stagger_delays(len(chats))
+    if delays:
+        print(f"  按 stagger_window_seconds={args.stagger_window:g}、max_sends_per_second={args.max_sends_per_second:g}，"
+              f"{len(chats)} 个群的定时发送将分散在 {timedelta(seconds=int(delays[-1]))} 内完成")
+
+    if instance.store:
+        await instance.store.close()
+    await server.stop()
+    tmp.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chats", type=int, default=2000, help="合成流量的群数量")
+    parser.add_argument("--hours", type=float, default=6, help="合成流量的虚拟时长（小时）")
+    parser.add_argument("--start-hour", type=int, default=8, help="虚拟时钟从当天几点开始")
+    parser.add_argument("--min-gap", type=float, default=60, help="最活跃的群的平均消息间隔（秒）")
+    parser.add_argument("--max-gap", type=float, default=14400, help="最冷清的群的平均消息间隔（秒）")
+    parser.add_argument("--replay", default=None, help="回放 JSONL 消息记录（chat_id/ts/text），替代合成流量")
+    parser.add_argument("--visibility", choices=["after", "before"], default="after",
+                        help="当前消息在处理器执行前（before）还是执行后（after）才能被消息查询看到")
+    parser.add_argument("--silence-minutes", type=int, default=60, help="silence_detection.silence_threshold_minutes")
+    parser.add_argument("--check-interval-minutes", type=int, default=10, help="silence_detection.check_interval_minutes")
+    parser.add_argument("--active-start", type=int, default=8, help="silence_detection.active_hours_start")
+    parser.add_argument("--active-end", type=int, default=23, help="silence_detection.active_hours_end")
+    parser.add_argument("--min-interval-hours", type=float, default=2, help="schedule.min_interval_hours")
+    parser.add_argument("--stagger-window", type=float, default=300, help="计算错峰计划用的 schedule.stagger_window_seconds")
+    parser.add_argument("--max-sends-per-second", type=float, default=0.5, help="计算错峰计划用的 schedule.max_sends_per_second")
+    parser.add_argument("--dispatch-rate", type=float, default=0, help="dispatch.global_rate_per_second，0 表示不限速")
+    parser.add_argument("--llm-latency-ms", type=float, default=20.0, help="替身话题生成模型的延迟")
+    parser.add_argument("--send-latency-ms", type=float, default=2.0, help="替身 send_api 的延迟")
+    parser.add_argument("--seed", type=int, default=1, help="合成流量的随机种子")
+    parser.add_argument("--no-memory", action="store_true", help="不启用 tracemalloc（处理器耗时更准确）")
+    parser.add_argument("--verbose", action="store_true", help="输出插件日志")
+    args = parser.parse_args()
+    if not args.verbose:
+        logging.disable(logging.CRITICAL)
+    if not args.no_memory:
+        print("已启用 tracemalloc，处理器耗时会偏高；加 --no-memory 获得更准确的耗时")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
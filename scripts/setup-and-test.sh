@@ -35,10 +35,16 @@ bash scripts/link_plugin.sh
 
 # -------- 4) 运行测试（示例用 pytest；也可替换为你的测试命令）--------
 if command -v pytest >/dev/null 2>&1; then
-  pytest -q
+  # 只收集插件自身的 tests/，不进入克隆下来的宿主目录
+  pytest -q tests
 elif [ -f Makefile ]; then
   make test
 else
-  echo "No tests configured. Please add pytest or a Makefile target."
-  exit 1
+  # 没有测试时运行离线基准（本机替身服务，不访问外网）；默认不写入 data/ 历史、不因耗时波动失败，
+  # 设置 BENCH_GATE=1 时才与历史中位数比较并在指标回退时失败
+  BENCH_FLAGS="--no-record"
+  if [ "${BENCH_GATE:-0}" = "1" ]; then
+    BENCH_FLAGS="--fail-on-regression"
+  fi
+  $PY scripts/bench_pipeline.py --rounds 3 --groups 1,100 ${BENCH_ARGS:-} $BENCH_FLAGS
 fi
\ No newline at end of file
@@ -0,0 +1,15 @@
+"""测试公共设置：宿主 MaiBot 不可导入时先注册替身模块（见 scripts/_host_stubs.py），再导入 plugin.py"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from _host_stubs import import_plugin  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def plugin():
+    return import_plugin()
@@ -0,0 +1,56 @@
+"""data/ 文件原子写入：并发读-改-写不丢更新，防抖写入可读到自身，写入失败不破坏原文件"""
+
+import asyncio
+import json
+import os
+
+import pytest
+
+
+def test_concurrent_updates_are_serialized(plugin, tmp_path):
+    path = tmp_path / "data" / "counter.json"
+
+    async def run():
+        writer = plugin.AtomicFileWriter()
+
+        def increment(text):
+            data = json.loads(text) if text else {"n": 0}
+            data["n"] += 1
+            return json.dumps(data)
+
+        await asyncio.gather(*(writer.update_text(path, increment) for _ in range(50)))
+
+    asyncio.run(run())
+    assert json.loads(path.read_text()) == {"n": 50}
+
+
+def test_debounced_write_is_readable_before_flush(plugin, tmp_path):
+    path = tmp_path / "state.json"
+
+    async def run():
+        writer = plugin.AtomicFileWriter(debounce_seconds=60)
+        await writer.write_text(path, "first", debounce=True)
+        await writer.write_text(path, "second", debounce=True)
+        pending = await writer.read_text(path)
+        on_disk = path.exists()
+        await writer.flush()
+        return pending, on_disk
+
+    pending, on_disk = asyncio.run(run())
+    assert pending == "second" and not on_disk
+    assert path.read_text() == "second"
+
+
+def test_failed_replace_keeps_previous_file(plugin, tmp_path, monkeypatch):
+    path = tmp_path / "cache.json"
+    path.write_text("old")
+
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", fail)
+    with pytest.raises(OSError):
+        asyncio.run(plugin.AtomicFileWriter().write_text(path, "new"))
+
+    assert path.read_text() == "old"
+    assert [p.name for p in tmp_path.iterdir()] == ["cache.json"]
@@ -0,0 +1,27 @@
+"""负载模拟用的宿主替身：消息时间线查询（从新到旧、排除机器人消息、limit）与发送记录"""
+
+import asyncio
+
+from _bench_stubs import StubHostAPIs
+
+
+def test_message_timeline_queries():
+    host = StubHostAPIs(send_latency_ms=0)
+    for ts in (30.0, 10.0, 20.0):
+        host.record_message("g1", ts)
+    host.record_message("g1", 25.0, is_bot=True)
+
+    times = [m["time"] for m in host.get_messages_by_time_in_chat("g1", 0, 100)]
+    assert times == [30.0, 25.0, 20.0, 10.0]
+    assert [m["time"] for m in host.get_messages_by_time_in_chat("g1", 15, 30, filter_mai=True)] == [30.0, 20.0]
+    assert [m["time"] for m in host.get_messages_by_time_in_chat("g1", 0, 100, limit=1)] == [30.0]
+    assert host.get_messages_by_time_in_chat("other", 0, 100) == []
+
+
+def test_sends_are_recorded_as_bot_messages():
+    clock = iter([50.0]).__next__
+    host = StubHostAPIs(send_latency_ms=0, clock=clock)
+
+    assert asyncio.run(host.text_to_stream("话题", "g1"))
+    assert host.sent == [{"stream_id": "g1", "text": "话题", "ts": 50.0}]
+    assert host.get_messages_by_time_in_chat("g1", 0, 100, filter_mai=True) == []
@@ -0,0 +1,65 @@
+"""资讯缓存序列化：json / binary 往返、旧版压缩编码兼容、文件头校验与 sqlite 后端的格式告警"""
+
+import json
+import zlib
+
+import pytest
+
+ITEMS = [{"title": "芯片新闻", "description": "<p>国产芯片</p>", "timestamp": 1.5, "tags": ["科技"]},
+         {"title": "Rust 发布", "link": "https://example.com/rust"}]
+
+
+@pytest.mark.parametrize("name", ["json", "binary"])
+def test_round_trip(plugin, name):
+    serializer = plugin.CACHE_SERIALIZERS[name]()
+
+    assert serializer.loads(serializer.dumps(ITEMS)) == ITEMS
+    assert serializer.loads(b"") == []
+
+
+def test_binary_reads_legacy_record_codec(plugin):
+    serializer = plugin.BinaryCacheSerializer()
+    records = b"".join(
+        serializer._LENGTH.pack(len(r)) + r
+        for r in (json.dumps(item, ensure_ascii=False).encode("utf-8") for item in ITEMS)
+    )
+    data = serializer._HEADER.pack(serializer.MAGIC, 1, serializer.CODEC_RECORDS) + zlib.compress(records)
+
+    assert serializer.loads(data) == ITEMS
+
+
+def test_binary_reads_legacy_zlib_codec(plugin):
+    serializer = plugin.BinaryCacheSerializer()
+    payload = zlib.compress(json.dumps(ITEMS, ensure_ascii=False).encode("utf-8"))
+    data = serializer._HEADER.pack(serializer.MAGIC, 1, serializer.CODEC_ZLIB_JSON) + payload
+
+    assert serializer.loads(data) == ITEMS
+
+
+def test_binary_payload_is_uncompressed_compact_json(plugin):
+    serializer = plugin.BinaryCacheSerializer()
+    if plugin._optional_import("msgpack") is not None:
+        pytest.skip("msgpack 已安装时使用 msgpack 编码")
+    data = serializer.dumps(ITEMS)
+
+    assert data[serializer._HEADER.size:] == json.dumps(ITEMS, ensure_ascii=False, separators=(",", ":")).encode()
+    assert len(data) < len(plugin.JsonCacheSerializer().dumps(ITEMS))
+
+
+def test_cache_format_with_sqlite_backend_warns(plugin, tmp_path, monkeypatch):
+    warnings = []
+    monkeypatch.setattr(plugin.logger, "warning", lambda msg, *a, **k: warnings.append(msg))
+
+    plugin.create_topic_store(tmp_path, "sqlite", cache_format="json")
+    assert warnings == []
+    store = plugin.create_topic_store(tmp_path, "sqlite", cache_format="binary")
+    assert isinstance(store, plugin.SQLiteTopicStore)
+    assert len(warnings) == 1 and "cache_format" in warnings[0]
+
+
+def test_binary_rejects_foreign_or_newer_files(plugin):
+    serializer = plugin.BinaryCacheSerializer()
+    with pytest.raises(ValueError):
+        serializer.loads(b"NOTMINE" + b"\x01\x03payload")
+    with pytest.raises(ValueError):
+        serializer.loads(serializer._HEADER.pack(serializer.MAGIC, serializer.VERSION + 1, 3) + b"x")
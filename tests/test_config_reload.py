@@ -0,0 +1,92 @@
+"""配置快照与热重载：快照只读，校验失败保留旧快照，重载后组件与群聊资格索引切换到新配置"""
+
+import asyncio
+import os
+from types import MappingProxyType
+
+import pytest
+
+INITIAL = """
+[filtering]
+target_groups = ["111"]
+
+[group_overrides]
+"111" = { timezone = "Asia/Tokyo" }
+"""
+
+UPDATED = """
+[filtering]
+target_groups = ["111", "222"]
+
+[group_overrides]
+"222" = { timezone = "Europe/London" }
+"""
+
+
+def test_snapshot_is_frozen(plugin):
+    raw = {"filtering": {"target_groups": ["1"]}, "group_overrides": {"1": {"timezone": "UTC"}}}
+    snapshot = plugin.ConfigSnapshot(raw)
+    raw["filtering"]["target_groups"].append("2")
+
+    assert snapshot.get("filtering.target_groups") == ("1",)
+    assert isinstance(snapshot.get("group_overrides"), MappingProxyType)
+    assert snapshot.get("group_overrides.1.timezone") == "UTC"
+    assert snapshot.get("missing.key", 5) == 5
+    assert snapshot.to_dict()["filtering"] == {"target_groups": ["1"]}
+    with pytest.raises(AttributeError):
+        snapshot.version = 2
+    with pytest.raises(TypeError):
+        snapshot.get("filtering")["target_groups"] = ()
+
+
+def test_validate_config_reports_type_errors(plugin):
+    schema = plugin.TopicFinderPlugin.config_schema
+    merged, errors = plugin.validate_config({"schedule": {"max_sends_per_second": 2}}, schema)
+
+    assert not errors
+    assert merged["schedule"]["max_sends_per_second"] == 2
+    assert merged["schedule"]["stagger_window_seconds"] == 300
+
+    _, errors = plugin.validate_config({"schedule": {"stagger_window_seconds": "soon"}}, schema)
+    assert errors and "stagger_window_seconds" in errors[0]
+
+
+def _write(path, text, mtime):
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+
+
+def test_reload_swaps_snapshot_and_rebuilds_index(plugin, tmp_path):
+    config_path = tmp_path / "config.toml"
+    _write(config_path, INITIAL, 1_000_000)
+    instance = plugin.TopicFinderPlugin(config=plugin._load_toml_file(config_path), plugin_dir=str(tmp_path))
+    assert instance._eligibility_index().timezone("111") == "Asia/Tokyo"
+
+    _write(config_path, UPDATED, 1_000_100)
+    assert asyncio.run(instance.reload_config_if_changed())
+
+    assert instance.config_snapshot.version == 2
+    assert instance.topic_generator.config is instance.config_snapshot
+    assert instance.config["filtering"]["target_groups"] == ["111", "222"]
+    index = instance._eligibility_index()
+    assert index.targets == ["111", "222"]
+    assert index.timezone("222") == "Europe/London"
+    assert index.timezone("111") == ""
+    # 文件未变化时不重载
+    assert not asyncio.run(instance.reload_config_if_changed())
+
+
+def test_invalid_reload_keeps_previous_snapshot(plugin, tmp_path):
+    config_path = tmp_path / "config.toml"
+    _write(config_path, INITIAL, 1_000_000)
+    instance = plugin.TopicFinderPlugin(config=plugin._load_toml_file(config_path), plugin_dir=str(tmp_path))
+    previous = instance.config_snapshot
+
+    _write(config_path, '[schedule]\nstagger_window_seconds = "soon"\n', 1_000_100)
+    assert not asyncio.run(instance.reload_config_if_changed())
+    assert instance.config_snapshot is previous
+    assert "stagger_window_seconds" in instance._config_reloader.last_error
+
+    _write(config_path, "[filtering\n", 1_000_200)
+    assert not asyncio.run(instance.reload_config_if_changed())
+    assert instance.config_snapshot is previous
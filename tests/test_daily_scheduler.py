@@ -0,0 +1,61 @@
+"""每日定时点：按时区计算触发时刻，按补发策略处理错过的时间点"""
+
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+TZ = "Asia/Shanghai"
+SLOTS = [("", TZ, "09:00"), ("", TZ, "09:10"), ("123", TZ, "12:00")]
+
+
+def _ts(hour, minute, second=0, day=19):
+    return datetime(2026, 10, day, hour, minute, second, tzinfo=ZoneInfo(TZ)).timestamp()
+
+
+def test_next_and_prev_fire_respect_timezone(plugin):
+    scheduler = plugin.DailySlotScheduler()
+    tz = scheduler.get_timezone(TZ)
+
+    assert scheduler.next_fire(_ts(8, 0), tz, 9, 0) == _ts(9, 0)
+    # 正好在触发时刻时，下一次为次日，最近一次为当前
+    assert scheduler.next_fire(_ts(9, 0), tz, 9, 0) == _ts(9, 0, day=20)
+    assert scheduler.prev_fire(_ts(9, 0), tz, 9, 0) == _ts(9, 0)
+    assert scheduler.prev_fire(_ts(8, 0), tz, 9, 0) == _ts(9, 0, day=18)
+    assert scheduler.next_deadline(SLOTS, _ts(9, 5)) == _ts(9, 10)
+
+
+def test_invalid_inputs_are_ignored(plugin):
+    scheduler = plugin.DailySlotScheduler(catch_up_policy="bogus")
+
+    assert scheduler.catch_up_policy == "latest"
+    assert scheduler.parse_time("24:00") is None and scheduler.parse_time("abc") is None
+    assert scheduler.next_deadline([("", TZ, "bad")], _ts(9, 0)) is None
+
+
+def test_on_time_slot_fires_once(plugin):
+    scheduler = plugin.DailySlotScheduler()
+
+    fired = scheduler.due(SLOTS, last_run_ts=_ts(8, 59), now_ts=_ts(9, 0, 30))
+    assert fired == [("", TZ, "09:00", _ts(9, 0))]
+    assert scheduler.due(SLOTS, last_run_ts=_ts(9, 0, 30), now_ts=_ts(9, 1)) == []
+
+
+@pytest.mark.parametrize("policy, expected", [
+    ("latest", ["09:10"]),
+    ("all", ["09:00", "09:10"]),
+    ("skip", []),
+])
+def test_catch_up_policies(plugin, policy, expected):
+    scheduler = plugin.DailySlotScheduler(catch_up_policy=policy, catch_up_grace_seconds=1800)
+
+    # 08:50 之后停机，09:20 恢复：09:00 与 09:10 均已错过但仍在补发宽限内
+    fired = scheduler.due(SLOTS, last_run_ts=_ts(8, 50), now_ts=_ts(9, 20))
+    assert [slot for _, _, slot, _ in fired] == expected
+
+
+def test_missed_beyond_grace_is_skipped(plugin):
+    scheduler = plugin.DailySlotScheduler(catch_up_policy="all", catch_up_grace_seconds=600)
+
+    fired = scheduler.due(SLOTS, last_run_ts=_ts(8, 50), now_ts=_ts(9, 15))
+    assert [slot for _, _, slot, _ in fired] == ["09:10"]
@@ -0,0 +1,122 @@
+"""出站发送队列：优先级、按群限速不阻塞其他群、重试与容量"""
+
+import asyncio
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def unlimited(plugin, **kwargs):
+    settings = {"global_rate": 0, "per_chat_rate": 0, "retry_backoff_seconds": 0.01}
+    settings.update(kwargs)
+    return plugin.OutboundDispatcher(**settings)
+
+
+def test_priority_order(plugin):
+    async def scenario():
+        dispatcher = unlimited(plugin)
+        order = []
+
+        def job(name):
+            async def send():
+                order.append(name)
+                return True
+            return send
+
+        futures = [
+            dispatcher.submit("a", job("scheduled"), dispatcher.PRIORITY_SCHEDULED),
+            dispatcher.submit("b", job("silence"), dispatcher.PRIORITY_SILENCE),
+            dispatcher.submit("c", job("manual"), dispatcher.PRIORITY_MANUAL),
+        ]
+        assert await asyncio.gather(*futures) == [True, True, True]
+        return order
+
+    assert run(scenario()) == ["manual", "silence", "scheduled"]
+
+
+def test_rate_limited_chat_does_not_block_others(plugin):
+    async def scenario():
+        # 每个群 1 个令牌、每分钟 1 个：群 a 的第二条必须等待，群 b 不受影响
+        dispatcher = unlimited(plugin, per_chat_rate=1 / 60, per_chat_burst=1)
+        sent = []
+
+        def job(name):
+            async def send():
+                sent.append(name)
+                return True
+            return send
+
+        first = dispatcher.submit("a", job("a1"))
+        second = dispatcher.submit("a", job("a2"))
+        other = dispatcher.submit("b", job("b1"))
+        await asyncio.wait_for(asyncio.gather(first, other), timeout=1)
+        assert not second.done()
+        assert dispatcher.size() == 1
+        second.cancel()
+        return sent
+
+    assert run(scenario()) == ["a1", "b1"]
+
+
+def test_failed_send_is_retried_then_given_up(plugin):
+    async def scenario():
+        dispatcher = unlimited(plugin, max_retries=2)
+        attempts = []
+
+        async def flaky():
+            attempts.append(1)
+            return len(attempts) >= 2
+
+        async def broken():
+            raise RuntimeError("boom")
+
+        ok = await dispatcher.send("a", flaky)
+        failed = await dispatcher.send("b", broken)
+        return ok, failed, len(attempts), dispatcher.counters
+
+    ok, failed, attempts, counters = run(scenario())
+    assert ok is True and failed is False
+    assert attempts == 2
+    assert counters["sent"] == 1 and counters["failed"] == 1 and counters["retried"] == 3
+
+
+def test_full_queue_rejects_and_scan_creates_no_buckets(plugin):
+    async def scenario():
+        dispatcher = unlimited(plugin, max_queue_size=2)
+
+        async def send():
+            return True
+
+        futures = [dispatcher.submit(str(i), send) for i in range(3)]
+        results = await asyncio.gather(*futures)
+        return results, dispatcher
+
+    results, dispatcher = run(scenario())
+    assert results == [True, True, False]
+    assert dispatcher.counters["rejected"] == 1
+    # 只有真正发送过的群聊才有令牌桶
+    assert set(dispatcher._chat_buckets) == {"0", "1"}
+
+
+def test_cancel_only_withdraws_jobs_that_have_not_started(plugin):
+    async def scenario():
+        dispatcher = unlimited(plugin, per_chat_rate=1 / 60, per_chat_burst=1)
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return True
+
+        started = dispatcher.submit("a", slow)
+        queued = dispatcher.submit("a", slow)
+        await asyncio.sleep(0.01)
+        # 第一条已交给发送函数，不能撤回；第二条还在等群聊令牌，可以撤回
+        assert dispatcher.cancel(started) is False
+        assert dispatcher.cancel(queued) is True
+        release.set()
+        return await started, queued.cancelled(), dispatcher
+
+    result, cancelled, dispatcher = run(scenario())
+    assert result is True and cancelled
+    assert dispatcher.counters["sent"] == 1 and not dispatcher._started
@@ -0,0 +1,49 @@
+"""群聊资格索引：群号规范化、活跃时段掩码与 group_overrides（含来自配置快照的只读映射）"""
+
+OVERRIDES = {
+    "123": {"daily_times": ["09:00"], "timezone": "Asia/Tokyo", "active_hours_start": 9, "active_hours_end": 10},
+}
+
+
+def test_overrides_survive_config_snapshot(plugin):
+    snapshot = plugin.ConfigSnapshot({"group_overrides": OVERRIDES})
+    index = plugin.GroupEligibilityIndex(overrides=snapshot.get("group_overrides"))
+
+    assert index.override(123)["timezone"] == "Asia/Tokyo"
+    assert index.timezone("123") == "Asia/Tokyo"
+    # 有独立 daily_times 的群只由自己的时间点选中，全局时间点不选它
+    assert index.select([("123", 123)], "", "", 12) == []
+    assert index.select([("123", 123)], "Asia/Tokyo", "123", 9) == ["123"]
+
+
+def test_plugin_index_uses_group_overrides(plugin):
+    instance = plugin.TopicFinderPlugin(config={"group_overrides": OVERRIDES})
+    index = instance._eligibility_index()
+
+    assert index.override("123").get("daily_times") == ("09:00",)
+    assert ("123", "Asia/Tokyo", "09:00") in instance._schedule_slots()
+
+
+def test_normalized_ids_and_cross_midnight_mask(plugin):
+    index = plugin.GroupEligibilityIndex(target_groups=[123, "123", 456.0], exclude_groups=[" 789 "],
+                                         active_start=22, active_end=6)
+
+    assert index.targets == ["123", "456"]
+    assert index.excluded == {"789"}
+    assert index.is_active(23, "1") and index.is_active(3, "1")
+    assert not index.is_active(12, "1")
+
+
+def test_select_filters_exclusions_timezones_and_hours(plugin):
+    overrides = {"200": {"timezone": "Asia/Tokyo"}, "300": {"active_hours_start": 20, "active_hours_end": 23}}
+    index = plugin.GroupEligibilityIndex(exclude_groups=["400"], active_start=8, active_end=23,
+                                         overrides=overrides, default_tz="Asia/Shanghai")
+    candidates = [("stream-1", "100"), ("stream-2", 200), ("stream-3", "300"), ("stream-4", "400")]
+
+    assert index.select(candidates, "Asia/Shanghai", "", 12) == ["stream-1"]
+    assert index.select(candidates, "Asia/Shanghai", "", 21) == ["stream-1", "stream-3"]
+    assert index.select(candidates, "Asia/Tokyo", "", 12) == ["stream-2"]
+    assert index.select(candidates, "Asia/Shanghai", "", 3) == []
+    # 指定作用范围时只选该群（按群号或聊天流 ID 匹配）
+    assert index.select(candidates, "Asia/Shanghai", "300", 21) == ["stream-3"]
+    assert index.select(candidates, "Asia/Shanghai", "stream-1", 12) == ["stream-1"]
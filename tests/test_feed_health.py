@@ -0,0 +1,59 @@
+"""RSS 源健康记录：指数退避、隔离与探测、恢复后清零，以及序列化往返"""
+
+import pytest
+
+BACKOFF = dict(backoff_base=60, backoff_max=300, quarantine_after=4, probe_interval=3600)
+
+
+def test_backoff_doubles_up_to_cap(plugin):
+    health = plugin.FeedHealth("https://feed.example/rss")
+
+    retry_after = []
+    for _ in range(3):
+        health.record_failure(1000.0, "HTTP 503", **BACKOFF)
+        retry_after.append(health.retry_at - 1000.0)
+    assert retry_after == [60, 120, 240]
+    assert not health.available(1100.0) and health.available(1240.0)
+    assert not health.quarantined
+
+    health.record_failure(1000.0, "HTTP 503", **dict(BACKOFF, quarantine_after=0))
+    assert health.retry_at - 1000.0 == 300
+
+
+def test_quarantine_probes_and_recovers(plugin):
+    health = plugin.FeedHealth("https://feed.example/rss")
+    for n in range(4):
+        health.record_failure(1000.0 + n, "timeout", **BACKOFF)
+
+    assert health.quarantined and health.quarantined_since == 1003.0
+    assert health.retry_at == 1003.0 + 3600
+    # 隔离期间再次探测失败：保持隔离起点，按探测间隔顺延
+    health.record_failure(5000.0, "timeout", **BACKOFF)
+    assert health.quarantined_since == 1003.0 and health.retry_at == 8600.0
+
+    health.record_success(9000.0, latency=0.5)
+    assert not health.quarantined
+    assert health.consecutive_failures == 0 and health.available(9000.0)
+    assert (health.total_polls, health.total_failures) == (6, 5)
+
+
+def test_latency_ewma(plugin):
+    health = plugin.FeedHealth("https://feed.example/rss")
+    health.record_success(1.0, latency=1.0)
+    health.record_success(2.0, latency=2.0)
+
+    assert health.latency_ewma == pytest.approx(1.2)
+
+
+def test_tracker_round_trip_and_sync(plugin):
+    tracker = plugin.FeedHealthTracker()
+    tracker.get("a").record_failure(10.0, "HTTP 500", **BACKOFF)
+    tracker.get("b").record_success(10.0, latency=0.1)
+
+    restored = plugin.FeedHealthTracker()
+    restored.load(tracker.dump())
+    assert restored.get("a").last_error == "HTTP 500"
+    assert restored.get("a").retry_at == 70.0
+
+    restored.sync_sources(["b"])
+    assert list(restored.records) == ["b"]
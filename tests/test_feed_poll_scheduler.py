@@ -0,0 +1,71 @@
+"""RSS 自适应轮询：按新条目速率调整间隔，空轮询退避，提示作为下限，堆中过期条目被跳过"""
+
+import pytest
+
+
+def _scheduler(plugin):
+    scheduler = plugin.FeedPollScheduler()
+    scheduler.configure(default_interval=1800, min_interval=300, max_interval=21600)
+    return scheduler
+
+
+def test_new_sources_are_due_and_removed_sources_dropped(plugin):
+    scheduler = _scheduler(plugin)
+    scheduler.sync_sources(["a", "b"], now=100.0)
+
+    assert scheduler.pop_due(100.0) == ["a", "b"]
+    scheduler.sync_sources(["b"], now=200.0)
+    assert list(scheduler.states) == ["b"]
+
+
+def test_interval_tracks_new_item_rate(plugin):
+    scheduler = _scheduler(plugin)
+    scheduler.sync_sources(["a"], now=100.0)
+    # 首次轮询没有上次时间，保持默认间隔
+    scheduler.record("a", 100.0, new_items=5)
+    assert scheduler.states["a"]["interval"] == 1800
+    # 1800 秒内出现 6 条新内容：观测间隔 300 秒，与原间隔 1800 秒做 EWMA
+    scheduler.record("a", 1900.0, new_items=6)
+
+    assert scheduler.states["a"]["interval"] == pytest.approx(0.5 * 300 + 0.5 * 1800)
+    assert scheduler.next_due() == pytest.approx(1900.0 + 1050)
+
+
+def test_idle_backoff_failure_and_hint(plugin):
+    scheduler = _scheduler(plugin)
+    scheduler.sync_sources(["a"], now=0.0)
+    scheduler.record("a", 0.0, new_items=0)
+    assert scheduler.states["a"]["interval"] == pytest.approx(2700)
+
+    # 失败不改变间隔
+    scheduler.record("a", 10.0, new_items=None)
+    assert scheduler.states["a"]["interval"] == pytest.approx(2700)
+
+    # 源声明的 ttl 作为间隔下限，且不超过上限
+    scheduler.record("a", 20.0, new_items=1, hint_seconds=86400)
+    assert scheduler.next_due() == pytest.approx(20.0 + 21600)
+
+
+def test_stale_heap_entries_are_skipped(plugin):
+    scheduler = _scheduler(plugin)
+    scheduler.sync_sources(["a"], now=0.0)
+    scheduler.record("a", 0.0, new_items=1)
+    scheduler.defer("a", 5000.0)
+
+    assert not scheduler.is_due(2000.0)
+    assert scheduler.pop_due(4999.0) == []
+    assert scheduler.pop_due(5000.0) == ["a"]
+
+    restored = _scheduler(plugin)
+    restored.load(scheduler.dump())
+    assert restored.next_due() == 5000.0
+
+
+def test_feed_and_header_hints(plugin):
+    hints = plugin.FeedPollScheduler
+    assert hints.feed_hint_seconds({"ttl": "60"}) == 3600
+    assert hints.feed_hint_seconds({"sy_updateperiod": "daily", "sy_updatefrequency": "4"}) == 21600
+    assert hints.header_hint_seconds({"Cache-Control": "public, max-age=900"}) == 900
+    assert hints.header_hint_seconds({"Date": "Mon, 19 Oct 2026 09:00:00 GMT",
+                                      "Expires": "Mon, 19 Oct 2026 09:10:00 GMT"}) == 600
+    assert hints.header_hint_seconds({}) == 0.0
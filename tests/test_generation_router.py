@@ -0,0 +1,69 @@
+"""话题生成路由：失败时改用下一个模型，慢请求对冲后先返回者胜出并取消其余请求"""
+
+import asyncio
+
+
+def _install(plugin, monkeypatch, behaviours):
+    """behaviours: 模型名 -> (延迟秒数, 返回文本或 None)"""
+    calls = []
+
+    async def generate_with_model(prompt, model_config, **kwargs):
+        calls.append(model_config)
+        delay, text = behaviours[model_config]
+        await asyncio.sleep(delay)
+        return bool(text), text or "", None, model_config
+
+    monkeypatch.setattr(plugin.llm_api, "get_available_models", lambda: {n: n for n in behaviours}, raising=False)
+    monkeypatch.setattr(plugin.llm_api, "generate_with_model", generate_with_model, raising=False)
+    return calls
+
+
+def _generate(router, models, **kwargs):
+    options = dict(default_delay=0.05, min_delay=0.01, max_delay=1.0, timeout=2.0)
+    options.update(kwargs)
+    return asyncio.run(router.generate("prompt", models, {}, **options))
+
+
+def test_failure_falls_through_to_next_model(plugin, monkeypatch):
+    calls = _install(plugin, monkeypatch, {"a": (0, None), "b": (0, "  话题B  ")})
+    router = plugin.GenerationRouter()
+
+    assert _generate(router, ["missing", "a", "b"]) == "话题B"
+    assert calls == ["a", "b"]
+    assert router.counters["a"]["failed"] == 1 and router.counters["b"]["ok"] == 1
+
+
+def test_slow_model_is_hedged_and_cancelled(plugin, monkeypatch):
+    _install(plugin, monkeypatch, {"slow": (1.0, "慢"), "fast": (0, "快")})
+    router = plugin.GenerationRouter()
+
+    assert _generate(router, ["slow", "fast"]) == "快"
+    assert (router.hedges_fired, router.hedges_won) == (1, 1)
+    assert router.counters["slow"]["cancelled"] == 1
+
+
+def test_no_hedge_waits_for_first_model(plugin, monkeypatch):
+    calls = _install(plugin, monkeypatch, {"slow": (0.1, "慢"), "fast": (0, "快")})
+    router = plugin.GenerationRouter()
+
+    assert _generate(router, ["slow", "fast"], hedge=False) == "慢"
+    assert calls == ["slow"]
+
+
+def test_hedge_delay_uses_p95_when_enough_samples(plugin):
+    router = plugin.GenerationRouter()
+    assert router.hedge_delay("m", 8.0, 2.0, 20.0) == 8.0
+
+    for latency in (1, 2, 3, 4, 30):
+        router.record("m", latency, ok=True)
+    router.record("m", None, ok=False)
+    assert router.percentile("m", 0.5) == 3
+    assert router.hedge_delay("m", 8.0, 2.0, 20.0) == 20.0
+    assert router.stats()["m"]["failed"] == 1
+
+
+def test_all_failing_returns_none(plugin, monkeypatch):
+    _install(plugin, monkeypatch, {"a": (0, None), "b": (0, None)})
+    assert _generate(plugin.GenerationRouter(), ["a", "b"]) is None
+    assert _generate(plugin.GenerationRouter(), ["missing"]) is None
+
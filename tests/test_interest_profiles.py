@@ -0,0 +1,67 @@
+"""群聊兴趣画像：半衰期衰减、长时间间隔后的重新定基、词表与群数上限、按画像挑选资讯时的日志"""
+
+import time
+
+import pytest
+
+HOUR = 3600.0
+
+
+def test_weights_halve_after_half_life(plugin):
+    profiles = plugin.ChatInterestProfiles(half_life_hours=1)
+    profiles.observe("g1", "芯片 发布", now=0)
+
+    assert profiles.weights("g1", now=0)["芯片"] == pytest.approx(1.0)
+    assert profiles.weights("g1", now=HOUR)["芯片"] == pytest.approx(0.5)
+    assert profiles.weights("g1", now=3 * HOUR)["发布"] == pytest.approx(0.125)
+
+
+def test_recent_messages_outweigh_old_ones(plugin):
+    profiles = plugin.ChatInterestProfiles(half_life_hours=1)
+    profiles.observe("g1", "游戏 游戏 游戏", now=0)
+    profiles.observe("g1", "芯片", now=2 * HOUR)
+
+    weights = profiles.weights("g1", now=2 * HOUR)
+    assert weights["游戏"] == pytest.approx(0.75)
+    assert weights["芯片"] == pytest.approx(1.0)
+
+
+def test_rebase_keeps_weights_finite(plugin):
+    profiles = plugin.ChatInterestProfiles(half_life_hours=1)
+    profiles.observe("g1", "芯片", now=0)
+    later = (profiles._REBASE_EXPONENT + 8) * HOUR
+    profiles.observe("g1", "芯片", now=later)
+
+    # 旧权重已衰减到可忽略并在定基时丢弃，只剩新消息的计数
+    assert profiles._base_time["g1"] == later
+    assert profiles.weights("g1", now=later) == {"芯片": pytest.approx(1.0)}
+
+
+def test_term_and_chat_caps(plugin):
+    profiles = plugin.ChatInterestProfiles(max_terms=10, max_chats=2)
+    profiles.observe("g1", " ".join(f"term{i}" for i in range(13)), now=0)
+    assert len(profiles.weights("g1", now=0)) == 10
+
+    profiles.observe("g2", "芯片", now=0)
+    profiles.observe("g1", "芯片", now=0)
+    profiles.observe("g3", "芯片", now=0)
+    # g2 最久未活跃，被淘汰
+    assert len(profiles) == 2
+    assert profiles.weights("g2", now=0) == {}
+    assert profiles.weights("g1", now=0)
+
+
+def test_interest_selection_logs_top_terms(plugin, monkeypatch, tmp_path):
+    instance = plugin.TopicFinderPlugin(config={}, plugin_dir=str(tmp_path))
+    for text in ("芯片 芯片 芯片", "游戏 游戏", "天气"):
+        instance.interest_profiles.observe("g1", text, now=time.time())
+    assert [term for term, _ in instance.interest_profiles.top_terms("g1", 2)] == ["芯片", "游戏"]
+
+    logged = []
+    monkeypatch.setattr(plugin.logger, "debug", lambda msg, *a, **k: logged.append(msg))
+    monkeypatch.setattr(instance.topic_generator, "candidate_items",
+                        lambda kind, items, weights, limit: [it for it in items if "芯片" in it["title"]])
+    items = [{"title": "天气预报"}, {"title": "国产芯片量产"}]
+
+    assert instance._select_interest_items("g1", "rss", items) == [{"title": "国产芯片量产"}]
+    assert any("芯片、游戏、天气" in msg for msg in logged)
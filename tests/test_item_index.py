@@ -0,0 +1,42 @@
+"""资讯倒排索引：检索、过期与容量淘汰"""
+
+import time
+
+# search() 按真实时间清理过期条目，测试数据以当前时间为基准
+NOW = time.time()
+
+
+def item(n, ts, **extra):
+    return {"title": f"芯片新闻 {n}", "description": "国产芯片发布", "link": f"https://example.com/{n}",
+            "timestamp": ts, **extra}
+
+
+def test_readded_doc_survives_capacity_eviction(plugin):
+    index = plugin.TopicItemIndex(max_items=100)
+    index.add_items([item(0, NOW)], "rss", ttl_seconds=3600, now=NOW)
+    index.add_items([item(n, NOW + n) for n in range(1, 100)], "rss", ttl_seconds=3600, now=NOW)
+    # 重新写入最早过期的条目，随后超出容量：应淘汰此时最早过期的条目 1，而不是刷新过的条目 0
+    index.add_items([item(0, NOW + 500)], "rss", ttl_seconds=3600, now=NOW)
+    index.add_items([item(100, NOW + 600)], "rss", ttl_seconds=3600, now=NOW)
+
+    links = {i["link"] for i in index.search("芯片", k=200)}
+    assert len(index) == 100
+    assert "https://example.com/0" in links
+    assert "https://example.com/1" not in links
+
+
+def test_search_by_keyword_and_tag(plugin):
+    index = plugin.TopicItemIndex()
+    index.add_items([item(1, NOW, category="科技"), {"title": "足球比赛", "link": "x", "timestamp": NOW}],
+                    "rss", ttl_seconds=3600, now=NOW)
+
+    assert [i["link"] for i in index.search("芯片")] == ["https://example.com/1"]
+    assert [i["link"] for i in index.search("#科技")] == ["https://example.com/1"]
+
+
+def test_expire_removes_only_outdated_entries(plugin):
+    index = plugin.TopicItemIndex()
+    index.add_items([item(1, NOW), item(2, NOW + 100)], "rss", ttl_seconds=60, now=NOW)
+
+    assert index.expire(now=NOW + 61) == 1
+    assert len(index) == 1
@@ -0,0 +1,27 @@
+"""按需初始化：可选依赖缺失时返回 None，插件加载不创建 data/，管理器在首次使用时才创建"""
+
+import sys
+
+
+def test_optional_import_caches_missing_modules(plugin):
+    assert plugin._optional_import("surely_not_installed_module_xyz") is None
+    assert "surely_not_installed_module_xyz" in plugin._OPTIONAL_MODULES
+    assert plugin._optional_import("json") is sys.modules["json"]
+
+
+def test_plugin_load_does_not_touch_data_dir(plugin, tmp_path):
+    instance = plugin.TopicFinderPlugin(config={"web_llm": {"enable_web_llm": False}}, plugin_dir=str(tmp_path))
+
+    assert not (tmp_path / "data").exists()
+    assert instance._rss_manager is None and instance._web_llm_manager is None
+    assert instance.web_llm_manager is None
+
+    manager = instance.rss_manager
+    assert manager is not None and instance.rss_manager is manager
+    assert manager.store is instance.store
+    assert not (tmp_path / "data").exists()
+
+
+def test_disabled_rss_is_never_created(plugin, tmp_path):
+    instance = plugin.TopicFinderPlugin(config={"rss": {"enable_rss": False}}, plugin_dir=str(tmp_path))
+    assert instance.rss_manager is None
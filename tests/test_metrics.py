@@ -0,0 +1,49 @@
+"""指标注册表：计数器/仪表/直方图、关闭后不记录、汇总分位数与 Prometheus 导出格式"""
+
+
+def test_summary_and_percentiles(plugin):
+    registry = plugin.MetricsRegistry()
+    for value in range(1, 101):
+        registry.observe("send_seconds", value / 100, reason="schedule")
+    registry.observe("send_seconds", 5.0, reason="silence")
+    registry.inc("sends_total", reason="schedule", status="ok")
+    registry.inc("sends_total", 2, reason="schedule", status="failed")
+    registry.set("dispatch_queue_depth", 7)
+
+    summary = registry.summary()
+    assert summary["histograms"]["send_seconds"]["count"] == 101
+    assert summary["histograms"]["send_seconds"]["p50"] == 0.51
+    assert summary["histograms"]["send_seconds"]["p99"] == 1.0
+    assert summary["counters"]["sends_total"] == {"total": 3}
+    assert summary["gauges"]["dispatch_queue_depth"] == {"total": 7}
+
+    detail = registry.summary("sends")
+    assert list(detail["counters"]) == ["sends_total"]
+    assert detail["counters"]["sends_total"]["labels"]['{reason="schedule",status="failed"}'] == 2
+
+
+def test_disabled_registry_records_nothing(plugin):
+    registry = plugin.MetricsRegistry()
+    registry.enabled = False
+    registry.inc("sends_total")
+    with registry.timer("send_seconds"):
+        pass
+
+    assert registry.summary() == {"histograms": {}, "counters": {}, "gauges": {}}
+
+
+def test_prometheus_export(plugin):
+    registry = plugin.MetricsRegistry()
+    registry.observe("rss_fetch_seconds", 0.02, source='https://a.example/"rss"')
+    registry.observe("rss_fetch_seconds", 3.0, source='https://a.example/"rss"')
+    registry.inc("rss_fetch_total", source="a", status="ok")
+
+    lines = registry.render_prometheus().splitlines()
+    label = 'source="https://a.example/\\"rss\\""'
+    assert "# HELP topic_finder_rss_fetch_seconds 单个 RSS 源的请求耗时（含下载与解析）" in lines
+    assert "# TYPE topic_finder_rss_fetch_seconds histogram" in lines
+    assert f'topic_finder_rss_fetch_seconds_bucket{{{label},le="0.025"}} 1' in lines
+    assert f'topic_finder_rss_fetch_seconds_bucket{{{label},le="5"}} 2' in lines
+    assert f'topic_finder_rss_fetch_seconds_bucket{{{label},le="+Inf"}} 2' in lines
+    assert f"topic_finder_rss_fetch_seconds_count{{{label}}} 2" in lines
+    assert 'topic_finder_rss_fetch_total{source="a",status="ok"} 1' in lines
@@ -0,0 +1,52 @@
+"""主程序人设加载：首次等待读取，按修改时间失效，读取失败保留旧文本"""
+
+import asyncio
+import os
+
+BOT_CONFIG = """
+[personality]
+personality = "{personality}"
+reply_style = "简短"
+"""
+
+
+def _write(path, personality, mtime):
+    path.write_text(BOT_CONFIG.format(personality=personality), encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+
+
+def test_loads_and_reloads_on_mtime_change(plugin, tmp_path):
+    path = tmp_path / "bot_config.toml"
+    _write(path, "爱聊科技的群友", 1_000_000)
+
+    async def run():
+        loader = plugin.PersonaLoader(path, check_interval_seconds=0)
+        first = await loader.get()
+        _write(path, "新的人设", 1_000_100)
+        await loader.get()
+        await loader._refresh_task
+        return first, await loader.get()
+
+    first, second = asyncio.run(run())
+    assert first == "爱聊科技的群友。说话风格：简短"
+    assert second == "新的人设。说话风格：简短"
+
+
+def test_broken_file_keeps_previous_text(plugin, tmp_path):
+    path = tmp_path / "bot_config.toml"
+    _write(path, "人设A", 1_000_000)
+
+    async def run():
+        loader = plugin.PersonaLoader(path, check_interval_seconds=0)
+        await loader.get()
+        path.write_text("[personality\n", encoding="utf-8")
+        os.utime(path, (1_000_100, 1_000_100))
+        await loader.refresh()
+        return loader.text
+
+    assert asyncio.run(run()) == "人设A。说话风格：简短"
+
+
+def test_missing_file_gives_empty_persona(plugin, tmp_path):
+    loader = plugin.PersonaLoader(tmp_path / "missing.toml")
+    assert asyncio.run(loader.get()) == ""
@@ -0,0 +1,36 @@
+"""话题 prompt 组装：人设注入、模板中的其他花括号与资讯位置"""
+
+ITEMS = [{"title": "开源大模型发布", "description": "新版本支持更长上下文", "source": "feed"}]
+
+
+def _generator(plugin, template=""):
+    return plugin.TopicGenerator({"topic_generation": {"topic_prompt": template}})
+
+
+def test_default_template_includes_persona(plugin):
+    generator = _generator(plugin)
+
+    prompt = generator.build_prompt(ITEMS, [], persona="你是一个爱聊科技的群友")
+    assert prompt.startswith("你是一个爱聊科技的群友\n")
+    assert "{persona}" not in prompt and "混沌女孩" not in prompt
+    assert "开源大模型发布" in prompt
+
+    # 未读取到人设时使用默认人设
+    assert generator.build_prompt(ITEMS, []).startswith(generator.DEFAULT_PERSONA)
+
+
+def test_custom_template_with_other_braces(plugin):
+    template = '{persona}\n按 {"topic": "..."} 格式输出。\n资讯：\n{rss_content}\n输出：'
+    prompt = _generator(plugin, template).build_prompt(ITEMS, [], persona="人设A")
+
+    assert prompt.startswith("人设A\n")
+    assert '{"topic": "..."}' in prompt
+    assert prompt.endswith("输出：")
+
+
+def test_template_without_placeholder_still_gets_persona(plugin):
+    generator = _generator(plugin, "资讯：\n{rss_content}\n输出：")
+
+    prompt = generator.build_prompt(ITEMS, [], persona="人设B")
+    assert prompt.startswith("人设B\n\n资讯：")
+    assert generator.build_prompt(ITEMS, []).startswith("资讯：")
@@ -0,0 +1,77 @@
+"""联网大模型端点池：最少在途请求优先，失败冷却，每小时配额，重新配置时保留同名端点状态"""
+
+import time
+
+CONFIG = {"providers": [
+    {"name": "a", "base_url": "https://a.example/v1/", "api_key": "ka", "model_name": "m"},
+    {"name": "b", "base_url": "https://b.example/v1", "api_key": "kb", "model_name": "m", "weight": 2},
+    {"name": "unconfigured", "base_url": "", "api_key": ""},
+]}
+
+
+def _pool(plugin, config=CONFIG):
+    pool = plugin.WebLLMProviderPool()
+    pool.configure(config)
+    return pool
+
+
+def test_least_outstanding_respects_weight(plugin):
+    pool = _pool(plugin)
+    a, b, _ = pool.providers
+
+    assert a.base_url == "https://a.example/v1"
+    assert [p.name for p in pool.available()] == ["a", "b"]
+    a.begin(time.time())
+    assert pool.pick(1)[0] is b
+    # b 权重为 2：两个在途请求折算后与 a 的一个相同，再加一个则让给 a
+    b.begin(time.time())
+    b.begin(time.time())
+    b.begin(time.time())
+    assert pool.pick(1)[0] is a
+    assert {p.name for p in pool.pick(5)} == {"a", "b"}
+    assert pool.pick(2, exclude={"a"}) == [b]
+
+
+def test_failure_cooldown_and_recovery(plugin):
+    pool = _pool(plugin)
+    a = pool.providers[0]
+
+    a.begin(time.time())
+    a.finish(False, error="HTTP 500", retry_after=600)
+    assert a.cooldown_until >= time.time() + 599
+    assert [p.name for p in pool.available()] == ["b"]
+
+    a.cooldown_until = 0.0
+    a.begin(time.time())
+    a.finish(True, latency=0.3)
+    assert a.consecutive_failures == 0 and a.outstanding == 0 and a.latency_ewma == 0.3
+
+
+def test_hourly_quota(plugin):
+    pool = _pool(plugin, {"providers": [dict(CONFIG["providers"][0], quota_per_hour=2)]})
+    provider = pool.providers[0]
+    now = time.time()
+
+    provider.begin(now - 3700)
+    provider.begin(now - 10)
+    assert provider.quota_left(now) == 1
+    provider.begin(now)
+    assert not provider.available(now)
+    assert provider.available(now + 3600)
+
+
+def test_reconfigure_keeps_state_of_same_name(plugin):
+    pool = _pool(plugin)
+    pool.providers[0].finish(False, error="boom")
+
+    pool.configure({"providers": CONFIG["providers"][:1] + [
+        {"name": "c", "base_url": "https://c.example/v1", "api_key": "kc"}]})
+    assert [p.name for p in pool.providers] == ["a", "c"]
+    assert pool.providers[0].last_error == "boom"
+    assert pool.providers[1].consecutive_failures == 0
+
+
+def test_single_endpoint_fallback(plugin):
+    pool = _pool(plugin, {"base_url": "https://x.example/v1", "api_key": "k", "model_name": "search"})
+
+    assert [(p.name, p.model_name) for p in pool.providers] == [("default", "search")]
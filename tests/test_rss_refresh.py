@@ -0,0 +1,45 @@
+"""RSS 刷新端到端：在本机替身 RSS 源上流式拉取、按条目上限截断，失败的源进入退避并沿用缓存"""
+
+import asyncio
+
+from _bench_stubs import StubEndpoints
+
+
+def _run(plugin, tmp_path, error_rate, rounds=1):
+    async def run():
+        endpoints = StubEndpoints(feeds=3, items_per_feed=40, item_bytes=300, latency_ms=0, error_rate=error_rate)
+        await endpoints.start()
+        try:
+            config = {
+                "rss": {"sources": endpoints.feed_urls(), "max_items_per_source": 5},
+                "storage": {"backend": "json", "write_debounce_seconds": 0},
+            }
+            instance = plugin.TopicFinderPlugin(config=config, plugin_dir=str(tmp_path))
+            manager = instance.rss_manager
+            results = [await manager.update_rss_feeds(force=True) for _ in range(rounds)]
+            report = await manager.health_report()
+            await instance.store.close()
+            return endpoints, results, report
+        finally:
+            await endpoints.stop()
+
+    return asyncio.run(run())
+
+
+def test_refresh_reads_capped_items_from_every_source(plugin, tmp_path):
+    endpoints, (items,), report = _run(plugin, tmp_path, error_rate=0.0)
+
+    assert len(items) == 15
+    assert {item["source"] for item in items} == set(endpoints.feed_urls())
+    assert all(item["title"] and item["link"] for item in items)
+    assert endpoints.requests["feed"] == 3
+    assert all(entry["consecutive_failures"] == 0 for entry in report)
+
+
+def test_failing_sources_back_off(plugin, tmp_path):
+    endpoints, (items, again), report = _run(plugin, tmp_path, error_rate=1.0, rounds=2)
+
+    assert items == [] and again == []
+    # 第二轮时各源仍在退避中，不再请求
+    assert endpoints.requests["feed"] == endpoints.requests["feed_errors"] == 3
+    assert all(entry["consecutive_failures"] == 1 and "503" in entry["last_error"] for entry in report)
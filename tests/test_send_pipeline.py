@@ -0,0 +1,118 @@
+"""分阶段发送流程：资格检查、聊天流解析、话题获取（复用/去重/备用）、排队发送，各阶段超时与追踪"""
+
+import asyncio
+import types
+
+import pytest
+
+CONFIG = {
+    "schedule": {"min_interval_hours": 2},
+    "storage": {"backend": "json", "write_debounce_seconds": 0},
+    "dispatch": {"max_send_retries": 0, "global_rate_per_second": 100, "global_burst": 10},
+    "pipeline": {"generation_timeout_seconds": 0.2},
+}
+
+
+@pytest.fixture
+def host(plugin, monkeypatch):
+    state = types.SimpleNamespace(sent=[], send_ok=True, send_delay=0.0, streams={"111": "stream-111"}, topics=[],
+                                  generated=0)
+
+    async def text_to_stream(text, stream_id, typing=False, storage_message=True):
+        await asyncio.sleep(state.send_delay)
+        state.sent.append((stream_id, text))
+        return state.send_ok
+
+    def stream_by_group(group_id):
+        stream_id = state.streams.get(str(group_id))
+        return types.SimpleNamespace(stream_id=stream_id) if stream_id else None
+
+    monkeypatch.setattr(plugin.send_api, "text_to_stream", text_to_stream, raising=False)
+    monkeypatch.setattr(plugin.chat_api, "get_stream_by_group_id", stream_by_group, raising=False)
+    monkeypatch.setattr(plugin.chat_api, "get_stream_by_user_id", lambda user_id: None, raising=False)
+    monkeypatch.setattr(plugin, "get_chat_manager", lambda: types.SimpleNamespace(get_stream=lambda s: None))
+    return state
+
+
+def _instance(plugin, host, tmp_path, topics, delay=0.0, config=CONFIG):
+    instance = plugin.TopicFinderPlugin(config=config, plugin_dir=str(tmp_path))
+    remaining = list(topics)
+
+    async def generate(chat_id=None):
+        host.generated += 1
+        await asyncio.sleep(delay)
+        return remaining.pop(0) if remaining else "没有更多话题"
+
+    instance._generate_topic_content = generate
+    return instance
+
+
+def _send(instance, chat_id="111"):
+    async def run():
+        try:
+            await instance._send_topic_to_chat(chat_id, reason="test")
+        finally:
+            await instance.store.close()
+    asyncio.run(run())
+    return instance.traces.recent(1)[0]
+
+
+def test_successful_send_records_stages(plugin, host, tmp_path):
+    instance = _instance(plugin, host, tmp_path, ["话题一"])
+    record = _send(instance)
+
+    assert record["status"] == "ok"
+    assert host.sent == [("stream-111", "话题一")]
+    assert "111" in instance.last_topic_time and not instance._inflight_chats
+    names = {span["name"] for span in record["spans"]}
+    assert {"resolve_stream", "acquire", "acquire.generate", "dispatch", "dispatch.send_api", "record"} <= names
+
+    # 发送间隔未到：资格检查直接拒绝，不生成
+    _send(instance)
+    assert host.generated == 1
+
+
+def test_failed_send_keeps_topic_for_next_attempt(plugin, host, tmp_path):
+    instance = _instance(plugin, host, tmp_path, ["话题一", "话题二"])
+    host.send_ok = False
+    assert _send(instance)["status"] == "send_failed"
+    assert instance._unsent_topics == {"111": "话题一"}
+    assert instance.stream_cache.get("111") == (False, None)
+
+    host.send_ok = True
+    assert _send(instance)["status"] == "ok"
+    assert host.sent[-1] == ("stream-111", "话题一")
+    assert host.generated == 1
+
+
+def test_duplicate_topics_fall_back(plugin, host, tmp_path):
+    instance = _instance(plugin, host, tmp_path, ["重复的话题", "重复的话题"])
+    asyncio.run(instance.store.add_recent_topic("111", "重复的话题", plugin.time.time(), 10))
+
+    record = _send(instance)
+    assert host.generated == 2
+    assert host.sent[-1][1] != "重复的话题"
+    assert any(span["name"] == "acquire.fallback" for span in record["spans"])
+
+
+def test_missing_stream_and_stage_timeout(plugin, host, tmp_path):
+    instance = _instance(plugin, host, tmp_path, ["话题一"], delay=1.0)
+    assert _send(instance, "999")["status"] == "no_stream"
+    assert host.generated == 0
+
+    record = _send(instance)
+    assert record["status"] == "timeout"
+    assert host.sent == [] and not instance._inflight_chats
+
+
+def test_slow_send_api_is_recorded_after_stage_timeout(plugin, host, tmp_path):
+    config = {**CONFIG, "pipeline": {"send_timeout_seconds": 0.05}}
+    instance = _instance(plugin, host, tmp_path, ["话题一"], config=config)
+    host.send_delay = 0.2
+
+    record = _send(instance)
+    # 发送接口已被调用：消息已发出，照常记录发送时间与近期话题
+    assert record["status"] == "ok"
+    assert host.sent == [("stream-111", "话题一")]
+    assert "111" in instance.last_topic_time and "111" not in instance._unsent_topics
+    assert [it["content"] for it in asyncio.run(instance.store.load_recent_topics("111"))] == ["话题一"]
@@ -0,0 +1,71 @@
+"""发送追踪：并发子任务记录到同一追踪，异常/取消标记阶段状态，环形缓冲与 JSONL 轮转"""
+
+import asyncio
+import json
+
+import pytest
+
+
+def test_spans_from_concurrent_tasks_share_the_trace(plugin):
+    async def stage(name, delay):
+        with plugin.trace_span(name):
+            await asyncio.sleep(delay)
+
+    async def run():
+        trace = plugin.SendTrace("g1", "schedule")
+        token = plugin._CURRENT_TRACE.set(trace)
+        try:
+            await asyncio.gather(stage("acquire.rss", 0.02), stage("acquire.web", 0.01))
+            with pytest.raises(ValueError):
+                with plugin.trace_span("dispatch", attempt=1):
+                    raise ValueError("boom")
+        finally:
+            plugin._CURRENT_TRACE.reset(token)
+        trace.finish("failed")
+        # 流程结束后到达的阶段被忽略
+        trace.record("late", 0.0, 1.0)
+        return trace.to_dict()
+
+    record = asyncio.run(run())
+    assert record["status"] == "failed" and record["duration_ms"] >= 20
+    names = [span["name"] for span in record["spans"]]
+    assert sorted(names) == ["acquire.rss", "acquire.web", "dispatch"]
+    dispatch = next(span for span in record["spans"] if span["name"] == "dispatch")
+    assert dispatch["status"] == "error" and dispatch["attempt"] == 1
+
+
+def test_trace_span_outside_trace_is_noop(plugin):
+    with plugin.trace_span("anything"):
+        pass
+    assert plugin.current_trace() is None
+
+
+def test_cancelled_and_timeout_status(plugin):
+    trace = plugin.SendTrace("g1", "manual")
+    for exc in (asyncio.CancelledError, asyncio.TimeoutError):
+        with pytest.raises(exc):
+            with trace.span("generate"):
+                raise exc()
+
+    assert [span["status"] for span in trace.spans] == ["cancelled", "timeout"]
+
+
+def test_recorder_buffer_and_sink_rotation(plugin, tmp_path):
+    sink = tmp_path / "traces.jsonl"
+
+    async def run():
+        recorder = plugin.TraceRecorder(capacity=2, sink_path=sink, sink_max_bytes=1024)
+        for i in range(12):
+            await recorder.finish(recorder.start(f"g{i}", "x" * 100), "ok")
+        return recorder
+
+    recorder = asyncio.run(run())
+    assert [r["chat_id"] for r in recorder.recent(5)] == ["g11", "g10"]
+    assert recorder.recent(0) == []
+    rotated = sink.with_name("traces.jsonl.1")
+    assert rotated.exists() and sink.stat().st_size < 1024 + 300
+    last = json.loads(sink.read_text(encoding="utf-8").splitlines()[-1])
+    assert last["chat_id"] == "g11"
+
+    recorder.reconfigure(capacity=1, sink_path=None, sink_max_bytes=0)
+    assert [r["chat_id"] for r in recorder.recent(5)] == ["g11"]
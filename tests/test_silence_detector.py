@@ -0,0 +1,90 @@
+"""静默检测：活跃时段按 schedule.timezone 与群聊覆盖的 timezone 取当前小时，经资格索引的小时掩码判断"""
+
+import asyncio
+import types
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+TZ = "Pacific/Kiritimati"  # UTC+14，与本机时区的小时数几乎总是不同
+
+
+def _message(chat_id="chat-1", group_id="123"):
+    group_info = types.SimpleNamespace(group_id=group_id)
+    recv = types.SimpleNamespace(chat_id=chat_id, is_group=True,
+                                 message_info=types.SimpleNamespace(group_info=group_info))
+    return types.SimpleNamespace(message_recv=recv)
+
+
+def _handler(plugin, config):
+    handler = plugin.ChatSilenceDetectorEventHandler()
+    handler.config = config
+    checked = []
+
+    async def check(chat_id, group_id=None):
+        checked.append(chat_id)
+
+    handler._check_chat_silence = check
+    return handler, checked
+
+
+def _window_config(hour, **extra):
+    config = {"silence_detection": {"enable_silence_detection": True,
+                                    "active_hours_start": hour, "active_hours_end": hour}}
+    config.update(extra)
+    return config
+
+
+def test_timezone_name_prefers_group_override(plugin):
+    handler, _ = _handler(plugin, {"schedule": {"timezone": "Asia/Shanghai"},
+                                   "group_overrides": {"chat-1": {"timezone": TZ}}})
+
+    assert handler._get_timezone_name("chat-1") == TZ
+    assert handler._get_timezone_name("chat-2") == "Asia/Shanghai"
+
+
+def test_active_window_uses_schedule_timezone(plugin):
+    tz_hour = datetime.now(ZoneInfo(TZ)).hour
+    if tz_hour == datetime.now().hour:
+        pytest.skip("本机时区与测试时区当前小时相同")
+
+    handler, checked = _handler(plugin, _window_config(tz_hour, schedule={"timezone": TZ}))
+    asyncio.run(handler.execute(_message()))
+    assert checked == ["chat-1"]
+
+    # 未配置时区时按本机小时判断，不在该活跃时段内
+    handler, checked = _handler(plugin, _window_config(tz_hour))
+    asyncio.run(handler.execute(_message()))
+    assert checked == []
+
+
+def test_active_window_uses_plugin_group_timezone(plugin, monkeypatch):
+    tz_hour = datetime.now(ZoneInfo(TZ)).hour
+    if tz_hour == datetime.now().hour:
+        pytest.skip("本机时区与测试时区当前小时相同")
+
+    config = _window_config(tz_hour, group_overrides={"123": {"timezone": TZ}})
+    instance = plugin.TopicFinderPlugin(config=config)
+    manager = __import__("src.plugin_system.core.plugin_manager", fromlist=["plugin_manager"]).plugin_manager
+    monkeypatch.setattr(manager, "get_plugin_instance", lambda name: instance)
+
+    handler, checked = _handler(plugin, config)
+    asyncio.run(handler.execute(_message(group_id="123")))
+    asyncio.run(handler.execute(_message(chat_id="chat-2", group_id="456")))
+    assert checked == ["chat-1"]
+
+
+def test_active_hours_come_from_plugin_eligibility_index(plugin, monkeypatch):
+    hour = datetime.now().hour
+    other = (hour + 12) % 24
+    config = _window_config(other, group_overrides={"123": {"active_hours_start": hour, "active_hours_end": hour}})
+    instance = plugin.TopicFinderPlugin(config=config)
+    manager = __import__("src.plugin_system.core.plugin_manager", fromlist=["plugin_manager"]).plugin_manager
+    monkeypatch.setattr(manager, "get_plugin_instance", lambda name: instance)
+    # 处理器自身的配置不参与判断：活跃时段以插件的资格索引为准
+    handler, checked = _handler(plugin, {"silence_detection": {"enable_silence_detection": True}})
+
+    asyncio.run(handler.execute(_message(group_id="123")))
+    asyncio.run(handler.execute(_message(chat_id="chat-2", group_id="456")))
+    assert checked == ["chat-1"]
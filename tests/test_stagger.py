@@ -0,0 +1,37 @@
+"""定时发送分散：窗口内排布、持续速率上限与跨时间点的发送预约"""
+
+import pytest
+
+
+def _plugin(plugin, window, rate):
+    return plugin.TopicFinderPlugin(config={"schedule": {"stagger_window_seconds": window,
+                                                         "max_sends_per_second": rate}})
+
+
+def test_delays_spread_within_window(plugin):
+    instance = _plugin(plugin, window=300, rate=0)
+    delays = instance._stagger_delays(10)
+
+    assert len(delays) == 10
+    assert all(0 <= d < 300 for d in delays)
+    assert delays == sorted(delays)
+    assert instance._stagger_delays(0) == []
+
+
+def test_rate_limit_stretches_window_and_spaces_sends(plugin):
+    instance = _plugin(plugin, window=10, rate=0.5)
+    delays = instance._stagger_delays(20)
+
+    # 20 次发送按 0.5 次/秒至少需要 40 秒
+    assert delays[-1] >= 38
+    assert all(b - a >= 2 - 1e-6 for a, b in zip(delays, delays[1:]))
+
+
+def test_consecutive_slots_share_the_rate_budget(plugin):
+    instance = _plugin(plugin, window=0, rate=1)
+    first = instance._stagger_delays(5)
+    second = instance._stagger_delays(5)
+
+    # 第二个时间点的发送排在第一个时间点预约之后
+    assert second[0] >= first[-1] + 1 - 0.1
+    assert second[-1] == pytest.approx(9, abs=0.1)
@@ -0,0 +1,78 @@
+"""存储后端：JSON 与 SQLite 行为一致，SQLite 首次打开时迁移旧版 JSON 文件"""
+
+import asyncio
+import json
+
+import pytest
+
+ITEMS = [
+    {"title": "芯片发布", "link": "https://a.example/1", "source": "a", "timestamp": 100.0},
+    {"title": "开源模型", "link": "https://b.example/2", "source": "b", "timestamp": 200.0},
+]
+
+
+def _stores(plugin, tmp_path):
+    return {
+        "json": plugin.create_topic_store(tmp_path / "json", backend="json", write_debounce_seconds=0),
+        "sqlite": plugin.create_topic_store(tmp_path / "sqlite", backend="sqlite"),
+    }
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_store_round_trip(plugin, tmp_path, backend):
+    async def run():
+        store = _stores(plugin, tmp_path)[backend]
+        try:
+            await store.save_items("rss", ITEMS)
+            await store.set_last_update("web", 123.5)
+            for ts in (1.0, 2.0, 3.0):
+                await store.add_recent_topic("g1", f"话题{ts}", ts, max_keep=2)
+            await store.set_meta("key", {"a": 1})
+            return (
+                await store.load_items("rss"),
+                await store.load_items("rss", since=150),
+                await store.load_items("rss", source="a"),
+                await store.load_items("web"),
+                await store.get_last_update("web"),
+                await store.get_last_update("rss"),
+                await store.load_recent_topics("g1"),
+                await store.get_meta("key"),
+                await store.get_meta("missing", "default"),
+            )
+        finally:
+            await store.close()
+
+    items, recent_items, source_items, web, web_ts, rss_ts, topics, meta, missing = asyncio.run(run())
+    assert items == ITEMS
+    assert [it["title"] for it in recent_items] == ["开源模型"]
+    assert [it["title"] for it in source_items] == ["芯片发布"]
+    assert web == []
+    assert (web_ts, rss_ts) == (123.5, 0.0)
+    assert [t["content"] for t in topics] == ["话题2.0", "话题3.0"]
+    assert meta == {"a": 1} and missing == "default"
+
+
+def test_sqlite_migrates_legacy_json(plugin, tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "rss_cache.json").write_text(json.dumps(ITEMS), encoding="utf-8")
+    (data_dir / "web_last_update.json").write_text(json.dumps({"last_update": 42.0}), encoding="utf-8")
+    (data_dir / "recent_topics.json").write_text(
+        json.dumps({"g1": [{"content": "旧话题", "ts": 5.0}]}, ensure_ascii=False), encoding="utf-8")
+
+    async def run():
+        store = plugin.SQLiteTopicStore(data_dir)
+        try:
+            return (await store.load_items("rss"), await store.get_last_update("web"),
+                    await store.load_recent_topics("g1"))
+        finally:
+            await store.close()
+
+    items, web_ts, topics = asyncio.run(run())
+    assert items == ITEMS
+    assert web_ts == 42.0
+    assert topics == [{"content": "旧话题", "ts": 5.0}]
+    # 迁移只执行一次，重新打开不会重复导入
+    assert asyncio.run(run())[2] == topics
+    # 旧文件保留作为备份
+    assert (data_dir / "rss_cache.json").exists()
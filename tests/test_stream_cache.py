@@ -0,0 +1,70 @@
+"""聊天流解析缓存：正/负缓存各自的有效期，收到消息清除负缓存，流列表缓存与失效"""
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _cache(plugin, monkeypatch, **kwargs):
+    clock = _Clock()
+    monkeypatch.setattr(plugin.time, "monotonic", clock)
+    return plugin.StreamResolutionCache(**kwargs), clock
+
+
+def test_positive_and_negative_ttls(plugin, monkeypatch):
+    cache, clock = _cache(plugin, monkeypatch, ttl_seconds=3600, negative_ttl_seconds=300)
+    cache.put("111", "stream-1")
+    cache.put("222", None)
+
+    assert cache.get("111") == (True, "stream-1")
+    assert cache.get("222") == (True, None)
+    clock.now += 301
+    assert cache.get("222") == (False, None)
+    assert cache.get("111") == (True, "stream-1")
+    clock.now += 3600
+    assert cache.get("111") == (False, None)
+    assert (cache.hits, cache.misses) == (3, 2)
+
+
+def test_seen_message_clears_negative_entry(plugin, monkeypatch):
+    cache, _ = _cache(plugin, monkeypatch)
+    cache.put(222, None)
+    cache.note_stream_seen("stream-2", group_id=222)
+
+    assert cache.get("222") == (True, "stream-2")
+    assert cache.get("stream-2") == (True, "stream-2")
+
+
+def test_stream_list_is_cached_and_invalidated(plugin, monkeypatch):
+    cache, clock = _cache(plugin, monkeypatch, list_ttl_seconds=300)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return [("stream-1", "111")]
+
+    assert cache.get_stream_list(loader) == [("stream-1", "111")]
+    cache.get_stream_list(loader)
+    assert len(calls) == 1
+    # 加载流列表时顺带记录群号解析结果
+    assert cache.get("111") == (True, "stream-1")
+
+    # 已知流的消息不使列表失效，新流出现时失效
+    cache.note_stream_seen("stream-1", "111")
+    cache.get_stream_list(loader)
+    assert len(calls) == 1
+    cache.note_stream_seen("stream-9", "999")
+    cache.get_stream_list(loader)
+    assert len(calls) == 2
+
+    # 发送失败使条目与流列表失效；过期后重新加载
+    cache.invalidate("111")
+    assert cache.get("111") == (False, None)
+    cache.get_stream_list(loader)
+    clock.now += 301
+    cache.get_stream_list(loader)
+    assert len(calls) == 4
@@ -0,0 +1,87 @@
+"""RSS 流式解析：任意分块喂入、读满条目后停止、字符集识别与 Atom 链接/分类"""
+
+RSS = """<?xml version="1.0" encoding="{encoding}"?>
+<rss version="2.0" xmlns:sy="http://purl.org/rss/1.0/modules/syndication/"><channel>
+<title>测试源</title><ttl>30</ttl><sy:updatePeriod>hourly</sy:updatePeriod>
+{items}
+</channel></rss>"""
+
+ITEM = ("<item><title>芯片新闻 {n}</title><link>https://feed.example/{n}</link>"
+        "<description><![CDATA[<p>第 {n} 条描述</p>]]></description>"
+        "<pubDate>Mon, 19 Oct 2026 09:00:00 +0800</pubDate><category>科技</category></item>")
+
+ATOM = """<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+<entry><title>开源发布</title>
+<link rel="enclosure" href="https://feed.example/file.zip"/>
+<link href="https://feed.example/post"/>
+<summary>摘要</summary><updated>2026-10-19T01:00:00Z</updated>
+<category term="开源"/></entry>
+</feed>"""
+
+
+def _rss(count, encoding="utf-8"):
+    body = RSS.format(encoding=encoding, items="".join(ITEM.format(n=n) for n in range(count)))
+    return body.encode(encoding)
+
+
+def _feed_in_chunks(parser, data, size):
+    for start in range(0, len(data), size):
+        parser.feed(data[start:start + size])
+        if parser.done:
+            break
+    parser.close()
+
+
+def test_byte_chunks_split_multibyte_characters(plugin):
+    parser = plugin.StreamingFeedParser(max_items=10)
+    _feed_in_chunks(parser, _rss(3), size=1)
+
+    assert parser.error is None
+    assert [item["title"] for item in parser.items] == ["芯片新闻 0", "芯片新闻 1", "芯片新闻 2"]
+    assert parser.items[0]["description"] == "<p>第 0 条描述</p>"
+    assert parser.items[0]["tags"] == ["科技"]
+    assert parser.meta == {"ttl": "30", "sy_updateperiod": "hourly"}
+
+
+def test_stops_after_max_items(plugin):
+    parser = plugin.StreamingFeedParser(max_items=2)
+    data = _rss(50)
+    fed = 0
+    for start in range(0, len(data), 256):
+        parser.feed(data[start:start + 256])
+        fed += 256
+        if parser.done:
+            break
+
+    assert parser.done and len(parser.items) == 2
+    assert fed < len(data) // 2
+
+
+def test_declared_and_header_charsets(plugin):
+    parser = plugin.StreamingFeedParser(max_items=5)
+    _feed_in_chunks(parser, _rss(1, encoding="gbk"), size=7)
+    assert parser.encoding.lower() == "gbk"
+    assert parser.items[0]["title"] == "芯片新闻 0"
+
+    # 响应头的 charset 优先于 XML 声明
+    data = _rss(1, encoding="gb18030").replace(b'encoding="gb18030"', b'encoding="utf-8"')
+    parser = plugin.StreamingFeedParser(max_items=5, content_type="application/rss+xml; charset=GB18030")
+    _feed_in_chunks(parser, data, size=64)
+    assert parser.items[0]["title"] == "芯片新闻 0"
+
+
+def test_atom_prefers_alternate_link(plugin):
+    parser = plugin.StreamingFeedParser(max_items=5)
+    _feed_in_chunks(parser, ATOM.encode("utf-8"), size=32)
+
+    assert parser.items == [{"title": "开源发布", "description": "摘要", "link": "https://feed.example/post",
+                             "published": "2026-10-19T01:00:00Z", "tags": ["开源"]}]
+
+
+def test_malformed_feed_sets_error(plugin):
+    parser = plugin.StreamingFeedParser(max_items=5)
+    _feed_in_chunks(parser, b'<?xml version="1.0"?><rss><channel><item><title>x</wrong>', size=16)
+
+    assert parser.error is not None
+    assert parser.items == []
@@ -0,0 +1,61 @@
+"""联网信息分类分片刷新：全部分类失败时不推进最后更新时间，部分失败时保留旧条目"""
+
+import asyncio
+import time
+
+CONFIG = {"web_llm": {
+    "enable_web_llm": True,
+    "fetch_mode": "category",
+    "categories": ["科技", "体育"],
+    "providers": [{"name": "a", "base_url": "http://127.0.0.1:9/v1", "api_key": "k", "model_name": "m"}],
+}}
+
+
+def _manager(plugin, tmp_path, answers):
+    store = plugin.JsonTopicStore(tmp_path / "data", write_debounce_seconds=0)
+    manager = plugin.WebLLMManager(tmp_path, CONFIG, store=store)
+
+    async def query(session, provider, prompt, temperature, max_tokens):
+        for category, items in answers.items():
+            if category in prompt:
+                return [dict(item) for item in items]
+        return []
+
+    manager._query_provider = query
+    return manager, store
+
+
+async def _seed(store, now):
+    old = [{"title": "旧科技", "category": "科技", "timestamp": now - 60},
+           {"title": "旧体育", "category": "体育", "timestamp": now - 60}]
+    await store.save_items("web", old)
+    await store.set_last_update("web", now - 3600)
+
+
+def test_all_shards_failing_keeps_last_update(plugin, tmp_path):
+    async def run():
+        now = time.time()
+        manager, store = _manager(plugin, tmp_path, {})
+        await _seed(store, now)
+        items = await manager.get_web_info(force_refresh=True)
+        return items, await store.get_last_update("web"), await store.get_meta(manager.CATEGORY_STATE_KEY, {}), now
+
+    items, last_update, updates, now = asyncio.run(run())
+    assert {item["title"] for item in items} == {"旧科技", "旧体育"}
+    assert last_update == now - 3600
+    assert not updates
+
+
+def test_partial_refresh_advances_and_keeps_failed_category(plugin, tmp_path):
+    async def run():
+        now = time.time()
+        fresh = {"科技": [{"title": "新科技", "timestamp": now}]}
+        manager, store = _manager(plugin, tmp_path, fresh)
+        await _seed(store, now)
+        items = await manager.get_web_info(force_refresh=True)
+        return items, await store.get_last_update("web"), await store.get_meta(manager.CATEGORY_STATE_KEY, {}), now
+
+    items, last_update, updates, now = asyncio.run(run())
+    assert {item["title"] for item in items} == {"新科技", "旧体育"}
+    assert last_update >= now
+    assert set(updates) == {"科技"}